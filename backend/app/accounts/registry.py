@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-import json
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 
+from app.storage.state_file import StateFile
+from app.storage.state_store import SqliteStateStore, load_records
+
 
 @dataclass(slots=True)
 class TradingAccount:
@@ -20,11 +24,22 @@ class TradingAccount:
 
 
 class AccountRegistry:
-    def __init__(self, *, state_path: str | Path | None = None) -> None:
+    def __init__(
+        self,
+        *,
+        state_path: str | Path | None = None,
+        state_store: SqliteStateStore | None = None,
+        fsync: bool = True,
+        coalesce_seconds: float = 0.0,
+    ) -> None:
         self._accounts: dict[str, TradingAccount] = {}
-        self._state_path = Path(state_path) if state_path is not None else None
-        if self._state_path is not None:
-            self._state_path.parent.mkdir(parents=True, exist_ok=True)
+        self._state_file = (
+            StateFile(state_path, fsync=fsync, coalesce_seconds=coalesce_seconds)
+            if state_path is not None
+            else None
+        )
+        self._state_store = state_store
+        if self._state_file is not None or self._state_store is not None:
             self._load()
 
     def connect(
@@ -61,7 +76,7 @@ class AccountRegistry:
             account.connected_at = now
             account.disconnected_at = None
         self._accounts[account_id] = account
-        self._save()
+        self._save(account)
         return account
 
     def disconnect(self, *, account_id: str) -> TradingAccount | None:
@@ -71,7 +86,7 @@ class AccountRegistry:
 
         account.status = "disconnected"
         account.disconnected_at = datetime.now(UTC).isoformat()
-        self._save()
+        self._save(account)
         return account
 
     def get(self, *, account_id: str) -> TradingAccount | None:
@@ -95,22 +110,30 @@ class AccountRegistry:
             "disconnectedAt": payload["disconnected_at"],
         }
 
-    def _load(self) -> None:
-        if self._state_path is None or not self._state_path.exists():
-            return
-
-        try:
-            payload = json.loads(self._state_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            return
+    @contextmanager
+    def batched(self) -> Iterator[None]:
+        """Persist all changes made inside the block with a single write."""
+        if self._state_store is not None:
+            batch = self._state_store.transaction()
+        elif self._state_file is not None:
+            batch = self._state_file.batched()
+        else:
+            batch = nullcontext()
+        with batch:
+            yield
 
-        accounts_payload = payload.get("accounts")
-        if not isinstance(accounts_payload, list):
-            return
+    def close(self) -> None:
+        """Write any coalesced save still waiting for its tick."""
+        if self._state_file is not None:
+            self._state_file.close()
 
-        for raw_account in accounts_payload:
-            if not isinstance(raw_account, dict):
-                continue
+    def _load(self) -> None:
+        for raw_account in load_records(
+            "accounts",
+            key_field="accountId",
+            state_file=self._state_file,
+            state_store=self._state_store,
+        ):
             try:
                 account = TradingAccount(
                     account_id=str(raw_account["accountId"]),
@@ -135,8 +158,11 @@ class AccountRegistry:
                 continue
             self._accounts[account.account_id] = account
 
-    def _save(self) -> None:
-        if self._state_path is None:
+    def _save(self, changed: TradingAccount) -> None:
+        if self._state_store is not None:
+            self._state_store.put("accounts", changed.account_id, self.as_public_payload(changed))
+            return
+        if self._state_file is None:
             return
 
         payload = {
@@ -145,7 +171,4 @@ class AccountRegistry:
                 self.as_public_payload(account) for account in self._accounts.values()
             ],
         }
-        self._state_path.write_text(
-            json.dumps(payload, separators=(",", ":")),
-            encoding="utf-8",
-        )
+        self._state_file.save(payload)
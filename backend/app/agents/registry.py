@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 
 from app.agents.workspace import bootstrap_agent_workspace
+from app.storage.state_file import StateFile
+from app.storage.state_store import SqliteStateStore, load_records
 
 
 @dataclass(slots=True)
@@ -23,14 +24,21 @@ class AgentRegistry:
         self,
         *,
         state_path: str | Path | None = None,
+        state_store: SqliteStateStore | None = None,
         workspace_base_dir: str | Path = "agents",
+        fsync: bool = True,
+        coalesce_seconds: float = 0.0,
     ) -> None:
         self._agents: dict[str, TradingAgent] = {}
-        self._state_path = Path(state_path) if state_path is not None else None
+        self._state_file = (
+            StateFile(state_path, fsync=fsync, coalesce_seconds=coalesce_seconds)
+            if state_path is not None
+            else None
+        )
+        self._state_store = state_store
         self._workspace_base_dir = Path(workspace_base_dir)
         self._workspace_base_dir.mkdir(parents=True, exist_ok=True)
-        if self._state_path is not None:
-            self._state_path.parent.mkdir(parents=True, exist_ok=True)
+        if self._state_file is not None or self._state_store is not None:
             self._load()
 
     def create(
@@ -65,7 +73,7 @@ class AgentRegistry:
             existing.updated_at = now
             agent = existing
         self._agents[agent_id] = agent
-        self._save()
+        self._save(agent)
         return agent
 
     def get(self, *, agent_id: str) -> TradingAgent | None:
@@ -86,22 +94,18 @@ class AgentRegistry:
             "updatedAt": payload["updated_at"],
         }
 
-    def _load(self) -> None:
-        if self._state_path is None or not self._state_path.exists():
-            return
-
-        try:
-            payload = json.loads(self._state_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            return
+    def close(self) -> None:
+        """Write any coalesced save still waiting for its tick."""
+        if self._state_file is not None:
+            self._state_file.close()
 
-        agents_payload = payload.get("agents")
-        if not isinstance(agents_payload, list):
-            return
-
-        for raw_agent in agents_payload:
-            if not isinstance(raw_agent, dict):
-                continue
+    def _load(self) -> None:
+        for raw_agent in load_records(
+            "agents",
+            key_field="agentId",
+            state_file=self._state_file,
+            state_store=self._state_store,
+        ):
             try:
                 agent = TradingAgent(
                     agent_id=str(raw_agent["agentId"]),
@@ -115,15 +119,15 @@ class AgentRegistry:
                 continue
             self._agents[agent.agent_id] = agent
 
-    def _save(self) -> None:
-        if self._state_path is None:
+    def _save(self, changed: TradingAgent) -> None:
+        if self._state_store is not None:
+            self._state_store.put("agents", changed.agent_id, self.as_public_payload(changed))
+            return
+        if self._state_file is None:
             return
 
         payload = {
             "version": 1,
             "agents": [self.as_public_payload(agent) for agent in self._agents.values()],
         }
-        self._state_path.write_text(
-            json.dumps(payload, separators=(",", ":")),
-            encoding="utf-8",
-        )
+        self._state_file.save(payload)
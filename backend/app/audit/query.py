@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from fnmatch import fnmatchcase
+from typing import Any, Protocol
+
+from app.audit.segments import AuditPosition
+
+# Upper bound on candidate entries (those passing the backend's own filters) examined for
+# one page, so a selective data filter returns a partial page and a cursor instead of
+# holding a worker for the whole scan.
+MAX_SCAN_PER_PAGE = 50_000
+
+_MISSING = object()
+
+
+class AuditScanner(Protocol):
+    def scan(
+        self,
+        *,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        trace_id: str | None = None,
+        after: AuditPosition | None = None,
+        actions: list[str] | None = None,
+        actor: str | None = None,
+    ) -> Iterator[tuple[AuditPosition, dict]]: ...
+
+
+class AuditCursorError(ValueError):
+    """The cursor is malformed, or points at a segment that was removed or compacted."""
+
+
+@dataclass(slots=True)
+class AuditQuery:
+    # Glob patterns such as ``trades.place.*``; empty matches every action.
+    actions: list[str] = field(default_factory=list)
+    actor: str | None = None
+    trace_id: str | None = None
+    since: datetime | str | None = None
+    until: datetime | str | None = None
+    # Equality on ``data`` values; dotted keys reach into nested objects.
+    data: dict[str, Any] = field(default_factory=dict)
+
+    def matches(self, entry: dict) -> bool:
+        if self.actions and not any(
+            fnmatchcase(entry.get("action", ""), pattern) for pattern in self.actions
+        ):
+            return False
+        if self.actor is not None and entry.get("actor") != self.actor:
+            return False
+        data = entry.get("data") or {}
+        return all(_lookup(data, key) == value for key, value in self.data.items())
+
+
+@dataclass(slots=True)
+class AuditPage:
+    entries: list[dict]
+    next_cursor: str | None
+    scanned: int
+
+
+def encode_cursor(position: AuditPosition) -> str:
+    raw = json.dumps(list(position), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> AuditPosition:
+    try:
+        segment, offset, generation = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as exc:
+        raise AuditCursorError("invalid audit cursor") from exc
+    if (
+        not isinstance(segment, str)
+        or not isinstance(offset, int)
+        or offset < 0
+        or not isinstance(generation, int)
+    ):
+        raise AuditCursorError("invalid audit cursor")
+    return AuditPosition(segment, offset, generation)
+
+
+def iter_matches(
+    scanner: AuditScanner,
+    query: AuditQuery,
+    *,
+    after: AuditPosition | None = None,
+) -> Iterator[tuple[AuditPosition, dict | None]]:
+    """Yield every scanned position, with the entry when it matches ``query`` else ``None``.
+
+    Non-matching positions are yielded too so callers can bound work and still resume.
+    """
+    for position, entry in scanner.scan(
+        since=query.since,
+        until=query.until,
+        trace_id=query.trace_id,
+        after=after,
+        actions=query.actions,
+        actor=query.actor,
+    ):
+        yield position, entry if query.matches(entry) else None
+
+
+def query_page(
+    scanner: AuditScanner,
+    query: AuditQuery,
+    *,
+    limit: int,
+    cursor: str | None = None,
+    max_scan: int = MAX_SCAN_PER_PAGE,
+) -> AuditPage:
+    """Collect up to ``limit`` matches after ``cursor``, oldest first.
+
+    ``next_cursor`` is set whenever the page stopped early (full or out of scan budget);
+    it is ``None`` once the log is exhausted.
+    """
+    after = decode_cursor(cursor) if cursor is not None else None
+    entries: list[dict] = []
+    scanned = 0
+    try:
+        for position, entry in iter_matches(scanner, query, after=after):
+            scanned += 1
+            if entry is not None:
+                entries.append(entry)
+            if len(entries) >= limit or scanned >= max_scan:
+                next_cursor = encode_cursor(position)
+                return AuditPage(entries=entries, next_cursor=next_cursor, scanned=scanned)
+    except LookupError as exc:
+        raise AuditCursorError(str(exc)) from exc
+    return AuditPage(entries=entries, next_cursor=None, scanned=scanned)
+
+
+def _lookup(data: dict, key: str) -> Any:
+    value: Any = data
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return _MISSING
+        value = value.get(part, _MISSING)
+    return value
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from fnmatch import fnmatchcase
+
+from app.audit.segments import ts_key
+
+
+@dataclass(slots=True, frozen=True)
+class RetentionPolicy:
+    """Per-action retention; the first matching glob wins and unmatched actions are kept."""
+
+    # (action glob, days to keep or None for forever), in precedence order.
+    rules: tuple[tuple[str, int | None], ...] = ()
+
+    @classmethod
+    def from_days(cls, retention_days: Mapping[str, int | None]) -> RetentionPolicy:
+        return cls(rules=tuple(retention_days.items()))
+
+    @property
+    def bounded(self) -> bool:
+        return any(days is not None for _, days in self.rules)
+
+    def days_for(self, action: str) -> int | None:
+        for pattern, days in self.rules:
+            if fnmatchcase(action, pattern):
+                return days
+        return None
+
+    def cutoff_for(self, action: str, now: datetime) -> str | None:
+        days = self.days_for(action)
+        return ts_key(now - timedelta(days=days)) if days is not None else None
+
+    def expired(self, action: str, ts: str, now: datetime) -> bool:
+        cutoff = self.cutoff_for(action, now)
+        return cutoff is not None and ts < cutoff
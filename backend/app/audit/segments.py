@@ -0,0 +1,588 @@
+from __future__ import annotations
+
+import base64
+import bisect
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Literal, NamedTuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional "zstd" extra
+    zstandard = None
+
+if TYPE_CHECKING:
+    from app.audit.retention import RetentionPolicy
+
+# (ts, audit_id, trace_id, action) for one appended line, used to maintain the segment index.
+IndexKey = tuple[str, str, str, str]
+
+SegmentCodec = Literal["none", "gzip", "zstd"]
+
+SEGMENT_PATTERN = re.compile(r"^audit-(\d{6})\.jsonl(\.gz|\.zst)?$")
+SEGMENT_SUFFIXES: dict[str, str] = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+# Entries are timestamped before they reach the writer queue, so concurrent producers can
+# land slightly out of order inside a segment; range scans widen their bounds by this much.
+CLOCK_SKEW = timedelta(seconds=1)
+
+
+class AuditPosition(NamedTuple):
+    """Where an entry ends (segment byte offset, or row seq for SQLite); scans resume after it."""
+
+    segment: str
+    offset: int
+    # Bumped each time compaction rewrites the segment, which moves every offset in it.
+    generation: int = 0
+
+
+def ts_key(value: datetime | str) -> str:
+    """Normalize a timestamp to the UTC ``isoformat`` used by audit entries."""
+    moment = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return moment.astimezone(UTC).isoformat()
+
+
+def audit_id_ts(audit_id: str) -> str | None:
+    """Recover the creation time embedded in time-ordered audit ids (``audit_<ms hex><rand>``)."""
+    encoded = audit_id.removeprefix("audit_")
+    if len(encoded) != 20:
+        return None
+    try:
+        millis = int(encoded[:12], 16)
+    except ValueError:
+        return None
+    return ts_key(datetime.fromtimestamp(millis / 1000, UTC))
+
+
+def _shift(key: str, delta: timedelta) -> str:
+    return ts_key(datetime.fromisoformat(key) + delta)
+
+
+class TraceBloom:
+    def __init__(self, *, bits: int = 8192, hashes: int = 4, data: bytearray | None = None):
+        self.bits = bits
+        self.hashes = hashes
+        self._data = data if data is not None else bytearray((bits + 7) // 8)
+
+    def _positions(self, value: str) -> Iterator[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=4 * self.hashes).digest()
+        for index in range(self.hashes):
+            yield int.from_bytes(digest[index * 4 : index * 4 + 4], "big") % self.bits
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._data[position // 8] |= 1 << (position % 8)
+
+    def might_contain(self, value: str) -> bool:
+        return all(
+            self._data[position // 8] & (1 << (position % 8)) for position in self._positions(value)
+        )
+
+    def as_payload(self) -> dict:
+        return {
+            "bits": self.bits,
+            "hashes": self.hashes,
+            "data": base64.b64encode(bytes(self._data)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> TraceBloom:
+        return cls(
+            bits=payload["bits"],
+            hashes=payload["hashes"],
+            data=bytearray(base64.b64decode(payload["data"])),
+        )
+
+
+@dataclass(slots=True)
+class SegmentIndex:
+    first_ts: str | None = None
+    last_ts: str | None = None
+    count: int = 0
+    size: int = 0
+    # Sparse checkpoints: every ``interval``-th entry's (ts, audit_id, byte offset).
+    offsets: list[tuple[str, str, int]] = field(default_factory=list)
+    traces: TraceBloom = field(default_factory=TraceBloom)
+    # Oldest ts per action, so compaction can tell whether retention would drop anything.
+    # ``None`` for sidecars written before actions were tracked.
+    actions: dict[str, str] | None = field(default_factory=dict)
+    generation: int = 0
+
+    def record(self, key: IndexKey, offset: int, length: int, interval: int) -> None:
+        ts, audit_id, trace_id, action = key
+        if self.count % interval == 0:
+            self.offsets.append((ts, audit_id, offset))
+        if self.first_ts is None:
+            self.first_ts = ts
+        self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+        self.traces.add(trace_id)
+        if self.actions is not None:
+            oldest = self.actions.get(action)
+            if oldest is None or ts < oldest:
+                self.actions[action] = ts
+        self.count += 1
+        self.size = offset + length
+
+    def seek_offset(self, since: str | None) -> int:
+        if since is None or not self.offsets:
+            return 0
+        checkpoints = [ts for ts, _, _ in self.offsets]
+        position = bisect.bisect_left(checkpoints, _shift(since, -CLOCK_SKEW)) - 1
+        return self.offsets[position][2] if position >= 0 else 0
+
+    def as_payload(self) -> dict:
+        return {
+            "firstTs": self.first_ts,
+            "lastTs": self.last_ts,
+            "count": self.count,
+            "size": self.size,
+            "offsets": [list(checkpoint) for checkpoint in self.offsets],
+            "traceBloom": self.traces.as_payload(),
+            "actions": self.actions,
+            "generation": self.generation,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> SegmentIndex:
+        return cls(
+            first_ts=payload["firstTs"],
+            last_ts=payload["lastTs"],
+            count=payload["count"],
+            size=payload["size"],
+            offsets=[(ts, audit_id, offset) for ts, audit_id, offset in payload["offsets"]],
+            traces=TraceBloom.from_payload(payload["traceBloom"]),
+            actions=payload.get("actions"),
+            generation=payload.get("generation", 0),
+        )
+
+
+@dataclass(slots=True)
+class Segment:
+    path: Path
+    index: SegmentIndex | None
+    sealed: bool
+
+    @property
+    def number(self) -> int:
+        return _segment_number(self.path)
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.parent / f"audit-{self.number:06d}.idx.json"
+
+    @property
+    def compressed(self) -> bool:
+        return self.path.suffix in (".gz", ".zst")
+
+    def overlaps(self, since: str | None, until: str | None) -> bool:
+        if self.index is None:
+            return True
+        if self.index.first_ts is None:
+            return False
+        if since is not None and _shift(self.index.last_ts, CLOCK_SKEW) < since:
+            return False
+        if until is not None and _shift(self.index.first_ts, -CLOCK_SKEW) > until:
+            return False
+        return True
+
+    def may_contain_trace(self, trace_id: str) -> bool:
+        return self.index is None or self.index.traces.might_contain(trace_id)
+
+    @property
+    def generation(self) -> int:
+        return self.index.generation if self.index is not None else 0
+
+
+class SegmentedAuditLog:
+    """Audit lines split into size/age-bounded ``audit-NNNNNN.jsonl`` segments.
+
+    Sealed segments get an ``.idx.json`` sidecar with their time range, sparse offsets
+    and a trace-id bloom filter; the active segment keeps the same index in memory.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_seconds: int = 86_400,
+        index_interval: int = 128,
+        legacy_path: Path | None = None,
+    ) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_segment_bytes = max_segment_bytes
+        self._max_segment_seconds = max_segment_seconds
+        self._index_interval = max(index_interval, 1)
+        self._lock = threading.Lock()
+        self._legacy = (
+            Segment(path=legacy_path, index=None, sealed=True)
+            if legacy_path is not None and legacy_path.exists()
+            else None
+        )
+        self._segments = self._load_segments()
+        self._active = self._segments[-1]
+        first_ts = self._active.index.first_ts
+        self._opened_at = datetime.fromisoformat(first_ts).timestamp() if first_ts else time.time()
+        self._file: BinaryIO | None = None
+        active_path = self._active.path
+        if active_path.exists() and active_path.stat().st_size > self._active.index.size:
+            # Drop a torn trailing line left by a crash so new appends start on a line boundary.
+            os.truncate(active_path, self._active.index.size)
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def active_path(self) -> Path:
+        return self._active.path
+
+    def segments(self) -> list[Segment]:
+        with self._lock:
+            segments = list(self._segments)
+        return [self._legacy, *segments] if self._legacy is not None else segments
+
+    def stats(self) -> dict:
+        return {"backend": "jsonl", "segments": len(self.segments())}
+
+    def write_batch(self, lines: list[tuple[str, IndexKey]]) -> None:
+        if self._should_rotate():
+            self._rotate()
+
+        index = self._active.index
+        offset = index.size
+        chunks: list[bytes] = []
+        with self._lock:
+            for line, key in lines:
+                encoded = line.encode("utf-8")
+                index.record(key, offset, len(encoded), self._index_interval)
+                offset += len(encoded)
+                chunks.append(encoded)
+        if self._file is None:
+            self._file = self._active.path.open("ab")
+        self._file.write(b"".join(chunks))
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def sync(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def iter_entries(
+        self,
+        *,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        trace_id: str | None = None,
+    ) -> Iterator[dict]:
+        for _, entry in self.scan(since=since, until=until, trace_id=trace_id):
+            yield entry
+
+    def scan(
+        self,
+        *,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        trace_id: str | None = None,
+        after: AuditPosition | None = None,
+        actions: list[str] | None = None,
+        actor: str | None = None,
+    ) -> Iterator[tuple[AuditPosition, dict]]:
+        since_key = ts_key(since) if since is not None else None
+        until_key = ts_key(until) if until is not None else None
+        stop_key = _shift(until_key, CLOCK_SKEW) if until_key is not None else None
+
+        segments = self.segments()
+        if after is not None:
+            names = [segment.path.name for segment in segments]
+            if after.segment not in names:
+                raise LookupError(f"unknown audit segment: {after.segment}")
+            segments = segments[names.index(after.segment) :]
+            if segments[0].generation != after.generation:
+                raise LookupError(f"audit segment {after.segment} was compacted since")
+
+        for segment in segments:
+            if not segment.overlaps(since_key, until_key):
+                continue
+            if trace_id is not None and not segment.may_contain_trace(trace_id):
+                continue
+            start = segment.index.seek_offset(since_key) if segment.index is not None else 0
+            end = segment.index.size if segment.index is not None else None
+            if after is not None and segment.path.name == after.segment:
+                start = max(start, after.offset)
+            for offset, entry in _read_lines(segment.path, start, end):
+                ts = entry.get("ts", "")
+                if stop_key is not None and segment.index is not None and ts > stop_key:
+                    break
+                if since_key is not None and ts < since_key:
+                    continue
+                if until_key is not None and ts > until_key:
+                    continue
+                if trace_id is not None and entry.get("trace_id") != trace_id:
+                    continue
+                if actions and not any(
+                    fnmatchcase(entry.get("action", ""), pattern) for pattern in actions
+                ):
+                    continue
+                if actor is not None and entry.get("actor") != actor:
+                    continue
+                yield AuditPosition(segment.path.name, offset, segment.generation), entry
+
+    def find(self, audit_id: str) -> dict | None:
+        created_at = audit_id_ts(audit_id)
+        window: dict[str, str] = {}
+        if created_at is not None:
+            window = {
+                "since": _shift(created_at, -CLOCK_SKEW),
+                "until": _shift(created_at, CLOCK_SKEW),
+            }
+        for entry in self.iter_entries(**window):
+            if entry.get("audit_id") == audit_id:
+                return entry
+        return None
+
+    def _should_rotate(self) -> bool:
+        index = self._active.index
+        if index.count == 0:
+            return False
+        if index.size >= self._max_segment_bytes:
+            return True
+        return time.time() - self._opened_at >= self._max_segment_seconds
+
+    def _rotate(self) -> None:
+        self.close()
+        self._seal(self._active)
+        next_number = _segment_number(self._active.path) + 1
+        segment = Segment(
+            path=self._directory / f"audit-{next_number:06d}.jsonl",
+            index=SegmentIndex(),
+            sealed=False,
+        )
+        with self._lock:
+            self._segments.append(segment)
+            self._active = segment
+        self._opened_at = time.time()
+
+    def compact(
+        self,
+        retention: RetentionPolicy,
+        *,
+        codec: SegmentCodec = "gzip",
+        now: datetime | None = None,
+    ) -> dict:
+        """Compress sealed segments and drop entries past their action's retention.
+
+        The active segment is never touched, so this can run beside the writer thread.
+        """
+        now = now or datetime.now(UTC)
+        stats = {"rewritten": 0, "removedSegments": 0, "removedEntries": 0}
+        with self._lock:
+            sealed = [segment for segment in self._segments if segment.sealed]
+        for segment in sealed:
+            expiring = self._has_expired_entries(segment, retention, now)
+            if not expiring and (segment.compressed or codec == "none"):
+                continue
+            removed = self._rewrite(segment, retention, codec, now)
+            stats["removedEntries"] += removed
+            if segment.path.exists():
+                stats["rewritten"] += 1
+            else:
+                stats["removedSegments"] += 1
+        return stats
+
+    def _has_expired_entries(
+        self,
+        segment: Segment,
+        retention: RetentionPolicy,
+        now: datetime,
+    ) -> bool:
+        if not retention.bounded:
+            return False
+        if segment.index.actions is None:
+            return True
+        return any(
+            retention.expired(action, oldest, now)
+            for action, oldest in segment.index.actions.items()
+        )
+
+    def _rewrite(
+        self,
+        segment: Segment,
+        retention: RetentionPolicy,
+        codec: SegmentCodec,
+        now: datetime,
+    ) -> int:
+        target = self._directory / f"audit-{segment.number:06d}.jsonl{SEGMENT_SUFFIXES[codec]}"
+        temp_path = target.with_name(target.name + ".tmp")
+        index = SegmentIndex(generation=segment.generation + 1)
+        removed = 0
+        with _open_segment(temp_path, "wb") as output:
+            offset = 0
+            for raw_line in _iter_raw_lines(segment.path, segment.index.size):
+                entry = json.loads(raw_line)
+                if retention.expired(entry.get("action", ""), entry["ts"], now):
+                    removed += 1
+                    continue
+                index.record(_entry_key(entry), offset, len(raw_line), self._index_interval)
+                output.write(raw_line)
+                offset += len(raw_line)
+            index.size = offset
+
+        if index.count == 0:
+            temp_path.unlink()
+            with self._lock:
+                self._segments.remove(segment)
+            # Data first: a sidecar without its data file is discarded on load.
+            segment.path.unlink()
+            segment.index_path.unlink()
+            return removed
+
+        replacement = Segment(path=target, index=index, sealed=True)
+        os.replace(temp_path, target)
+        self._seal(replacement)
+        with self._lock:
+            self._segments[self._segments.index(segment)] = replacement
+        if target != segment.path:
+            segment.path.unlink()
+        return removed
+
+    def _seal(self, segment: Segment) -> None:
+        payload = {
+            **segment.index.as_payload(),
+            "file": segment.path.name,
+            "fileBytes": segment.path.stat().st_size if segment.path.exists() else 0,
+        }
+        temp_path = segment.index_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(temp_path, segment.index_path)
+        segment.sealed = True
+
+    def _load_segments(self) -> list[Segment]:
+        candidates: dict[int, list[Path]] = {}
+        for path in self._directory.glob("audit-*.jsonl*"):
+            if SEGMENT_PATTERN.match(path.name):
+                candidates.setdefault(_segment_number(path), []).append(path)
+        for index_path in self._directory.glob("audit-*.idx.json"):
+            number = int(index_path.name[len("audit-") :].split(".", 1)[0])
+            if number not in candidates:
+                index_path.unlink()
+
+        segments = [self._load_segment(number, candidates[number]) for number in sorted(candidates)]
+        if not segments or segments[-1].sealed:
+            next_number = segments[-1].number + 1 if segments else 1
+            path = self._directory / f"audit-{next_number:06d}.jsonl"
+            segments.append(Segment(path=path, index=SegmentIndex(), sealed=False))
+        return segments
+
+    def _load_segment(self, number: int, paths: list[Path]) -> Segment:
+        index_path = self._directory / f"audit-{number:06d}.idx.json"
+        if not index_path.exists():
+            path = min(paths, key=lambda candidate: candidate.name)
+            return Segment(path=path, index=self._rebuild_index(path), sealed=False)
+
+        payload = json.loads(index_path.read_text(encoding="utf-8"))
+        named = self._directory / payload.get("file", f"audit-{number:06d}.jsonl")
+        size = named.stat().st_size if named in paths else None
+        if size is not None and payload.get("fileBytes", size) == size:
+            segment = Segment(path=named, index=SegmentIndex.from_payload(payload), sealed=True)
+        else:
+            # Compaction stopped after moving its output into place but before the sidecar
+            # caught up; that output is complete, so index it and seal again.
+            chosen = max(paths, key=lambda candidate: len(candidate.name))
+            segment = Segment(path=chosen, index=self._rebuild_index(chosen), sealed=True)
+            self._seal(segment)
+        for path in paths:
+            if path != segment.path:
+                path.unlink()
+        return segment
+
+    def _rebuild_index(self, path: Path) -> SegmentIndex:
+        index = SegmentIndex()
+        offset = 0
+        for raw_line in _iter_raw_lines(path, None):
+            if raw_line.strip():
+                key = _entry_key(json.loads(raw_line))
+                index.record(key, offset, len(raw_line), self._index_interval)
+            offset += len(raw_line)
+        index.size = offset
+        return index
+
+
+def _segment_number(path: Path) -> int:
+    return int(SEGMENT_PATTERN.match(path.name).group(1))
+
+
+def _entry_key(entry: dict) -> IndexKey:
+    return entry["ts"], entry["audit_id"], entry["trace_id"], entry.get("action", "")
+
+
+def _open_segment(path: Path, mode: Literal["rb", "wb"]) -> BinaryIO:
+    name = path.name.removesuffix(".tmp")
+    if name.endswith(".gz"):
+        return gzip.open(path, mode)
+    if name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstd audit segments require the zstandard package")
+        if mode == "wb":
+            return zstandard.ZstdCompressor().stream_writer(path.open("wb"), closefd=True)
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(path.open("rb")))
+    return path.open(mode)
+
+
+def _iter_raw_lines(path: Path, end: int | None) -> Iterator[bytes]:
+    """Complete lines of a segment (decompressed) up to ``end``; a torn tail is skipped."""
+    position = 0
+    with _open_segment(path, "rb") as file:
+        for raw_line in file:
+            position += len(raw_line)
+            if (end is not None and position > end) or not raw_line.endswith(b"\n"):
+                return
+            yield raw_line
+
+
+def _skip_to(file: BinaryIO, offset: int) -> None:
+    """Move to a decompressed offset; zstd streams cannot seek, so they read forward."""
+    if file.seekable():
+        file.seek(offset)
+        return
+    while offset > 0:
+        skipped = len(file.read(min(offset, 1 << 20)))
+        if not skipped:
+            return
+        offset -= skipped
+
+
+def _read_lines(path: Path, start: int, end: int | None) -> Iterator[tuple[int, dict]]:
+    if not path.exists():
+        return
+    with _open_segment(path, "rb") as file:
+        _skip_to(file, start)
+        position = start
+        for raw_line in file:
+            position += len(raw_line)
+            if (end is not None and position > end) or not raw_line.endswith(b"\n"):
+                return
+            clean_line = raw_line.strip()
+            if clean_line:
+                yield position, json.loads(clean_line)
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from app.audit.segments import (
+    CLOCK_SKEW,
+    AuditPosition,
+    IndexKey,
+    SegmentCodec,
+    audit_id_ts,
+    ts_key,
+)
+from app.audit.writer import AuditCommitError
+
+if TYPE_CHECKING:
+    from app.audit.retention import RetentionPolicy
+
+# Level-0 ("none") batches are never flushed by the writer, so rows buffered past this
+# many are committed on the next batch to keep memory bounded.
+AUTOCOMMIT_ROWS = 4096
+
+_INSERT = """
+    INSERT INTO audit_entries(ts, audit_id, trace_id, action, actor, entry)
+    VALUES(:ts, :audit_id, :trace_id, :action, json_extract(:entry, '$.actor'), :entry)
+"""
+
+
+class SqliteAuditLog:
+    """Audit entries in one SQLite table (WAL mode) indexed on ts, action and trace_id.
+
+    Rows are buffered per writer batch and inserted with ``executemany`` in a single
+    transaction when the writer flushes or syncs.
+    """
+
+    def __init__(self, db_path: str | Path) -> None:
+        self._db_path = Path(db_path)
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self._db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._full_sync = False
+        self._pending: list[dict[str, str]] = []
+        self._initialize_schema()
+
+    def _initialize_schema(self) -> None:
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS audit_entries (
+              seq INTEGER PRIMARY KEY,
+              ts TEXT NOT NULL,
+              audit_id TEXT NOT NULL,
+              trace_id TEXT NOT NULL,
+              action TEXT NOT NULL,
+              actor TEXT NOT NULL,
+              entry TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS audit_entries_ts ON audit_entries(ts);
+            CREATE INDEX IF NOT EXISTS audit_entries_action ON audit_entries(action, ts);
+            CREATE INDEX IF NOT EXISTS audit_entries_trace ON audit_entries(trace_id);
+            """
+        )
+
+    @property
+    def directory(self) -> Path:
+        return self._db_path.parent
+
+    @property
+    def active_path(self) -> Path:
+        return self._db_path
+
+    def write_batch(self, lines: list[tuple[str, IndexKey]]) -> None:
+        # Commit what earlier unflushed batches left behind before adding this one, so a
+        # following sync() always covers the rows of the batch that asked for it.
+        if len(self._pending) >= AUTOCOMMIT_ROWS:
+            try:
+                self._commit(full_sync=False)
+            except AuditCommitError as exc:
+                # This batch never made it into the buffer, so it is lost with the rest.
+                exc.dropped_lines += len(lines)
+                raise
+        self._pending.extend(
+            {"ts": ts, "audit_id": audit_id, "trace_id": trace_id, "action": action, "entry": line}
+            for line, (ts, audit_id, trace_id, action) in lines
+        )
+
+    def flush(self) -> None:
+        self._commit(full_sync=False)
+
+    def sync(self) -> None:
+        self._commit(full_sync=True)
+
+    def close(self) -> None:
+        self._commit(full_sync=False)
+        self._conn.close()
+
+    def stats(self) -> dict[str, Any]:
+        conn = self._reader()
+        try:
+            (last_seq,) = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM audit_entries").fetchone()
+        finally:
+            conn.close()
+        return {"backend": "sqlite", "lastSeq": last_seq}
+
+    def iter_entries(
+        self,
+        *,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        trace_id: str | None = None,
+    ) -> Iterator[dict]:
+        for _, entry in self.scan(since=since, until=until, trace_id=trace_id):
+            yield entry
+
+    def scan(
+        self,
+        *,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        trace_id: str | None = None,
+        after: AuditPosition | None = None,
+        actions: list[str] | None = None,
+        actor: str | None = None,
+        audit_id: str | None = None,
+    ) -> Iterator[tuple[AuditPosition, dict]]:
+        clauses: list[str] = []
+        args: list[Any] = []
+        if after is not None:
+            if after.segment != self._db_path.name:
+                raise LookupError(f"unknown audit segment: {after.segment}")
+            clauses.append("seq > ?")
+            args.append(after.offset)
+        if since is not None:
+            clauses.append("ts >= ?")
+            args.append(ts_key(since))
+        if until is not None:
+            clauses.append("ts <= ?")
+            args.append(ts_key(until))
+        if trace_id is not None:
+            clauses.append("trace_id = ?")
+            args.append(trace_id)
+        if actions:
+            clauses.append("(" + " OR ".join("action GLOB ?" for _ in actions) + ")")
+            args.extend(actions)
+        if actor is not None:
+            clauses.append("actor = ?")
+            args.append(actor)
+        if audit_id is not None:
+            clauses.append("audit_id = ?")
+            args.append(audit_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = self._reader()
+        try:
+            query = f"SELECT seq, entry FROM audit_entries {where} ORDER BY seq"
+            for seq, entry in conn.execute(query, args):
+                yield AuditPosition(self._db_path.name, seq), json.loads(entry)
+        finally:
+            conn.close()
+
+    def find(self, audit_id: str) -> dict | None:
+        window: dict[str, datetime] = {}
+        if (created_at := audit_id_ts(audit_id)) is not None:
+            moment = datetime.fromisoformat(created_at)
+            window = {"since": moment - CLOCK_SKEW, "until": moment + CLOCK_SKEW}
+        matches = [entry for _, entry in self.scan(audit_id=audit_id, **window)]
+        return matches[0] if matches else None
+
+    def compact(
+        self,
+        retention: RetentionPolicy,
+        *,
+        codec: SegmentCodec = "gzip",
+        now: datetime | None = None,
+    ) -> dict:
+        """Delete rows past their action's retention; ``codec`` only applies to JSONL segments."""
+        now = now or datetime.now(UTC)
+        removed = 0
+        earlier: list[str] = []
+        conn = self._reader()
+        try:
+            with conn:
+                for pattern, days in retention.rules:
+                    if days is not None:
+                        # An earlier rule takes precedence, so its actions are excluded here.
+                        shadowed = "".join(" AND action NOT GLOB ?" for _ in earlier)
+                        cursor = conn.execute(
+                            f"DELETE FROM audit_entries WHERE action GLOB ?{shadowed} AND ts < ?",
+                            [pattern, *earlier, ts_key(now - timedelta(days=days))],
+                        )
+                        removed += cursor.rowcount
+                    earlier.append(pattern)
+        finally:
+            conn.close()
+        return {"rewritten": 0, "removedSegments": 0, "removedEntries": removed}
+
+    def _reader(self) -> sqlite3.Connection:
+        # Readers get their own connection; WAL lets them run alongside the writer.
+        return sqlite3.connect(self._db_path, check_same_thread=False)
+
+    def _commit(self, *, full_sync: bool) -> None:
+        if not self._pending:
+            return
+        if full_sync != self._full_sync:
+            # The safety level cannot change inside a transaction, so set it up front.
+            self._conn.execute(f"PRAGMA synchronous={'FULL' if full_sync else 'NORMAL'}")
+            self._full_sync = full_sync
+        # The rows leave the buffer either way: retrying a batch that failed (e.g. on one
+        # malformed row) would block every later commit and grow the buffer without bound.
+        pending, self._pending = self._pending, []
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(_INSERT, pending)
+            self._conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            raise AuditCommitError(
+                f"audit commit failed: {exc}", dropped_lines=len(pending)
+            ) from exc
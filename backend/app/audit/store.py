@@ -1,11 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import Literal, Protocol
 from uuid import uuid4
 
+from app.audit.query import AuditPage, AuditQuery, query_page
+from app.audit.retention import RetentionPolicy
+from app.audit.segments import AuditPosition, SegmentCodec, SegmentedAuditLog, zstandard
+from app.audit.sqlite_log import SqliteAuditLog
+from app.audit.writer import AuditDurability, AuditSink, GroupCommitWriter
+
+AuditBackend = Literal["jsonl", "sqlite"]
+
 
 @dataclass(slots=True)
 class AuditEntry:
@@ -17,40 +30,218 @@ class AuditEntry:
     data: dict
 
 
+AuditObserver = Callable[[AuditEntry, float], None]
+
+
+class AuditLog(AuditSink, Protocol):
+    @property
+    def directory(self) -> Path: ...
+
+    @property
+    def active_path(self) -> Path: ...
+
+    def scan(
+        self,
+        *,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        trace_id: str | None = None,
+        after: AuditPosition | None = None,
+        actions: list[str] | None = None,
+        actor: str | None = None,
+    ) -> Iterator[tuple[AuditPosition, dict]]: ...
+
+    def iter_entries(
+        self,
+        *,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        trace_id: str | None = None,
+    ) -> Iterator[dict]: ...
+
+    def find(self, audit_id: str) -> dict | None: ...
+
+    def stats(self) -> dict: ...
+
+    def compact(
+        self,
+        retention: RetentionPolicy,
+        *,
+        codec: SegmentCodec = "gzip",
+        now: datetime | None = None,
+    ) -> dict: ...
+
+
 class AuditStore:
-    def __init__(self, *, data_dir: str | Path):
+    def __init__(
+        self,
+        *,
+        data_dir: str | Path,
+        on_append: AuditObserver | None = None,
+        backend: AuditBackend = "jsonl",
+        durability: AuditDurability = "flush",
+        max_batch: int = 512,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_seconds: int = 86_400,
+        index_interval: int = 128,
+        compression: SegmentCodec = "gzip",
+        retention_days: dict[str, int | None] | None = None,
+    ):
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd audit compression requires the zstandard package")
         self._data_dir = Path(data_dir)
         self._data_dir.mkdir(parents=True, exist_ok=True)
-        self._audit_path = self._data_dir / "audit.jsonl"
+        self._on_append = on_append
+        self._compression = compression
+        self._retention = RetentionPolicy.from_days(retention_days or {})
+        self._last_compaction: dict | None = None
+        self._log: AuditLog
+        if backend == "sqlite":
+            self._log = SqliteAuditLog(self._data_dir / "audit.db")
+        else:
+            self._log = SegmentedAuditLog(
+                self._data_dir / "audit",
+                max_segment_bytes=max_segment_bytes,
+                max_segment_seconds=max_segment_seconds,
+                index_interval=index_interval,
+                legacy_path=self._data_dir / "audit.jsonl",
+            )
+        self._writer = GroupCommitWriter(
+            self._log,
+            durability=durability,
+            max_batch=max_batch,
+        )
+
+    @property
+    def audit_dir(self) -> Path:
+        return self._log.directory
 
     @property
     def audit_path(self) -> Path:
-        return self._audit_path
+        return self._log.active_path
+
+    @property
+    def durability(self) -> AuditDurability:
+        return self._writer.durability
 
     def append(self, *, actor: str, action: str, trace_id: str, data: dict) -> AuditEntry:
-        entry = AuditEntry(
-            audit_id=f"audit_{uuid4().hex[:12]}",
-            ts=datetime.now(UTC).isoformat(),
+        started = time.perf_counter()
+        entry, _ = self._submit(actor=actor, action=action, trace_id=trace_id, data=data)
+        self._observe(entry, started)
+        return entry
+
+    async def append_durable(
+        self,
+        *,
+        actor: str,
+        action: str,
+        trace_id: str,
+        data: dict,
+    ) -> AuditEntry:
+        started = time.perf_counter()
+        entry, ack = self._submit(
             actor=actor,
             action=action,
             trace_id=trace_id,
             data=data,
+            durable=True,
         )
+        await asyncio.wrap_future(ack)
+        # The wait for the fsync is the cost of a durable entry, not the enqueue.
+        self._observe(entry, started)
+        return entry
 
-        with self._audit_path.open("a", encoding="utf-8") as file:
-            file.write(json.dumps(asdict(entry), separators=(",", ":")) + "\n")
+    def flush(self) -> None:
+        self._writer.flush()
 
-        return entry
+    def close(self) -> None:
+        self._writer.close()
 
     def read_all(self) -> list[dict]:
-        if not self._audit_path.exists():
-            return []
-
-        entries: list[dict] = []
-        with self._audit_path.open("r", encoding="utf-8") as file:
-            for line in file:
-                clean_line = line.strip()
-                if not clean_line:
-                    continue
-                entries.append(json.loads(clean_line))
-        return entries
+        return list(self.iter_entries())
+
+    def iter_entries(
+        self,
+        *,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        trace_id: str | None = None,
+    ) -> Iterator[dict]:
+        self._writer.flush()
+        return self._log.iter_entries(since=since, until=until, trace_id=trace_id)
+
+    def scan(
+        self,
+        *,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        trace_id: str | None = None,
+        after: AuditPosition | None = None,
+        actions: list[str] | None = None,
+        actor: str | None = None,
+    ) -> Iterator[tuple[AuditPosition, dict]]:
+        self._writer.flush()
+        return self._log.scan(
+            since=since,
+            until=until,
+            trace_id=trace_id,
+            after=after,
+            actions=actions,
+            actor=actor,
+        )
+
+    def query(self, query: AuditQuery, *, limit: int, cursor: str | None = None) -> AuditPage:
+        return query_page(self, query, limit=limit, cursor=cursor)
+
+    def find(self, audit_id: str) -> dict | None:
+        self._writer.flush()
+        return self._log.find(audit_id)
+
+    def compact(self, *, now: datetime | None = None) -> dict:
+        """Apply retention and compress closed segments; safe to run beside appends."""
+        now = now or datetime.now(UTC)
+        result = self._log.compact(self._retention, codec=self._compression, now=now)
+        self._last_compaction = {"at": now.isoformat(), **result}
+        return result
+
+    def metrics(self) -> dict:
+        return {
+            **self._log.stats(),
+            "durability": self._writer.durability,
+            "batches": self._writer.batches,
+            "lines": self._writer.lines,
+            "droppedLines": self._writer.dropped_lines,
+            "lastCommitError": self._writer.last_error,
+            "lastCompaction": self._last_compaction,
+        }
+
+    def _submit(
+        self,
+        *,
+        actor: str,
+        action: str,
+        trace_id: str,
+        data: dict,
+        durable: bool = False,
+    ) -> tuple[AuditEntry, Future[None] | None]:
+        now = datetime.now(UTC)
+        entry = AuditEntry(
+            # Time-ordered ids let lookups by audit_id seek through the segment index.
+            audit_id=f"audit_{int(now.timestamp() * 1000):012x}{uuid4().hex[:8]}",
+            ts=now.isoformat(),
+            actor=actor,
+            action=action,
+            trace_id=trace_id,
+            data=data,
+        )
+
+        ack = self._writer.submit(
+            json.dumps(asdict(entry), separators=(",", ":")) + "\n",
+            (entry.ts, entry.audit_id, entry.trace_id, entry.action),
+            durable=durable,
+        )
+        return entry, ack
+
+    def _observe(self, entry: AuditEntry, started: float) -> None:
+        if self._on_append is not None:
+            self._on_append(entry, (time.perf_counter() - started) * 1000)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Literal, Protocol
+
+from app.audit.segments import IndexKey
+
+AuditDurability = Literal["none", "flush", "fsync"]
+
+_DURABILITY_LEVEL: dict[str, int] = {"none": 0, "flush": 1, "fsync": 2}
+
+logger = logging.getLogger(__name__)
+
+
+class AuditCommitError(Exception):
+    """A sink discarded ``dropped_lines`` buffered lines after failing to commit them."""
+
+    def __init__(self, message: str, *, dropped_lines: int) -> None:
+        super().__init__(message)
+        self.dropped_lines = dropped_lines
+
+
+class AuditSink(Protocol):
+    def write_batch(self, lines: list[tuple[str, IndexKey]]) -> None: ...
+
+    def flush(self) -> None: ...
+
+    def sync(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+@dataclass(slots=True)
+class _PendingWrite:
+    line: str | None
+    key: IndexKey | None
+    level: int
+    ack: Future[None] | None
+
+
+class GroupCommitWriter:
+    """Background thread that owns the sink and commits queued lines in batches."""
+
+    def __init__(
+        self,
+        sink: AuditSink,
+        *,
+        durability: AuditDurability = "flush",
+        max_batch: int = 512,
+    ) -> None:
+        self._sink = sink
+        self._level = _DURABILITY_LEVEL[durability]
+        self.durability = durability
+        self._max_batch = max(max_batch, 1)
+        self._pending: list[_PendingWrite] = []
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self.batches = 0
+        self.lines = 0
+        # Lines of batches whose commit raised; non-durable ones have nobody to tell.
+        self.dropped_lines = 0
+        self.last_error: str | None = None
+
+    def submit(self, line: str, key: IndexKey, *, durable: bool = False) -> Future[None] | None:
+        """Queue ``line``; with ``durable`` the returned future resolves once it is fsynced."""
+        ack: Future[None] | None = Future() if durable else None
+        level = 2 if durable else self._level
+        self._enqueue(_PendingWrite(line=line, key=key, level=level, ack=ack))
+        return ack
+
+    def flush(self) -> None:
+        """Block until everything submitted so far is written and visible to readers."""
+        if self._thread is None:
+            return
+        ack: Future[None] = Future()
+        self._enqueue(_PendingWrite(line=None, key=None, level=1, ack=ack))
+        ack.result()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self._sink.close()
+
+    def _enqueue(self, pending: _PendingWrite) -> None:
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("audit writer is closed")
+            self._pending.append(pending)
+            if len(self._pending) > 1:
+                # The writer only sleeps on an empty queue, so it is already awake.
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending and self._closed:
+                    return
+                batch = self._pending[: self._max_batch]
+                del self._pending[: self._max_batch]
+
+            try:
+                self._commit(batch)
+            except BaseException as exc:
+                if isinstance(exc, AuditCommitError):
+                    # The sink also gave up on lines it buffered from earlier batches.
+                    dropped = exc.dropped_lines
+                else:
+                    dropped = sum(1 for pending in batch if pending.line is not None)
+                self.dropped_lines += dropped
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                logger.exception("audit commit failed; %d line(s) may be lost", dropped)
+                for pending in batch:
+                    if pending.ack is not None and not pending.ack.done():
+                        pending.ack.set_exception(exc)
+                continue
+
+            for pending in batch:
+                if pending.ack is not None:
+                    pending.ack.set_result(None)
+
+    def _commit(self, batch: list[_PendingWrite]) -> None:
+        lines = [(pending.line, pending.key) for pending in batch if pending.line is not None]
+        if lines:
+            self._sink.write_batch(lines)
+            self.lines += len(lines)
+        self.batches += 1
+
+        level = max(pending.level for pending in batch)
+        if level >= 2:
+            self._sink.sync()
+        elif level >= 1:
+            self._sink.flush()
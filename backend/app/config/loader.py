@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import json5
 from pydantic import BaseModel, ConfigDict, Field, ValidationError
@@ -21,12 +21,80 @@ class GatewayAuthConfig(BaseModel):
     token: str = Field(min_length=1)
 
 
+class GatewayPipelineConfig(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    enabled: bool = True
+    max_in_flight: int = Field(alias="maxInFlight", default=16, ge=1)
+
+
+class WorkerPoolConfig(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    kind: Literal["thread", "process"] = "thread"
+    max_workers: int = Field(alias="maxWorkers", default=2, ge=1)
+
+
+class GatewayWorkersConfig(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    cpu: WorkerPoolConfig = Field(default_factory=WorkerPoolConfig)
+    io_max_workers: int = Field(alias="ioMaxWorkers", default=4, ge=1)
+
+
+class GatewayCompressionConfig(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    enabled: bool = True
+    threshold_bytes: int = Field(alias="thresholdBytes", default=8192, ge=0)
+    level: int = Field(default=6, ge=1, le=9)
+
+
+class GatewayEventsConfig(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    max_queue: int = Field(alias="maxQueue", default=1024, ge=1)
+    max_bytes: int = Field(alias="maxBytes", default=1_048_576, ge=1)
+    slow_consumer_policy: Literal["coalesce", "drop_oldest", "disconnect"] = Field(
+        alias="slowConsumerPolicy",
+        default="coalesce",
+    )
+    coalesce_topics: list[str] = Field(
+        alias="coalesceTopics",
+        default_factory=lambda: ["market.tick", "event.market.tick"],
+    )
+
+
 class GatewayConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     host: str = Field(min_length=1)
     port: int = Field(ge=1, le=65535)
     auth: GatewayAuthConfig
+    pipeline: GatewayPipelineConfig = Field(default_factory=GatewayPipelineConfig)
+    workers: GatewayWorkersConfig = Field(default_factory=GatewayWorkersConfig)
+    compression: GatewayCompressionConfig = Field(default_factory=GatewayCompressionConfig)
+    events: GatewayEventsConfig = Field(default_factory=GatewayEventsConfig)
 
 
 class PluginsConfig(BaseModel):
@@ -79,6 +147,74 @@ class FeedsConfig(BaseModel):
     priceTicks: FeedPriceTicksConfig = Field(default_factory=FeedPriceTicksConfig)
 
 
+class AuditCompactionConfig(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    enabled: bool = True
+    interval_seconds: int = Field(alias="intervalSeconds", default=3600, ge=1)
+    codec: Literal["none", "gzip", "zstd"] = "gzip"
+    # Empty keeps everything: deleting history has to be asked for.
+    retention_days: dict[str, int | None] = Field(alias="retentionDays", default_factory=dict)
+
+
+class AuditConfig(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    backend: Literal["jsonl", "sqlite"] = "jsonl"
+    durability: Literal["none", "flush", "fsync"] = "flush"
+    max_batch: int = Field(alias="maxBatch", default=512, ge=1)
+    max_segment_bytes: int = Field(alias="maxSegmentBytes", default=64 * 1024 * 1024, ge=1)
+    max_segment_seconds: int = Field(alias="maxSegmentSeconds", default=86_400, ge=1)
+    index_interval: int = Field(alias="indexInterval", default=128, ge=1)
+    compaction: AuditCompactionConfig = Field(default_factory=AuditCompactionConfig)
+
+
+class StateStorageConfig(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    backend: Literal["json", "sqlite"] = "json"
+    fsync: bool = True
+    coalesce_ms: int = Field(alias="coalesceMs", default=0, ge=0)
+
+
+class StorageConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    state: StateStorageConfig = Field(default_factory=StateStorageConfig)
+
+
+class MemoryWatcherConfig(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    backend: Literal["auto", "inotify", "poll"] = "auto"
+    poll_seconds: float = Field(alias="pollSeconds", default=2.0, gt=0)
+    debounce_ms: int = Field(alias="debounceMs", default=200, ge=0)
+    max_workspaces: int = Field(alias="maxWorkspaces", default=256, ge=1)
+
+
+class MemoryConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    partitioning: Literal["shared", "per_workspace"] = "shared"
+    watcher: MemoryWatcherConfig = Field(default_factory=MemoryWatcherConfig)
+
+
 class AppConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -86,6 +222,9 @@ class AppConfig(BaseModel):
     plugins: PluginsConfig = Field(default_factory=PluginsConfig)
     accounts: list[AccountConfig] = Field(default_factory=list)
     feeds: FeedsConfig = Field(default_factory=FeedsConfig)
+    audit: AuditConfig = Field(default_factory=AuditConfig)
+    storage: StorageConfig = Field(default_factory=StorageConfig)
+    memory: MemoryConfig = Field(default_factory=MemoryConfig)
 
 
 _ENV_PATTERN = re.compile(r"\$\{([A-Z0-9_]+)\}")
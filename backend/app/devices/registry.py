@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-import json
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 
+from app.storage.state_file import StateFile
+from app.storage.state_store import SqliteStateStore, load_records
+
 
 @dataclass(slots=True)
 class PairedDevice:
@@ -17,11 +19,22 @@ class PairedDevice:
 
 
 class DeviceRegistry:
-    def __init__(self, *, state_path: str | Path | None = None) -> None:
+    def __init__(
+        self,
+        *,
+        state_path: str | Path | None = None,
+        state_store: SqliteStateStore | None = None,
+        fsync: bool = True,
+        coalesce_seconds: float = 0.0,
+    ) -> None:
         self._devices: dict[str, PairedDevice] = {}
-        self._state_path = Path(state_path) if state_path is not None else None
-        if self._state_path is not None:
-            self._state_path.parent.mkdir(parents=True, exist_ok=True)
+        self._state_file = (
+            StateFile(state_path, fsync=fsync, coalesce_seconds=coalesce_seconds)
+            if state_path is not None
+            else None
+        )
+        self._state_store = state_store
+        if self._state_file is not None or self._state_store is not None:
             self._load()
 
     def pair(self, *, device_id: str, platform: str, label: str, push_token: str) -> PairedDevice:
@@ -42,7 +55,7 @@ class DeviceRegistry:
             current.push_token = push_token
             current.last_seen_at = now
         self._devices[device_id] = current
-        self._save()
+        self._save(current)
         return current
 
     def list(self) -> list[PairedDevice]:
@@ -51,7 +64,7 @@ class DeviceRegistry:
     def unpair(self, *, device_id: str) -> bool:
         removed = self._devices.pop(device_id, None) is not None
         if removed:
-            self._save()
+            self._delete(device_id)
         return removed
 
     def register_push(self, *, device_id: str, push_token: str) -> PairedDevice | None:
@@ -60,7 +73,7 @@ class DeviceRegistry:
             return None
         device.push_token = push_token
         device.last_seen_at = datetime.now(UTC).isoformat()
-        self._save()
+        self._save(device)
         return device
 
     def notify_test(self, *, device_id: str, message: str) -> dict:
@@ -68,7 +81,7 @@ class DeviceRegistry:
         if device is None:
             return {"status": "missing_device", "deviceId": device_id}
         device.last_seen_at = datetime.now(UTC).isoformat()
-        self._save()
+        self._save(device)
         return {"status": "queued", "deviceId": device_id, "message": message}
 
     @staticmethod
@@ -82,21 +95,18 @@ class DeviceRegistry:
             "lastSeenAt": payload["last_seen_at"],
         }
 
-    def _load(self) -> None:
-        if self._state_path is None or not self._state_path.exists():
-            return
-        try:
-            payload = json.loads(self._state_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            return
-
-        devices_payload = payload.get("devices")
-        if not isinstance(devices_payload, list):
-            return
+    def close(self) -> None:
+        """Write any coalesced save still waiting for its tick."""
+        if self._state_file is not None:
+            self._state_file.close()
 
-        for raw_device in devices_payload:
-            if not isinstance(raw_device, dict):
-                continue
+    def _load(self) -> None:
+        for raw_device in load_records(
+            "devices",
+            key_field="deviceId",
+            state_file=self._state_file,
+            state_store=self._state_store,
+        ):
             try:
                 device = PairedDevice(
                     device_id=str(raw_device["deviceId"]),
@@ -110,24 +120,34 @@ class DeviceRegistry:
                 continue
             self._devices[device.device_id] = device
 
-    def _save(self) -> None:
-        if self._state_path is None:
+    def _save(self, changed: PairedDevice) -> None:
+        if self._state_store is not None:
+            self._state_store.put("devices", changed.device_id, _device_record(changed))
+            return
+        self._save_all()
+
+    def _delete(self, device_id: str) -> None:
+        if self._state_store is not None:
+            self._state_store.delete("devices", device_id)
+            return
+        self._save_all()
+
+    def _save_all(self) -> None:
+        if self._state_file is None:
             return
         payload = {
             "version": 1,
-            "devices": [
-                {
-                    "deviceId": device.device_id,
-                    "platform": device.platform,
-                    "label": device.label,
-                    "pushToken": device.push_token,
-                    "pairedAt": device.paired_at,
-                    "lastSeenAt": device.last_seen_at,
-                }
-                for device in self._devices.values()
-            ],
+            "devices": [_device_record(device) for device in self._devices.values()],
         }
-        self._state_path.write_text(
-            json.dumps(payload, separators=(",", ":")),
-            encoding="utf-8",
-        )
+        self._state_file.save(payload)
+
+
+def _device_record(device: PairedDevice) -> dict:
+    return {
+        "deviceId": device.device_id,
+        "platform": device.platform,
+        "label": device.label,
+        "pushToken": device.push_token,
+        "pairedAt": device.paired_at,
+        "lastSeenAt": device.last_seen_at,
+    }
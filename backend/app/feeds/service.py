@@ -88,6 +88,16 @@ class FeedService:
 
         return candles
 
+    @staticmethod
+    def as_columnar_candles(candles: list[dict]) -> dict[str, list]:
+        return {
+            "ts": [candle["ts"] for candle in candles],
+            "open": [candle["open"] for candle in candles],
+            "high": [candle["high"] for candle in candles],
+            "low": [candle["low"] for candle in candles],
+            "close": [candle["close"] for candle in candles],
+        }
+
     @staticmethod
     def as_subscription_payload(subscription: FeedSubscription) -> dict:
         payload = asdict(subscription)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.config.loader import GatewayCompressionConfig
+from app.gateway.workers import LatencyStats
+
+DEFLATE_COMPRESSION = "deflate"
+
+
+@dataclass(slots=True)
+class _MethodCompressionStats:
+    frames: int = 0
+    compressed_frames: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    compress: LatencyStats = field(default_factory=LatencyStats)
+
+    def as_payload(self) -> dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "compressedFrames": self.compressed_frames,
+            "bytesIn": self.bytes_in,
+            "bytesOut": self.bytes_out,
+            "bytesSaved": self.bytes_in - self.bytes_out,
+            "compressMs": self.compress.as_payload(),
+        }
+
+
+class FrameCompressor:
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        threshold_bytes: int = 8192,
+        level: int = 6,
+    ) -> None:
+        self.enabled = enabled
+        self.threshold_bytes = threshold_bytes
+        self.level = level
+        self._methods: dict[str, _MethodCompressionStats] = {}
+
+    @classmethod
+    def from_config(cls, config: GatewayCompressionConfig) -> FrameCompressor:
+        return cls(
+            enabled=config.enabled,
+            threshold_bytes=config.threshold_bytes,
+            level=config.level,
+        )
+
+    def negotiate(self, requested: list[str]) -> str | None:
+        if self.enabled and DEFLATE_COMPRESSION in requested:
+            return DEFLATE_COMPRESSION
+        return None
+
+    def compress(self, encoded: str | bytes, *, method: str) -> str | bytes:
+        raw = encoded.encode("utf-8") if isinstance(encoded, str) else encoded
+        stats = self._methods.setdefault(method, _MethodCompressionStats())
+        stats.frames += 1
+        stats.bytes_in += len(raw)
+        if len(raw) < self.threshold_bytes:
+            stats.bytes_out += len(raw)
+            return encoded
+
+        started = time.perf_counter()
+        compressed = zlib.compress(raw, self.level)
+        stats.compress.record((time.perf_counter() - started) * 1000)
+        if len(compressed) >= len(raw):
+            stats.bytes_out += len(raw)
+            return encoded
+
+        stats.compressed_frames += 1
+        stats.bytes_out += len(compressed)
+        return compressed
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "thresholdBytes": self.threshold_bytes,
+            "level": self.level,
+            "methods": {name: stats.as_payload() for name, stats in sorted(self._methods.items())},
+        }
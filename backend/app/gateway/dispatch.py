@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from app.accounts.registry import AccountRegistry
+from app.agents.registry import AgentRegistry
+from app.audit.store import AuditStore
+from app.backtesting.simulator import BacktestSimulator
+from app.config.loader import AppConfig
+from app.devices.registry import DeviceRegistry
+from app.feeds.service import FeedService
+from app.gateway.compression import FrameCompressor
+from app.gateway.events import EventBus, EventSubscription
+from app.gateway.metrics import UNKNOWN_METHOD, GatewayMetrics
+from app.gateway.workers import GatewayWorkers
+from app.memory.index import MemoryIndex, PartitionedMemoryIndex
+from app.memory.watcher import MemoryWatcher
+from app.plugins.registry import ResolvedPlugins
+from app.protocol.encoding import JSON_CODEC, WireCodec
+from app.protocol.frames import RequestFrame
+from app.queues.agent_queue import AgentQueue
+from app.queues.snapshot_store import QueueSnapshotStore
+from app.risk.control import RiskControlState
+from app.risk.engine import RiskEngine
+from app.trades.service import TradeExecutionService
+
+
+class RequestLanes:
+    def __init__(self) -> None:
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._holders: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str | None) -> AsyncIterator[None]:
+        if key is None:
+            yield
+            return
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._holders[key] = self._holders.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._holders[key] -= 1
+            if self._holders[key] == 0:
+                del self._holders[key]
+                del self._locks[key]
+
+    def active_keys(self) -> list[str]:
+        return sorted(self._locks)
+
+
+@dataclass(slots=True)
+class GatewaySession:
+    started_at: datetime
+    agent_queues: dict[str, AgentQueue]
+    queue_snapshot_store: QueueSnapshotStore
+    audit_store: AuditStore
+    agent_registry: AgentRegistry
+    account_registry: AccountRegistry
+    app_config: AppConfig
+    device_registry: DeviceRegistry
+    feed_service: FeedService
+    memory_index: MemoryIndex | PartitionedMemoryIndex
+    resolved_plugins: ResolvedPlugins
+    risk_control_state: RiskControlState
+    trade_execution_service: TradeExecutionService
+    memory_watcher: MemoryWatcher | None = None
+    session_id: str | None = None
+    codec: WireCodec = JSON_CODEC
+    candle_layout: str = "rows"
+    compression: str | None = None
+    risk_engine: RiskEngine = field(default_factory=RiskEngine)
+    backtest_simulator: BacktestSimulator = field(default_factory=BacktestSimulator)
+    marketplace_follows: dict[tuple[str, str], dict[str, Any]] = field(default_factory=dict)
+    workers: GatewayWorkers = field(default_factory=GatewayWorkers)
+    compressor: FrameCompressor = field(default_factory=FrameCompressor)
+    metrics: GatewayMetrics = field(default_factory=GatewayMetrics)
+    event_bus: EventBus = field(default_factory=EventBus)
+    events: EventSubscription | None = None
+    lanes: RequestLanes = field(default_factory=RequestLanes)
+
+    @property
+    def connected(self) -> bool:
+        return self.session_id is not None
+
+
+@dataclass(slots=True)
+class MethodResult:
+    response: dict[str, Any]
+    events: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def frames(self) -> list[dict[str, Any]]:
+        return [*self.events, self.response]
+
+
+MethodHandler = Callable[[GatewaySession, RequestFrame, Any], Awaitable[MethodResult]]
+LaneResolver = Callable[[Any], str]
+
+
+@dataclass(slots=True, frozen=True)
+class MethodSpec:
+    name: str
+    handler: MethodHandler
+    params_model: type[BaseModel] | None = None
+    lane: LaneResolver | None = None
+    validate_params: Callable[[Any], BaseModel] | None = field(
+        init=False,
+        default=None,
+        repr=False,
+        compare=False,
+    )
+
+    def __post_init__(self) -> None:
+        if self.params_model is not None:
+            validator = self.params_model.__pydantic_validator__.validate_python
+            object.__setattr__(self, "validate_params", validator)
+
+    def lane_key(self, params: Any) -> str | None:
+        if self.lane is None:
+            return None
+        return self.lane(params)
+
+
+class MethodRegistry:
+    def __init__(self) -> None:
+        self._methods: dict[str, MethodSpec] = {}
+
+    def register(
+        self,
+        *names: str,
+        params_model: type[BaseModel] | None = None,
+        lane: LaneResolver | None = None,
+    ) -> Callable[[MethodHandler], MethodHandler]:
+        def decorator(handler: MethodHandler) -> MethodHandler:
+            for name in names:
+                if name in self._methods:
+                    raise ValueError(f"gateway method already registered: {name}")
+                self._methods[name] = MethodSpec(
+                    name=name,
+                    handler=handler,
+                    params_model=params_model,
+                    lane=lane,
+                )
+            return handler
+
+        return decorator
+
+    def get(self, name: str) -> MethodSpec | None:
+        return self._methods.get(name)
+
+    def names(self) -> list[str]:
+        return sorted(self._methods)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._methods
+
+    def __len__(self) -> int:
+        return len(self._methods)
+
+
+async def dispatch_request(
+    registry: MethodRegistry,
+    session: GatewaySession,
+    frame: RequestFrame,
+) -> MethodResult:
+    spec = registry.get(frame.method)
+    label = UNKNOWN_METHOD if spec is None else spec.name
+    try:
+        result = await _dispatch(spec, session, frame)
+    except Exception:
+        session.metrics.record_outcome(label, "INTERNAL_ERROR")
+        raise
+    session.metrics.record_response(label, result.response)
+    return result
+
+
+async def _dispatch(
+    spec: MethodSpec | None,
+    session: GatewaySession,
+    frame: RequestFrame,
+) -> MethodResult:
+    if spec is None:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="NOT_FOUND",
+                message=f"unknown method: {frame.method}",
+            )
+        )
+
+    params: BaseModel | None = None
+    if spec.validate_params is not None:
+        try:
+            with session.metrics.phase(spec.name, "validate"):
+                params = spec.validate_params(frame.params)
+        except ValidationError:
+            return MethodResult(
+                error_response(
+                    frame.id,
+                    code="INVALID_PARAMS",
+                    message=f"invalid {frame.method} params",
+                )
+            )
+
+    async with session.lanes.hold(spec.lane_key(params)):
+        with session.metrics.bind_method(spec.name), session.metrics.phase(spec.name, "handler"):
+            return await spec.handler(session, frame, params)
+
+
+def error_response(
+    request_id: str,
+    *,
+    code: str,
+    message: str,
+    details: Any | None = None,
+) -> dict:
+    payload: dict[str, Any] = {
+        "type": "res",
+        "id": request_id,
+        "ok": False,
+        "error": {
+            "code": code,
+            "message": message,
+        },
+    }
+    if details is not None:
+        payload["error"]["details"] = details
+    return payload
+
+
+def ok_response(request_id: str, payload: dict[str, Any]) -> dict:
+    return {
+        "type": "res",
+        "id": request_id,
+        "ok": True,
+        "payload": payload,
+    }
+
+
+def event_frame(event_name: str, payload: dict[str, Any]) -> dict:
+    return {
+        "type": "event",
+        "event": event_name,
+        "payload": payload,
+    }
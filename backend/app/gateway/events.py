@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Any, Literal
+
+import pydantic_core
+
+from app.config.loader import GatewayEventsConfig
+from app.gateway.workers import LatencyStats
+
+ALL_TOPICS = "*"
+
+SlowConsumerPolicy = Literal["coalesce", "drop_oldest", "disconnect"]
+
+
+class SlowConsumerError(RuntimeError):
+    """Raised to the event forwarder once a session overflows under the disconnect policy."""
+
+
+@dataclass(slots=True)
+class _PendingEvent:
+    event: dict[str, Any]
+    size: int
+    enqueued_at: float
+    key: tuple[str, Any] | None = None
+    superseded: bool = False
+
+
+class EventSubscription:
+    def __init__(
+        self,
+        *,
+        session_id: str,
+        topics: list[str],
+        max_queue: int,
+        max_bytes: int = 1_048_576,
+        policy: SlowConsumerPolicy = "drop_oldest",
+        coalesce_topics: list[str] | None = None,
+    ) -> None:
+        self.session_id = session_id
+        self.topics = list(topics)
+        self.max_queue = max(max_queue, 1)
+        self.max_bytes = max(max_bytes, 1)
+        self.policy = policy
+        self.coalesce_topics = list(coalesce_topics or [])
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.overflowed = False
+        self._pending: deque[_PendingEvent] = deque()
+        self._pending_by_key: dict[tuple[str, Any], _PendingEvent] = {}
+        self._pending_bytes = 0
+        self._live = 0
+        self._lag = LatencyStats()
+        self._ready = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+
+    @property
+    def depth(self) -> int:
+        return self._live
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._pending_bytes
+
+    def matches(self, event_name: str) -> bool:
+        return any(fnmatchcase(event_name, pattern) for pattern in self.topics)
+
+    def offer(self, event: dict[str, Any], size: int) -> None:
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._enqueue(event, size)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, event, size)
+
+    async def next(self) -> dict[str, Any]:
+        while not self._live:
+            if self.overflowed:
+                raise SlowConsumerError(f"session {self.session_id} fell too far behind")
+            self._ready.clear()
+            await self._ready.wait()
+        if self.overflowed:
+            raise SlowConsumerError(f"session {self.session_id} fell too far behind")
+
+        pending = self._pop_oldest()
+        self.delivered += 1
+        self._lag.record((time.monotonic() - pending.enqueued_at) * 1000)
+        return pending.event
+
+    def metrics(self) -> dict[str, Any]:
+        oldest_ms = (time.monotonic() - self._pending[0].enqueued_at) * 1000 if self._pending else 0
+        return {
+            "sessionId": self.session_id,
+            "topics": list(self.topics),
+            "policy": self.policy,
+            "depth": self.depth,
+            "pendingBytes": self._pending_bytes,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "overflowed": self.overflowed,
+            "lag": {
+                "oldestPendingMs": round(oldest_ms, 3),
+                **self._lag.as_payload(),
+            },
+        }
+
+    def _coalesce_key(self, event: dict[str, Any]) -> tuple[str, Any] | None:
+        payload = event.get("payload")
+        if not isinstance(payload, dict):
+            return None
+        topic = payload.get("topic") or event["event"]
+        if any(fnmatchcase(topic, pattern) for pattern in self.coalesce_topics):
+            return topic, payload.get("symbol")
+        return None
+
+    def _enqueue(self, event: dict[str, Any], size: int) -> None:
+        if self.overflowed:
+            return
+
+        key = self._coalesce_key(event) if self.policy == "coalesce" else None
+        if key is not None and (stale := self._pending_by_key.get(key)) is not None:
+            # The newer event goes to the tail so seqs still reach the client in order;
+            # the old slot is left as a tombstone and skipped.
+            stale.superseded = True
+            self._pending_bytes -= stale.size
+            self._live -= 1
+            self.coalesced += 1
+            self._drop_superseded()
+
+        pending = _PendingEvent(event=event, size=size, enqueued_at=time.monotonic(), key=key)
+        self._pending.append(pending)
+        self._pending_bytes += size
+        self._live += 1
+        if key is not None:
+            self._pending_by_key[key] = pending
+
+        while self._live > 1 and (
+            self._live > self.max_queue or self._pending_bytes > self.max_bytes
+        ):
+            if self.policy == "disconnect":
+                self.overflowed = True
+                self.dropped += self._live
+                self._pending.clear()
+                self._pending_by_key.clear()
+                self._pending_bytes = 0
+                self._live = 0
+                break
+            self._pop_oldest()
+            self.dropped += 1
+        self._ready.set()
+
+    def _pop_oldest(self) -> _PendingEvent:
+        pending = self._pending.popleft()
+        self._pending_bytes -= pending.size
+        self._live -= 1
+        if pending.key is not None and self._pending_by_key.get(pending.key) is pending:
+            del self._pending_by_key[pending.key]
+        self._drop_superseded()
+        return pending
+
+    def _drop_superseded(self) -> None:
+        # Keeps a live event at the head, and tombstones from never outnumbering live ones.
+        while self._pending and self._pending[0].superseded:
+            self._pending.popleft()
+        if len(self._pending) > 2 * self._live:
+            self._pending = deque(pending for pending in self._pending if not pending.superseded)
+
+
+class EventBus:
+    def __init__(
+        self,
+        *,
+        max_queue: int = 1024,
+        max_bytes: int = 1_048_576,
+        policy: SlowConsumerPolicy = "drop_oldest",
+        coalesce_topics: list[str] | None = None,
+    ) -> None:
+        self.max_queue = max_queue
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.coalesce_topics = list(coalesce_topics or [])
+        self._seq = itertools.count(1)
+        self._subscriptions: dict[str, EventSubscription] = {}
+        self._published = 0
+        self._disconnected = 0
+
+    @classmethod
+    def from_config(cls, config: GatewayEventsConfig) -> EventBus:
+        return cls(
+            max_queue=config.max_queue,
+            max_bytes=config.max_bytes,
+            policy=config.slow_consumer_policy,
+            coalesce_topics=config.coalesce_topics,
+        )
+
+    def subscribe(self, session_id: str, topics: list[str] | None = None) -> EventSubscription:
+        subscription = EventSubscription(
+            session_id=session_id,
+            topics=topics or [ALL_TOPICS],
+            max_queue=self.max_queue,
+            max_bytes=self.max_bytes,
+            policy=self.policy,
+            coalesce_topics=self.coalesce_topics,
+        )
+        self._subscriptions[session_id] = subscription
+        return subscription
+
+    def unsubscribe(self, session_id: str) -> None:
+        subscription = self._subscriptions.pop(session_id, None)
+        if subscription is not None and subscription.overflowed:
+            self._disconnected += 1
+
+    def publish(self, event: dict[str, Any], *, origin: str | None = None) -> dict[str, Any]:
+        """Stamp ``event`` with the next seq and fan it out to every other matching session.
+
+        The origin session receives its own events inline with the response, so it is skipped.
+        """
+        event["seq"] = next(self._seq)
+        self._published += 1
+        size: int | None = None
+        for session_id, subscription in list(self._subscriptions.items()):
+            if session_id != origin and subscription.matches(event["event"]):
+                if size is None:
+                    size = len(pydantic_core.to_json(event))
+                subscription.offer(event, size)
+        return event
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "published": self._published,
+            "policy": self.policy,
+            "maxQueue": self.max_queue,
+            "maxBytes": self.max_bytes,
+            "slowConsumersDisconnected": self._disconnected,
+            "subscribers": [
+                subscription.metrics() for _, subscription in sorted(self._subscriptions.items())
+            ],
+        }
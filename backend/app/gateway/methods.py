@@ -0,0 +1,1674 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from pydantic import ValidationError
+
+from app.audit.query import AuditCursorError, AuditQuery
+from app.backtesting.simulator import BacktestCandle, BacktestSimulator, TradeSignal
+from app.config.loader import AppConfig
+from app.feeds.service import FeedService
+from app.gateway.dispatch import (
+    GatewaySession,
+    MethodRegistry,
+    MethodResult,
+    dispatch_request,
+    error_response,
+    event_frame,
+    ok_response,
+)
+from app.gateway.models import (
+    AccountIdParams,
+    AccountsConnectParams,
+    AgentQueueCompleteParams,
+    AgentQueueFlushParams,
+    AgentQueueStatusParams,
+    AgentRunParams,
+    AgentsCreateParams,
+    AgentsGetParams,
+    AuditQueryParams,
+    BacktestSignalInput,
+    BacktestsRunParams,
+    ConfigPatchParams,
+    CopytradeControlParams,
+    CopytradePreviewParams,
+    DeviceNotifyParams,
+    DevicePairParams,
+    DeviceRegisterPushParams,
+    DeviceUnpairParams,
+    EventsSetTopicsParams,
+    FeedGetCandlesParams,
+    FeedSubscribeParams,
+    FeedUnsubscribeParams,
+    GatewayConnectParams,
+    MarketplaceFollowParams,
+    MarketplaceMyFollowsParams,
+    MemorySearchParams,
+    RiskEmergencyStopParams,
+    RiskPreviewParams,
+    RiskResumeParams,
+    TradesCancelParams,
+    TradesClosePositionParams,
+    TradesModifyParams,
+    TradesPlaceParams,
+)
+from app.marketplace.copytrade import CopyTradeMapper, CopyTradeSignal, FollowerConstraints
+from app.protocol.encoding import negotiate_encoding, supported_encodings
+from app.protocol.frames import GATEWAY_BATCH_METHOD, BatchRequestParams, RequestFrame
+from app.queues.agent_queue import AgentQueue, AgentRequest, QueueDecisionType, QueueSettings
+from app.risk.engine import RiskDecision, RiskViolation, ViolationCode
+
+PROTOCOL_VERSION = 1
+GATEWAY_CONNECT_METHOD = "gateway.connect"
+SERVER_NAME = "mt5-claude-trader-v2"
+
+GATEWAY_METHODS = MethodRegistry()
+
+
+def _deep_merge(base: dict[str, Any], patch: dict[str, Any]) -> dict[str, Any]:
+    merged = dict(base)
+    for key, value in patch.items():
+        current = merged.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            merged[key] = _deep_merge(current, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _get_or_create_queue(agent_id: str, queues: dict[str, AgentQueue]) -> tuple[AgentQueue, bool]:
+    if agent_id in queues:
+        return queues[agent_id], False
+    queue = AgentQueue(QueueSettings(mode="followup", cap=50, drop_policy="old"))
+    queues[agent_id] = queue
+    return queue, True
+
+
+def _run_backtest(
+    simulator: BacktestSimulator,
+    candles: list[BacktestCandle],
+    signals: list[BacktestSignalInput],
+) -> dict[str, Any]:
+    signal_map = {signal.index: signal for signal in signals}
+
+    def strategy(index: int, history: list[BacktestCandle]) -> TradeSignal | None:
+        signal = signal_map.get(index)
+        if signal is None:
+            return None
+        return TradeSignal(
+            side=signal.side,
+            entry=history[index].close,
+            stop_loss=signal.stop_loss,
+            take_profit=signal.take_profit,
+        )
+
+    report = simulator.run(candles=candles, strategy=strategy)
+    return {
+        "trades": [asdict(trade) for trade in report.trades],
+        "metrics": asdict(report.metrics),
+        "equityCurve": report.equity_curve,
+    }
+
+
+def _trade_intent_lane(params: TradesPlaceParams) -> str:
+    return f"trades:{params.intent.account_id}"
+
+
+def _trade_account_lane(
+    params: TradesModifyParams | TradesCancelParams | TradesClosePositionParams,
+) -> str:
+    return f"trades:{params.account_id}"
+
+
+def _agent_lane(
+    params: AgentRunParams | AgentQueueCompleteParams | AgentQueueFlushParams,
+) -> str:
+    return f"agent:{params.agentId}"
+
+
+def _config_lane(params: ConfigPatchParams) -> str:
+    return "config"
+
+
+def handle_gateway_connect(session: GatewaySession, frame: RequestFrame) -> MethodResult:
+    try:
+        params = GatewayConnectParams.model_validate(frame.params)
+    except ValidationError:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="INVALID_PARAMS",
+                message="invalid gateway.connect params",
+            )
+        )
+
+    if params.protocol.min > PROTOCOL_VERSION or params.protocol.max < PROTOCOL_VERSION:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="INVALID_REQUEST",
+                message="protocol mismatch",
+                details={"expectedProtocol": PROTOCOL_VERSION},
+            )
+        )
+
+    session.session_id = f"sess_{uuid4().hex[:12]}"
+    session.codec = negotiate_encoding(params.encodings)
+    session.candle_layout = params.candleLayout
+    session.compression = session.compressor.negotiate(params.compression)
+    session.events = session.event_bus.subscribe(session.session_id, params.eventTopics)
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "protocol": {"selected": PROTOCOL_VERSION},
+                "session": {"sessionId": session.session_id, "role": "operator"},
+                "server": {"name": SERVER_NAME, "version": "0.1.0"},
+                "encoding": {
+                    "selected": session.codec.name,
+                    "supported": supported_encodings(),
+                },
+                "candleLayout": session.candle_layout,
+                "compression": {
+                    "selected": session.compression,
+                    "thresholdBytes": session.compressor.threshold_bytes,
+                },
+                "events": {"topics": session.events.topics},
+            },
+        )
+    )
+
+
+@GATEWAY_METHODS.register("gateway.ping")
+async def gateway_ping(session: GatewaySession, frame: RequestFrame, params: None) -> MethodResult:
+    return MethodResult(ok_response(frame.id, payload={"now": datetime.now(UTC).isoformat()}))
+
+
+@GATEWAY_METHODS.register("gateway.metrics")
+async def gateway_metrics(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: None,
+) -> MethodResult:
+    return MethodResult(ok_response(frame.id, payload=session.metrics.snapshot()))
+
+
+@GATEWAY_METHODS.register("events.setTopics", params_model=EventsSetTopicsParams)
+async def events_set_topics(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: EventsSetTopicsParams,
+) -> MethodResult:
+    session.events.topics = list(params.topics)
+    return MethodResult(ok_response(frame.id, payload={"topics": session.events.topics}))
+
+
+@GATEWAY_METHODS.register("gateway.status")
+async def gateway_status(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: None,
+) -> MethodResult:
+    uptime_seconds = int((datetime.now(UTC) - session.started_at).total_seconds())
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "protocolVersion": PROTOCOL_VERSION,
+                "uptimeSeconds": max(uptime_seconds, 0),
+                "sessionId": session.session_id,
+                "server": {
+                    "name": SERVER_NAME,
+                    "version": "0.1.0",
+                },
+                "workers": session.workers.metrics(),
+                "compression": session.compressor.metrics(),
+                "events": session.event_bus.metrics(),
+                "audit": session.audit_store.metrics(),
+            },
+        )
+    )
+
+
+@GATEWAY_METHODS.register(GATEWAY_BATCH_METHOD, params_model=BatchRequestParams)
+async def gateway_batch(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: BatchRequestParams,
+) -> MethodResult:
+    events: list[dict[str, Any]] = []
+    responses: list[dict[str, Any]] = []
+    for sub_request in params.requests:
+        if sub_request.method == GATEWAY_BATCH_METHOD:
+            responses.append(
+                error_response(
+                    sub_request.id,
+                    code="INVALID_REQUEST",
+                    message="gateway.batch cannot be nested",
+                )
+            )
+            continue
+        result = await dispatch_request(GATEWAY_METHODS, session, sub_request)
+        events.extend(result.events)
+        responses.append(result.response)
+    return MethodResult(ok_response(frame.id, payload={"responses": responses}), events=events)
+
+
+@GATEWAY_METHODS.register("config.get")
+async def config_get(session: GatewaySession, frame: RequestFrame, params: None) -> MethodResult:
+    return MethodResult(ok_response(frame.id, payload=session.app_config.model_dump(mode="json")))
+
+
+@GATEWAY_METHODS.register("config.schema")
+async def config_schema(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: None,
+) -> MethodResult:
+    return MethodResult(ok_response(frame.id, payload={"schema": AppConfig.model_json_schema()}))
+
+
+@GATEWAY_METHODS.register("config.patch", params_model=ConfigPatchParams, lane=_config_lane)
+async def config_patch(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: ConfigPatchParams,
+) -> MethodResult:
+    merged_payload = _deep_merge(session.app_config.model_dump(mode="json"), params.patch)
+    try:
+        session.app_config = AppConfig.model_validate(merged_payload)
+    except ValidationError as exc:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="INVALID_PARAMS",
+                message="invalid config patch payload",
+                details={"errors": exc.errors()},
+            )
+        )
+
+    session.audit_store.append(
+        actor="user",
+        action="config.patch",
+        trace_id=frame.id,
+        data={"patchKeys": sorted(params.patch.keys())},
+    )
+    return MethodResult(
+        ok_response(frame.id, payload={"config": session.app_config.model_dump(mode="json")})
+    )
+
+
+@GATEWAY_METHODS.register("plugins.status")
+async def plugins_status(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: None,
+) -> MethodResult:
+    resolved_plugins = session.resolved_plugins
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "enabledPlugins": sorted(resolved_plugins.enabled_plugins),
+                "activeSlots": resolved_plugins.active_slots,
+                "diagnostics": resolved_plugins.diagnostics,
+            },
+        )
+    )
+
+
+@GATEWAY_METHODS.register("agents.create", params_model=AgentsCreateParams)
+async def agents_create(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: AgentsCreateParams,
+) -> MethodResult:
+    agent = session.agent_registry.create(
+        agent_id=params.agent_id,
+        label=params.label,
+        soul_template=params.soul_template,
+        manual_template=params.manual_template,
+    )
+    if session.memory_watcher is not None:
+        session.memory_watcher.watch(agent.workspace_path)
+    payload = {"agent": session.agent_registry.as_public_payload(agent)}
+    session.audit_store.append(
+        actor="user",
+        action="agents.create",
+        trace_id=frame.id,
+        data={"agentId": params.agent_id, "label": params.label},
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=payload),
+        events=[
+            event_frame(
+                "event.agent.status",
+                {"requestId": frame.id, "agent": payload["agent"]},
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("agents.list")
+async def agents_list(session: GatewaySession, frame: RequestFrame, params: None) -> MethodResult:
+    payload = {
+        "agents": [
+            session.agent_registry.as_public_payload(agent)
+            for agent in session.agent_registry.list()
+        ]
+    }
+    return MethodResult(ok_response(frame.id, payload=payload))
+
+
+@GATEWAY_METHODS.register("agents.get", params_model=AgentsGetParams)
+async def agents_get(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: AgentsGetParams,
+) -> MethodResult:
+    agent = session.agent_registry.get(agent_id=params.agent_id)
+    if agent is None:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="NOT_FOUND",
+                message=f"agent not found: {params.agent_id}",
+            )
+        )
+
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={"agent": session.agent_registry.as_public_payload(agent)},
+        )
+    )
+
+
+@GATEWAY_METHODS.register("accounts.connect", params_model=AccountsConnectParams)
+async def accounts_connect(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: AccountsConnectParams,
+) -> MethodResult:
+    account = session.account_registry.connect(
+        account_id=params.account_id,
+        connector_id=params.connector_id,
+        provider_account_id=params.provider_account_id,
+        mode=params.mode,
+        label=params.label,
+        allowed_symbols=params.allowed_symbols,
+    )
+    payload = {"account": session.account_registry.as_public_payload(account)}
+    session.audit_store.append(
+        actor="user",
+        action="accounts.connect",
+        trace_id=frame.id,
+        data={
+            "accountId": params.account_id,
+            "connectorId": params.connector_id,
+            "mode": params.mode,
+        },
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=payload),
+        events=[
+            event_frame(
+                "event.account.status",
+                {"requestId": frame.id, "account": payload["account"]},
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("accounts.list")
+async def accounts_list(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: None,
+) -> MethodResult:
+    payload = {
+        "accounts": [
+            session.account_registry.as_public_payload(account)
+            for account in session.account_registry.list()
+        ]
+    }
+    return MethodResult(ok_response(frame.id, payload=payload))
+
+
+@GATEWAY_METHODS.register("accounts.get", "accounts.status", params_model=AccountIdParams)
+async def accounts_get(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: AccountIdParams,
+) -> MethodResult:
+    account = session.account_registry.get(account_id=params.account_id)
+    if account is None:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="NOT_FOUND",
+                message=f"account not found: {params.account_id}",
+            )
+        )
+
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={"account": session.account_registry.as_public_payload(account)},
+        )
+    )
+
+
+@GATEWAY_METHODS.register("accounts.disconnect", params_model=AccountIdParams)
+async def accounts_disconnect(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: AccountIdParams,
+) -> MethodResult:
+    account = session.account_registry.disconnect(account_id=params.account_id)
+    if account is None:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="NOT_FOUND",
+                message=f"account not found: {params.account_id}",
+            )
+        )
+
+    payload = {"account": session.account_registry.as_public_payload(account)}
+    session.audit_store.append(
+        actor="user",
+        action="accounts.disconnect",
+        trace_id=frame.id,
+        data={"accountId": params.account_id},
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=payload),
+        events=[
+            event_frame(
+                "event.account.status",
+                {"requestId": frame.id, "account": payload["account"]},
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("feeds.list")
+async def feeds_list(session: GatewaySession, frame: RequestFrame, params: None) -> MethodResult:
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "feeds": session.feed_service.list_feeds(),
+                "subscriptions": session.feed_service.list_subscriptions(),
+            },
+        )
+    )
+
+
+@GATEWAY_METHODS.register("feeds.subscribe", params_model=FeedSubscribeParams)
+async def feeds_subscribe(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: FeedSubscribeParams,
+) -> MethodResult:
+    feed_service = session.feed_service
+    subscription = feed_service.subscribe(
+        topics=params.topics,
+        symbols=params.symbols,
+        timeframes=params.timeframes,
+    )
+    payload = {
+        "subscription": feed_service.as_subscription_payload(subscription),
+        "subscriptionCount": len(feed_service.list_subscriptions()),
+    }
+    session.audit_store.append(
+        actor="user",
+        action="feeds.subscribe",
+        trace_id=frame.id,
+        data={
+            "subscriptionId": subscription.subscription_id,
+            "topics": params.topics,
+        },
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=payload),
+        events=[
+            event_frame(
+                "event.feed.event",
+                {
+                    "requestId": frame.id,
+                    "action": "subscribed",
+                    "subscription": payload["subscription"],
+                },
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("feeds.unsubscribe", params_model=FeedUnsubscribeParams)
+async def feeds_unsubscribe(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: FeedUnsubscribeParams,
+) -> MethodResult:
+    removed = session.feed_service.unsubscribe(subscription_id=params.subscription_id)
+    if not removed:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="NOT_FOUND",
+                message=f"subscription not found: {params.subscription_id}",
+            )
+        )
+
+    session.audit_store.append(
+        actor="user",
+        action="feeds.unsubscribe",
+        trace_id=frame.id,
+        data={"subscriptionId": params.subscription_id},
+    )
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "status": "removed",
+                "subscriptionId": params.subscription_id,
+                "subscriptionCount": len(session.feed_service.list_subscriptions()),
+            },
+        ),
+        events=[
+            event_frame(
+                "event.feed.event",
+                {
+                    "requestId": frame.id,
+                    "action": "unsubscribed",
+                    "subscriptionId": params.subscription_id,
+                },
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("feeds.getCandles", params_model=FeedGetCandlesParams)
+async def feeds_get_candles(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: FeedGetCandlesParams,
+) -> MethodResult:
+    candles = session.feed_service.get_candles(
+        symbol=params.symbol,
+        timeframe=params.timeframe,
+        limit=params.limit,
+    )
+    session.audit_store.append(
+        actor="user",
+        action="feeds.getCandles",
+        trace_id=frame.id,
+        data={
+            "symbol": params.symbol,
+            "timeframe": params.timeframe,
+            "limit": params.limit,
+        },
+    )
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "symbol": params.symbol,
+                "timeframe": params.timeframe,
+                "layout": session.candle_layout,
+                "candles": (
+                    FeedService.as_columnar_candles(candles)
+                    if session.candle_layout == "columnar"
+                    else candles
+                ),
+            },
+        )
+    )
+
+
+@GATEWAY_METHODS.register("marketplace.signals")
+async def marketplace_signals(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: None,
+) -> MethodResult:
+    now_iso = datetime.now(UTC).isoformat()
+    signals = [
+        {
+            "signalId": "sig_marketplace_1",
+            "strategyId": "strat_momentum_1",
+            "ts": now_iso,
+            "symbol": "ETHUSDm",
+            "timeframe": "5m",
+            "action": "OPEN",
+            "side": "buy",
+            "volume": 0.15,
+            "entry": 2500.0,
+            "stopLoss": 2450.0,
+            "takeProfit": 2600.0,
+        },
+        {
+            "signalId": "sig_marketplace_2",
+            "strategyId": "strat_mean_reversion_1",
+            "ts": now_iso,
+            "symbol": "BTCUSDm",
+            "timeframe": "1h",
+            "action": "OPEN",
+            "side": "sell",
+            "volume": 0.1,
+            "entry": 61000.0,
+            "stopLoss": 62000.0,
+            "takeProfit": 59000.0,
+        },
+    ]
+    session.audit_store.append(
+        actor="user",
+        action="marketplace.signals",
+        trace_id=frame.id,
+        data={"signalCount": len(signals)},
+    )
+    return MethodResult(ok_response(frame.id, payload={"signals": signals}))
+
+
+@GATEWAY_METHODS.register("marketplace.follow", params_model=MarketplaceFollowParams)
+async def marketplace_follow(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: MarketplaceFollowParams,
+) -> MethodResult:
+    follow_key = (params.account_id, params.strategy_id)
+    existing = session.marketplace_follows.get(follow_key)
+    followed_at = datetime.now(UTC).isoformat()
+    paused = existing["paused"] if existing and isinstance(existing.get("paused"), bool) else False
+    follow_entry = {
+        "followId": existing["followId"] if existing else f"follow_{uuid4().hex[:8]}",
+        "accountId": params.account_id,
+        "strategyId": params.strategy_id,
+        "paused": paused,
+        "copytradeStatus": "paused" if paused else "active",
+        "updatedAt": followed_at,
+    }
+    session.marketplace_follows[follow_key] = follow_entry
+    session.audit_store.append(
+        actor="user",
+        action="marketplace.follow",
+        trace_id=frame.id,
+        data={
+            "accountId": params.account_id,
+            "strategyId": params.strategy_id,
+            "followId": follow_entry["followId"],
+        },
+    )
+    return MethodResult(
+        ok_response(frame.id, payload={"status": "following", **follow_entry}),
+        events=[
+            event_frame(
+                "event.marketplace.follow",
+                {"requestId": frame.id, **follow_entry},
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("marketplace.unfollow", params_model=MarketplaceFollowParams)
+async def marketplace_unfollow(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: MarketplaceFollowParams,
+) -> MethodResult:
+    follow_key = (params.account_id, params.strategy_id)
+    existing = session.marketplace_follows.pop(follow_key, None)
+    unfollowed_at = datetime.now(UTC).isoformat()
+    follow_payload = {
+        "followId": existing["followId"] if existing else None,
+        "accountId": params.account_id,
+        "strategyId": params.strategy_id,
+        "status": "unfollowed",
+        "updatedAt": unfollowed_at,
+        "removed": existing is not None,
+    }
+    session.audit_store.append(
+        actor="user",
+        action="marketplace.unfollow",
+        trace_id=frame.id,
+        data={
+            "accountId": params.account_id,
+            "strategyId": params.strategy_id,
+            "removed": existing is not None,
+        },
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=follow_payload),
+        events=[
+            event_frame(
+                "event.marketplace.unfollow",
+                {"requestId": frame.id, **follow_payload},
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("marketplace.myFollows", params_model=MarketplaceMyFollowsParams)
+async def marketplace_my_follows(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: MarketplaceMyFollowsParams,
+) -> MethodResult:
+    follows = [
+        follow
+        for follow in session.marketplace_follows.values()
+        if follow["accountId"] == params.account_id
+    ]
+    follows.sort(key=lambda item: item["strategyId"])
+    session.audit_store.append(
+        actor="user",
+        action="marketplace.myFollows",
+        trace_id=frame.id,
+        data={
+            "accountId": params.account_id,
+            "followCount": len(follows),
+        },
+    )
+    return MethodResult(ok_response(frame.id, payload={"follows": follows}))
+
+
+@GATEWAY_METHODS.register("copytrade.preview", params_model=CopytradePreviewParams)
+async def copytrade_preview(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: CopytradePreviewParams,
+) -> MethodResult:
+    signal = CopyTradeSignal(
+        signal_id=params.signal.signal_id,
+        strategy_id=params.signal.strategy_id,
+        ts=params.signal.ts,
+        symbol=params.signal.symbol,
+        timeframe=params.signal.timeframe,
+        action=params.signal.action,
+        side=params.signal.side,
+        volume=params.signal.volume,
+        entry=params.signal.entry,
+        stop_loss=params.signal.stop_loss,
+        take_profit=params.signal.take_profit,
+    )
+    mapper = CopyTradeMapper(
+        constraints=FollowerConstraints(
+            allowed_symbols=params.constraints.allowed_symbols or [params.signal.symbol],
+            max_volume=params.constraints.max_volume,
+            direction_filter=params.constraints.direction_filter,
+            max_signal_age_seconds=params.constraints.max_signal_age_seconds,
+        )
+    )
+    result = mapper.map_signal(signal=signal, account_id=params.account_id)
+    result_payload = {
+        "signalId": params.signal.signal_id,
+        "deduped": result.deduped,
+        "blockedReason": result.blocked_reason,
+        "intent": result.intent.model_dump(mode="json") if result.intent else None,
+    }
+    session.audit_store.append(
+        actor="user",
+        action="copytrade.preview",
+        trace_id=frame.id,
+        data={
+            "accountId": params.account_id,
+            "signalId": params.signal.signal_id,
+            "blockedReason": result.blocked_reason,
+            "deduped": result.deduped,
+        },
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=result_payload),
+        events=[
+            event_frame(
+                "event.copytrade.preview",
+                {"requestId": frame.id, **result_payload},
+            )
+        ],
+    )
+
+
+def _copytrade_follow_not_found(frame: RequestFrame) -> MethodResult:
+    return MethodResult(
+        error_response(
+            frame.id,
+            code="NOT_FOUND",
+            message="copytrade follow not found",
+        )
+    )
+
+
+@GATEWAY_METHODS.register("copytrade.status", params_model=CopytradeControlParams)
+async def copytrade_status(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: CopytradeControlParams,
+) -> MethodResult:
+    follow = session.marketplace_follows.get((params.account_id, params.strategy_id))
+    if follow is None:
+        return _copytrade_follow_not_found(frame)
+
+    status_payload = {
+        "followId": follow["followId"],
+        "accountId": follow["accountId"],
+        "strategyId": follow["strategyId"],
+        "paused": follow["paused"],
+        "status": "paused" if follow["paused"] else "active",
+        "updatedAt": follow["updatedAt"],
+    }
+    session.audit_store.append(
+        actor="user",
+        action="copytrade.status",
+        trace_id=frame.id,
+        data=status_payload,
+    )
+    return MethodResult(ok_response(frame.id, payload=status_payload))
+
+
+@GATEWAY_METHODS.register("copytrade.pause", params_model=CopytradeControlParams)
+async def copytrade_pause(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: CopytradeControlParams,
+) -> MethodResult:
+    follow = session.marketplace_follows.get((params.account_id, params.strategy_id))
+    if follow is None:
+        return _copytrade_follow_not_found(frame)
+
+    follow["paused"] = True
+    follow["copytradeStatus"] = "paused"
+    follow["updatedAt"] = datetime.now(UTC).isoformat()
+    status_payload = {
+        "followId": follow["followId"],
+        "accountId": follow["accountId"],
+        "strategyId": follow["strategyId"],
+        "paused": True,
+        "status": "paused",
+        "updatedAt": follow["updatedAt"],
+    }
+    session.audit_store.append(
+        actor="user",
+        action="copytrade.pause",
+        trace_id=frame.id,
+        data=status_payload,
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=status_payload),
+        events=[
+            event_frame(
+                "event.copytrade.execution",
+                {"requestId": frame.id, "action": "pause", "status": status_payload},
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("copytrade.resume", params_model=CopytradeControlParams)
+async def copytrade_resume(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: CopytradeControlParams,
+) -> MethodResult:
+    follow = session.marketplace_follows.get((params.account_id, params.strategy_id))
+    if follow is None:
+        return _copytrade_follow_not_found(frame)
+
+    follow["paused"] = False
+    follow["copytradeStatus"] = "active"
+    follow["updatedAt"] = datetime.now(UTC).isoformat()
+    status_payload = {
+        "followId": follow["followId"],
+        "accountId": follow["accountId"],
+        "strategyId": follow["strategyId"],
+        "paused": False,
+        "status": "active",
+        "updatedAt": follow["updatedAt"],
+    }
+    session.audit_store.append(
+        actor="user",
+        action="copytrade.resume",
+        trace_id=frame.id,
+        data=status_payload,
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=status_payload),
+        events=[
+            event_frame(
+                "event.copytrade.execution",
+                {"requestId": frame.id, "action": "resume", "status": status_payload},
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("risk.preview", params_model=RiskPreviewParams)
+async def risk_preview(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: RiskPreviewParams,
+) -> MethodResult:
+    decision = session.risk_engine.evaluate(
+        intent=params.intent,
+        policy=params.policy,
+        snapshot=params.snapshot,
+    )
+    decision_payload = decision.model_dump(mode="json")
+    session.audit_store.append(
+        actor="user",
+        action="risk.preview",
+        trace_id=frame.id,
+        data={
+            "intent": params.intent.model_dump(mode="json"),
+            "decision": decision_payload,
+        },
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=decision_payload),
+        events=[
+            event_frame(
+                "event.risk.preview",
+                {
+                    "requestId": frame.id,
+                    "decision": decision_payload,
+                },
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("risk.status")
+async def risk_status(session: GatewaySession, frame: RequestFrame, params: None) -> MethodResult:
+    return MethodResult(ok_response(frame.id, payload=session.risk_control_state.status_payload()))
+
+
+@GATEWAY_METHODS.register("risk.emergencyStop", params_model=RiskEmergencyStopParams)
+async def risk_emergency_stop(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: RiskEmergencyStopParams,
+) -> MethodResult:
+    emergency_payload = session.risk_control_state.activate_emergency_stop(
+        action=params.action,
+        reason=params.reason,
+    )
+    await session.audit_store.append_durable(
+        actor="user",
+        action="risk.emergencyStop",
+        trace_id=frame.id,
+        data={
+            "action": params.action,
+            "reason": params.reason,
+            "emergencyStopActive": emergency_payload["emergencyStopActive"],
+        },
+    )
+    events = [
+        event_frame(
+            "event.risk.emergencyStop",
+            {
+                "requestId": frame.id,
+                "status": emergency_payload,
+            },
+        )
+    ]
+    if params.action == "cancel_all":
+        events.append(
+            event_frame(
+                "event.trade.canceled",
+                {
+                    "requestId": frame.id,
+                    "scope": "all",
+                    "status": "initiated",
+                },
+            )
+        )
+    if params.action == "close_all":
+        events.append(
+            event_frame(
+                "event.trade.closed",
+                {
+                    "requestId": frame.id,
+                    "scope": "all",
+                    "status": "initiated",
+                },
+            )
+        )
+    if params.action == "disable_live":
+        events.append(
+            event_frame(
+                "event.risk.alert",
+                {
+                    "requestId": frame.id,
+                    "kind": "live_trading_disabled",
+                    "status": "active",
+                },
+            )
+        )
+    return MethodResult(ok_response(frame.id, payload=emergency_payload), events=events)
+
+
+@GATEWAY_METHODS.register("risk.resume", params_model=RiskResumeParams)
+async def risk_resume(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: RiskResumeParams,
+) -> MethodResult:
+    resumed_payload = session.risk_control_state.resume(reason=params.reason)
+    await session.audit_store.append_durable(
+        actor="user",
+        action="risk.resume",
+        trace_id=frame.id,
+        data={
+            "reason": params.reason,
+            "emergencyStopActive": resumed_payload["emergencyStopActive"],
+        },
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=resumed_payload),
+        events=[
+            event_frame(
+                "event.risk.emergencyStop",
+                {
+                    "requestId": frame.id,
+                    "status": resumed_payload,
+                },
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("agent.run", params_model=AgentRunParams, lane=_agent_lane)
+async def agent_run(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: AgentRunParams,
+) -> MethodResult:
+    queue, created = _get_or_create_queue(params.agentId, session.agent_queues)
+    if created:
+        session.queue_snapshot_store.record_create(session.agent_queues, params.agentId)
+    request = AgentRequest(
+        request_id=params.request.request_id,
+        agent_id=params.agentId,
+        kind=params.request.kind,
+        priority=params.request.priority,
+        dedupe_key=params.request.dedupe_key,
+        payload=params.request.payload,
+    )
+    now_ms = int(datetime.now(UTC).timestamp() * 1000)
+    decision = queue.enqueue(request, now_ms=now_ms)
+    if decision.type not in (QueueDecisionType.DEDUPED, QueueDecisionType.DROPPED):
+        session.queue_snapshot_store.record_enqueue(
+            session.agent_queues,
+            params.agentId,
+            request,
+            now_ms=now_ms,
+        )
+    decision_payload = decision.model_dump(mode="json")
+    session.audit_store.append(
+        actor="user",
+        action="agent.run",
+        trace_id=frame.id,
+        data={
+            "agentId": params.agentId,
+            "request": request.model_dump(mode="json"),
+            "decision": decision_payload,
+        },
+    )
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "decision": decision_payload,
+                "activeRequestId": (
+                    queue.active_request.request_id if queue.active_request else None
+                ),
+                "pendingCount": len(queue.pending),
+            },
+        )
+    )
+
+
+@GATEWAY_METHODS.register(
+    "agent.queue.complete", params_model=AgentQueueCompleteParams, lane=_agent_lane
+)
+async def agent_queue_complete(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: AgentQueueCompleteParams,
+) -> MethodResult:
+    queue, created = _get_or_create_queue(params.agentId, session.agent_queues)
+    if created:
+        session.queue_snapshot_store.record_create(session.agent_queues, params.agentId)
+    completed = queue.active_request
+    if completed is not None:
+        queue.mark_active_complete()
+        session.queue_snapshot_store.record_complete(session.agent_queues, params.agentId)
+        session.audit_store.append(
+            actor="user",
+            action="agent.queue.complete",
+            trace_id=frame.id,
+            data={"agentId": params.agentId, "requestId": completed.request_id},
+        )
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "agentId": params.agentId,
+                "completedRequestId": completed.request_id if completed else None,
+                "activeRequestId": (
+                    queue.active_request.request_id if queue.active_request else None
+                ),
+                "pendingCount": len(queue.pending),
+            },
+        )
+    )
+
+
+@GATEWAY_METHODS.register("agent.queue.flush", params_model=AgentQueueFlushParams, lane=_agent_lane)
+async def agent_queue_flush(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: AgentQueueFlushParams,
+) -> MethodResult:
+    queue, created = _get_or_create_queue(params.agentId, session.agent_queues)
+    if created:
+        session.queue_snapshot_store.record_create(session.agent_queues, params.agentId)
+    now_ms = int(datetime.now(UTC).timestamp() * 1000)
+    batch = queue.flush_collect(now_ms=now_ms)
+    batch_payload = batch.model_dump(mode="json") if batch is not None else None
+    if batch is not None:
+        session.queue_snapshot_store.record_flush(
+            session.agent_queues, params.agentId, now_ms=now_ms
+        )
+        session.audit_store.append(
+            actor="user",
+            action="agent.queue.flush",
+            trace_id=frame.id,
+            data={"agentId": params.agentId, "batch": batch_payload},
+        )
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "agentId": params.agentId,
+                "batch": batch_payload,
+                "collectBufferCount": len(queue.collect_buffer),
+            },
+        )
+    )
+
+
+@GATEWAY_METHODS.register("agent.queue.status", params_model=AgentQueueStatusParams)
+async def agent_queue_status(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: AgentQueueStatusParams,
+) -> MethodResult:
+    queue, created = _get_or_create_queue(params.agentId, session.agent_queues)
+    if created:
+        session.queue_snapshot_store.record_create(session.agent_queues, params.agentId)
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "agentId": params.agentId,
+                "mode": queue.settings.mode,
+                "activeRequestId": (
+                    queue.active_request.request_id if queue.active_request else None
+                ),
+                "pendingCount": len(queue.pending),
+                "collectBufferCount": len(queue.collect_buffer),
+            },
+        )
+    )
+
+
+def _sync_memory_workspace(session: GatewaySession, workspace_path: str) -> None:
+    """Bring ``workspace_path`` up to date before a search reads it.
+
+    Only registered agent workspaces are handed to the watcher: a watch adds an inotify
+    watch per subdirectory, so a client-chosen path such as ``/`` could exhaust the
+    system limit. Any other path is indexed on demand and not watched.
+    """
+    watcher = session.memory_watcher
+    workspace = Path(workspace_path).resolve()
+    if watcher is not None and any(
+        Path(agent.workspace_path).resolve() == workspace for agent in session.agent_registry.list()
+    ):
+        # Only the first search of a workspace waits, for its initial sync; the watcher
+        # applies later edits in the background.
+        watcher.ensure_watched(workspace)
+    else:
+        session.memory_index.index_workspace(workspace)
+
+
+@GATEWAY_METHODS.register("memory.search", params_model=MemorySearchParams)
+async def memory_search(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: MemorySearchParams,
+) -> MethodResult:
+    memory_index = session.memory_index
+    await session.workers.io.run(_sync_memory_workspace, session, params.workspacePath)
+    results = await session.workers.io.run(
+        memory_index.search,
+        params.query,
+        max_results=params.maxResults,
+        workspace=params.workspacePath,
+    )
+    results_payload = [asdict(result) for result in results]
+    session.audit_store.append(
+        actor="user",
+        action="memory.search",
+        trace_id=frame.id,
+        data={
+            "workspacePath": params.workspacePath,
+            "query": params.query,
+            "resultCount": len(results_payload),
+        },
+    )
+    return MethodResult(ok_response(frame.id, payload={"results": results_payload}))
+
+
+@GATEWAY_METHODS.register("audit.query", params_model=AuditQueryParams)
+async def audit_query(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: AuditQueryParams,
+) -> MethodResult:
+    query = AuditQuery(
+        actions=params.actions,
+        actor=params.actor,
+        trace_id=params.traceId,
+        since=params.since,
+        until=params.until,
+        data=params.data,
+    )
+    try:
+        page = await session.workers.io.run(
+            session.audit_store.query,
+            query,
+            limit=params.limit,
+            cursor=params.cursor,
+        )
+    except AuditCursorError as exc:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="INVALID_PARAMS",
+                message=str(exc),
+            )
+        )
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "entries": page.entries,
+                "nextCursor": page.next_cursor,
+                "scanned": page.scanned,
+            },
+        )
+    )
+
+
+@GATEWAY_METHODS.register("backtests.run", params_model=BacktestsRunParams)
+async def backtests_run(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: BacktestsRunParams,
+) -> MethodResult:
+    payload = await session.workers.cpu.run(
+        _run_backtest,
+        session.backtest_simulator,
+        params.candles,
+        params.signals,
+    )
+    session.audit_store.append(
+        actor="user",
+        action="backtests.run",
+        trace_id=frame.id,
+        data={
+            "candles": len(params.candles),
+            "signals": len(params.signals),
+            "trades": payload["metrics"]["trades"],
+        },
+    )
+    return MethodResult(
+        ok_response(frame.id, payload=payload),
+        events=[
+            event_frame(
+                "event.backtests.report",
+                {
+                    "requestId": frame.id,
+                    "metrics": payload["metrics"],
+                },
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register("devices.pair", params_model=DevicePairParams)
+async def devices_pair(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: DevicePairParams,
+) -> MethodResult:
+    paired = session.device_registry.pair(
+        device_id=params.deviceId,
+        platform=params.platform,
+        label=params.label,
+        push_token=params.pushToken,
+    )
+    payload = {"device": session.device_registry.as_public_payload(paired)}
+    session.audit_store.append(
+        actor="user",
+        action="devices.pair",
+        trace_id=frame.id,
+        data={"deviceId": params.deviceId, "platform": params.platform},
+    )
+    return MethodResult(ok_response(frame.id, payload=payload))
+
+
+@GATEWAY_METHODS.register("devices.list")
+async def devices_list(session: GatewaySession, frame: RequestFrame, params: None) -> MethodResult:
+    devices = [
+        session.device_registry.as_public_payload(device)
+        for device in session.device_registry.list()
+    ]
+    return MethodResult(ok_response(frame.id, payload={"devices": devices}))
+
+
+@GATEWAY_METHODS.register("devices.unpair", params_model=DeviceUnpairParams)
+async def devices_unpair(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: DeviceUnpairParams,
+) -> MethodResult:
+    removed = session.device_registry.unpair(device_id=params.deviceId)
+    if not removed:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="NOT_FOUND",
+                message=f"device not found: {params.deviceId}",
+            )
+        )
+
+    session.audit_store.append(
+        actor="user",
+        action="devices.unpair",
+        trace_id=frame.id,
+        data={"deviceId": params.deviceId},
+    )
+    return MethodResult(
+        ok_response(frame.id, payload={"status": "removed", "deviceId": params.deviceId})
+    )
+
+
+@GATEWAY_METHODS.register("devices.registerPush", params_model=DeviceRegisterPushParams)
+async def devices_register_push(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: DeviceRegisterPushParams,
+) -> MethodResult:
+    updated_device = session.device_registry.register_push(
+        device_id=params.deviceId,
+        push_token=params.pushToken,
+    )
+    if updated_device is None:
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="NOT_FOUND",
+                message=f"device not found: {params.deviceId}",
+            )
+        )
+
+    payload = {"device": session.device_registry.as_public_payload(updated_device)}
+    session.audit_store.append(
+        actor="user",
+        action="devices.registerPush",
+        trace_id=frame.id,
+        data={"deviceId": params.deviceId},
+    )
+    return MethodResult(ok_response(frame.id, payload=payload))
+
+
+@GATEWAY_METHODS.register("devices.notifyTest", params_model=DeviceNotifyParams)
+async def devices_notify_test(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: DeviceNotifyParams,
+) -> MethodResult:
+    notify_result = session.device_registry.notify_test(
+        device_id=params.deviceId,
+        message=params.message,
+    )
+    session.audit_store.append(
+        actor="user",
+        action="devices.notifyTest",
+        trace_id=frame.id,
+        data={"deviceId": params.deviceId, "status": notify_result["status"]},
+    )
+    return MethodResult(ok_response(frame.id, payload=notify_result))
+
+
+@GATEWAY_METHODS.register(
+    "trades.place",
+    params_model=TradesPlaceParams,
+    lane=_trade_intent_lane,
+)
+async def trades_place(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: TradesPlaceParams,
+) -> MethodResult:
+    risk_control_state = session.risk_control_state
+    if risk_control_state.status_payload()["emergencyStopActive"]:
+        emergency_status = risk_control_state.status_payload()
+        emergency_decision = RiskDecision(
+            allowed=False,
+            violations=[
+                RiskViolation(
+                    code=ViolationCode.EMERGENCY_STOP_ACTIVE,
+                    message="Emergency stop is active.",
+                    details={
+                        "lastAction": emergency_status["lastAction"],
+                        "updatedAt": emergency_status["updatedAt"],
+                    },
+                )
+            ],
+        )
+        emergency_payload = emergency_decision.model_dump(mode="json")
+        await session.audit_store.append_durable(
+            actor="user",
+            action="trades.place.blocked",
+            trace_id=frame.id,
+            data={"decision": emergency_payload},
+        )
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="RISK_BLOCKED",
+                message="trade blocked by emergency stop",
+                details={"decision": emergency_payload},
+            ),
+            events=[
+                event_frame(
+                    "event.risk.alert",
+                    {
+                        "requestId": frame.id,
+                        "decision": emergency_payload,
+                    },
+                )
+            ],
+        )
+
+    risk_decision = session.risk_engine.evaluate(
+        intent=params.intent,
+        policy=params.policy,
+        snapshot=params.snapshot,
+    )
+    if not risk_decision.allowed:
+        risk_payload = risk_decision.model_dump(mode="json")
+        await session.audit_store.append_durable(
+            actor="user",
+            action="trades.place.blocked",
+            trace_id=frame.id,
+            data={"decision": risk_payload},
+        )
+        return MethodResult(
+            error_response(
+                frame.id,
+                code="RISK_BLOCKED",
+                message="trade blocked by risk policy",
+                details={"decision": risk_payload},
+            ),
+            events=[
+                event_frame(
+                    "event.risk.alert",
+                    {
+                        "requestId": frame.id,
+                        "decision": risk_payload,
+                    },
+                )
+            ],
+        )
+
+    trade_execution_service = session.trade_execution_service
+    execution = trade_execution_service.place(intent=params.intent)
+    execution_payload = trade_execution_service.as_payload(execution)
+    await session.audit_store.append_durable(
+        actor="user",
+        action="trades.place.executed",
+        trace_id=frame.id,
+        data={
+            "intent": params.intent.model_dump(mode="json"),
+            "execution": execution_payload,
+        },
+    )
+    return MethodResult(
+        ok_response(
+            frame.id,
+            payload={
+                "execution": execution_payload,
+                "riskDecision": risk_decision.model_dump(mode="json"),
+            },
+        ),
+        events=[
+            event_frame(
+                "event.trade.executed",
+                {
+                    "requestId": frame.id,
+                    "execution": execution_payload,
+                },
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register(
+    "trades.modify",
+    params_model=TradesModifyParams,
+    lane=_trade_account_lane,
+)
+async def trades_modify(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: TradesModifyParams,
+) -> MethodResult:
+    trade_execution_service = session.trade_execution_service
+    execution = trade_execution_service.modify(
+        account_id=params.account_id,
+        order_id=params.order_id,
+        open_price=params.open_price,
+        stop_loss=params.stop_loss,
+        take_profit=params.take_profit,
+    )
+    execution_payload = trade_execution_service.as_payload(execution)
+    await session.audit_store.append_durable(
+        actor="user",
+        action="trades.modify",
+        trace_id=frame.id,
+        data={"execution": execution_payload},
+    )
+    return MethodResult(
+        ok_response(frame.id, payload={"execution": execution_payload}),
+        events=[
+            event_frame(
+                "event.trade.modified",
+                {"requestId": frame.id, "execution": execution_payload},
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register(
+    "trades.cancel",
+    params_model=TradesCancelParams,
+    lane=_trade_account_lane,
+)
+async def trades_cancel(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: TradesCancelParams,
+) -> MethodResult:
+    trade_execution_service = session.trade_execution_service
+    execution = trade_execution_service.cancel(
+        account_id=params.account_id,
+        order_id=params.order_id,
+    )
+    execution_payload = trade_execution_service.as_payload(execution)
+    await session.audit_store.append_durable(
+        actor="user",
+        action="trades.cancel",
+        trace_id=frame.id,
+        data={"execution": execution_payload},
+    )
+    return MethodResult(
+        ok_response(frame.id, payload={"execution": execution_payload}),
+        events=[
+            event_frame(
+                "event.trade.canceled",
+                {"requestId": frame.id, "execution": execution_payload},
+            )
+        ],
+    )
+
+
+@GATEWAY_METHODS.register(
+    "trades.closePosition",
+    params_model=TradesClosePositionParams,
+    lane=_trade_account_lane,
+)
+async def trades_close_position(
+    session: GatewaySession,
+    frame: RequestFrame,
+    params: TradesClosePositionParams,
+) -> MethodResult:
+    trade_execution_service = session.trade_execution_service
+    execution = trade_execution_service.close_position(
+        account_id=params.account_id,
+        position_id=params.position_id,
+    )
+    execution_payload = trade_execution_service.as_payload(execution)
+    await session.audit_store.append_durable(
+        actor="user",
+        action="trades.closePosition",
+        trace_id=frame.id,
+        data={"execution": execution_payload},
+    )
+    return MethodResult(
+        ok_response(frame.id, payload={"execution": execution_payload}),
+        events=[
+            event_frame(
+                "event.trade.closed",
+                {"requestId": frame.id, "execution": execution_payload},
+            )
+        ],
+    )
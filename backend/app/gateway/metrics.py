@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from app.audit.store import AuditEntry
+
+Phase = Literal["parse", "validate", "handler", "audit", "send"]
+PHASES: tuple[Phase, ...] = ("parse", "validate", "handler", "audit", "send")
+UNKNOWN_METHOD = "unknown"
+
+# Upper bucket bounds in milliseconds; the implicit last bucket is +Inf.
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    25.0,
+    50.0,
+    100.0,
+    250.0,
+    500.0,
+    1000.0,
+    2500.0,
+    5000.0,
+)
+
+_current_method: ContextVar[str | None] = ContextVar("gateway_current_method", default=None)
+
+
+@dataclass(slots=True)
+class _Histogram:
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    count: int = 0
+    sum_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        running = 0
+        cumulative: list[tuple[float, int]] = []
+        for bound, bucket_count in zip(
+            (*LATENCY_BUCKETS_MS, float("inf")),
+            self.buckets,
+            strict=True,
+        ):
+            running += bucket_count
+            cumulative.append((bound, running))
+        return cumulative
+
+    def quantile_ms(self, quantile: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = quantile * self.count
+        for bound, running in self.cumulative():
+            if running >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def as_payload(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sumMs": round(self.sum_ms, 3),
+            "avgMs": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "maxMs": round(self.max_ms, 3),
+            "p50Ms": round(self.quantile_ms(0.5), 3),
+            "p99Ms": round(self.quantile_ms(0.99), 3),
+            "buckets": [
+                {"leMs": "+Inf" if bound == float("inf") else bound, "count": running}
+                for bound, running in self.cumulative()
+            ],
+        }
+
+
+@dataclass(slots=True)
+class _MethodMetrics:
+    count: int = 0
+    errors: dict[str, int] = field(default_factory=dict)
+    phases: dict[str, _Histogram] = field(default_factory=dict)
+
+    def as_payload(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": dict(sorted(self.errors.items())),
+            "phases": {
+                phase: self.phases[phase].as_payload() for phase in PHASES if phase in self.phases
+            },
+        }
+
+
+class GatewayMetrics:
+    def __init__(self) -> None:
+        self._methods: dict[str, _MethodMetrics] = {}
+
+    def observe(self, method: str, phase: Phase, elapsed_ms: float) -> None:
+        metrics = self._methods.setdefault(method, _MethodMetrics())
+        histogram = metrics.phases.get(phase)
+        if histogram is None:
+            histogram = metrics.phases[phase] = _Histogram()
+        histogram.observe(elapsed_ms)
+
+    @contextmanager
+    def phase(self, method: str, phase: Phase) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(method, phase, (time.perf_counter() - started) * 1000)
+
+    @contextmanager
+    def bind_method(self, method: str) -> Iterator[None]:
+        """Attribute audit writes made inside the block to ``method``."""
+        token = _current_method.set(method)
+        try:
+            yield
+        finally:
+            _current_method.reset(token)
+
+    def observe_audit(self, entry: AuditEntry, elapsed_ms: float) -> None:
+        self.observe(_current_method.get() or entry.action, "audit", elapsed_ms)
+
+    def record_outcome(self, method: str, error_code: str | None = None) -> None:
+        metrics = self._methods.setdefault(method, _MethodMetrics())
+        metrics.count += 1
+        if error_code is not None:
+            metrics.errors[error_code] = metrics.errors.get(error_code, 0) + 1
+
+    def record_response(self, method: str, response: dict[str, Any]) -> None:
+        self.record_outcome(method, None if response["ok"] else response["error"]["code"])
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "bucketsMs": list(LATENCY_BUCKETS_MS),
+            "methods": {
+                name: metrics.as_payload() for name, metrics in sorted(self._methods.items())
+            },
+        }
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP gateway_requests_total Gateway requests handled, by method.",
+            "# TYPE gateway_requests_total counter",
+        ]
+        methods = sorted(self._methods.items())
+        for name, metrics in methods:
+            lines.append(f'gateway_requests_total{{method="{name}"}} {metrics.count}')
+
+        lines += [
+            "# HELP gateway_request_errors_total Gateway error responses, by method and code.",
+            "# TYPE gateway_request_errors_total counter",
+        ]
+        for name, metrics in methods:
+            for code, count in sorted(metrics.errors.items()):
+                lines.append(
+                    f'gateway_request_errors_total{{method="{name}",code="{code}"}} {count}'
+                )
+
+        lines += [
+            "# HELP gateway_phase_duration_seconds Gateway request latency, by method and phase.",
+            "# TYPE gateway_phase_duration_seconds histogram",
+        ]
+        for name, metrics in methods:
+            for phase in PHASES:
+                histogram = metrics.phases.get(phase)
+                if histogram is None:
+                    continue
+                labels = f'method="{name}",phase="{phase}"'
+                for bound, running in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else f"{bound / 1000:g}"
+                    lines.append(
+                        f'gateway_phase_duration_seconds_bucket{{{labels},le="{le}"}} {running}'
+                    )
+                lines.append(
+                    f"gateway_phase_duration_seconds_sum{{{labels}}} {histogram.sum_ms / 1000:.6f}"
+                )
+                lines.append(f"gateway_phase_duration_seconds_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
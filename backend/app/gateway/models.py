@@ -1,4 +1,11 @@
+from datetime import datetime
+from typing import Any, Literal
+
 from pydantic import BaseModel, ConfigDict, Field
+from pydantic.alias_generators import to_camel
+
+from app.backtesting.simulator import BacktestCandle
+from app.risk.engine import AccountRiskSnapshot, RiskPolicy, TradeIntent
 
 
 class GatewayClientInfo(BaseModel):
@@ -24,3 +31,343 @@ class GatewayConnectParams(BaseModel):
     client: GatewayClientInfo
     protocol: GatewayProtocolRange
     auth: dict | None = None
+    encodings: list[str] = Field(default_factory=lambda: ["json"])
+    candleLayout: Literal["rows", "columnar"] = "rows"
+    compression: list[str] = Field(default_factory=list)
+    eventTopics: list[str] = Field(default_factory=lambda: ["*"])
+
+
+class EventsSetTopicsParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    topics: list[str] = Field(min_length=1)
+
+
+class AuditQueryParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    actions: list[str] = Field(default_factory=list)
+    actor: str | None = None
+    traceId: str | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+    data: dict[str, Any] = Field(default_factory=dict)
+    limit: int = Field(default=100, ge=1, le=500)
+    cursor: str | None = None
+
+
+class AgentRunRequestInput(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    request_id: str = Field(min_length=1)
+    kind: str = Field(min_length=1)
+    priority: str = Field(default="normal", min_length=1)
+    dedupe_key: str | None = None
+    payload: dict = Field(default_factory=dict)
+
+
+class AgentRunParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    agentId: str = Field(min_length=1)
+    request: AgentRunRequestInput
+
+
+class AgentQueueStatusParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    agentId: str = Field(min_length=1)
+
+
+class AgentQueueCompleteParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    agentId: str = Field(min_length=1)
+
+
+class AgentQueueFlushParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    agentId: str = Field(min_length=1)
+
+
+class RiskPreviewParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    intent: TradeIntent
+    policy: RiskPolicy
+    snapshot: AccountRiskSnapshot
+
+
+class RiskEmergencyStopParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    action: Literal["pause_trading", "cancel_all", "close_all", "disable_live"]
+    reason: str | None = None
+
+
+class RiskResumeParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    reason: str | None = None
+
+
+class MemorySearchParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    workspacePath: str = Field(min_length=1)
+    query: str = Field(min_length=1)
+    maxResults: int = Field(default=10, ge=1, le=50)
+
+
+class BacktestSignalInput(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    index: int = Field(ge=0)
+    side: str = Field(pattern="^(buy|sell)$")
+    stop_loss: float = Field(alias="stopLoss")
+    take_profit: float = Field(alias="takeProfit")
+
+
+class BacktestsRunParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    candles: list[BacktestCandle] = Field(min_length=2)
+    signals: list[BacktestSignalInput] = Field(min_length=1)
+
+
+class DevicePairParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    deviceId: str = Field(min_length=1)
+    platform: str = Field(min_length=1)
+    label: str = Field(min_length=1)
+    pushToken: str = Field(min_length=1)
+
+
+class DeviceNotifyParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    deviceId: str = Field(min_length=1)
+    message: str = Field(min_length=1)
+
+
+class DeviceUnpairParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    deviceId: str = Field(min_length=1)
+
+
+class DeviceRegisterPushParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    deviceId: str = Field(min_length=1)
+    pushToken: str = Field(min_length=1)
+
+
+class TradesPlaceParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    intent: TradeIntent
+    policy: RiskPolicy
+    snapshot: AccountRiskSnapshot
+
+
+class TradesModifyParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    account_id: str = Field(alias="accountId", min_length=1)
+    order_id: str = Field(alias="orderId", min_length=1)
+    open_price: float = Field(alias="openPrice")
+    stop_loss: float | None = Field(default=None, alias="stopLoss")
+    take_profit: float | None = Field(default=None, alias="takeProfit")
+
+
+class TradesCancelParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    account_id: str = Field(alias="accountId", min_length=1)
+    order_id: str = Field(alias="orderId", min_length=1)
+
+
+class TradesClosePositionParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    account_id: str = Field(alias="accountId", min_length=1)
+    position_id: str = Field(alias="positionId", min_length=1)
+
+
+class AccountsConnectParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    account_id: str = Field(alias="accountId", min_length=1)
+    connector_id: str = Field(alias="connectorId", min_length=1)
+    provider_account_id: str = Field(alias="providerAccountId", min_length=1)
+    mode: str = Field(min_length=1)
+    label: str = Field(min_length=1)
+    allowed_symbols: list[str] = Field(alias="allowedSymbols", default_factory=list)
+
+
+class AccountIdParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    account_id: str = Field(alias="accountId", min_length=1)
+
+
+class FeedSubscribeParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    topics: list[str] = Field(min_length=1)
+    symbols: list[str] = Field(default_factory=list)
+    timeframes: list[str] = Field(default_factory=list)
+
+
+class FeedUnsubscribeParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    subscription_id: str = Field(alias="subscriptionId", min_length=1)
+
+
+class FeedGetCandlesParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    symbol: str = Field(min_length=1)
+    timeframe: str = Field(min_length=1)
+    limit: int = Field(default=200, ge=1, le=500)
+
+
+class ConfigPatchParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    patch: dict[str, Any] = Field(default_factory=dict)
+
+
+class AgentsCreateParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    agent_id: str = Field(alias="agentId", min_length=1)
+    label: str = Field(min_length=1)
+    soul_template: str = Field(alias="soulTemplate", min_length=1)
+    manual_template: str = Field(alias="manualTemplate", min_length=1)
+
+
+class AgentsGetParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    agent_id: str = Field(alias="agentId", min_length=1)
+
+
+class CopytradeSignalParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    signal_id: str = Field(alias="signalId", min_length=1)
+    strategy_id: str = Field(alias="strategyId", min_length=1)
+    ts: str = Field(min_length=1)
+    symbol: str = Field(min_length=1)
+    timeframe: str = Field(min_length=1)
+    action: Literal["OPEN", "MODIFY", "CLOSE"]
+    side: Literal["buy", "sell"]
+    volume: float = Field(gt=0)
+    entry: float
+    stop_loss: float = Field(alias="stopLoss")
+    take_profit: float = Field(alias="takeProfit")
+
+
+class CopytradeConstraintsParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    allowed_symbols: list[str] = Field(alias="allowedSymbols", default_factory=list)
+    max_volume: float = Field(alias="maxVolume", gt=0)
+    direction_filter: Literal["both", "long-only", "short-only"] = Field(
+        alias="directionFilter",
+        default="both",
+    )
+    max_signal_age_seconds: int = Field(alias="maxSignalAgeSeconds", ge=1)
+
+
+class CopytradePreviewParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    account_id: str = Field(alias="accountId", min_length=1)
+    signal: CopytradeSignalParams
+    constraints: CopytradeConstraintsParams
+
+
+class MarketplaceFollowParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    account_id: str = Field(alias="accountId", min_length=1)
+    strategy_id: str = Field(alias="strategyId", min_length=1)
+
+
+class MarketplaceMyFollowsParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    account_id: str = Field(alias="accountId", min_length=1)
+
+
+class CopytradeControlParams(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        alias_generator=to_camel,
+        populate_by_name=True,
+    )
+
+    account_id: str = Field(alias="accountId", min_length=1)
+    strategy_id: str = Field(alias="strategyId", min_length=1)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.gateway.dispatch import (
+    GatewaySession,
+    MethodRegistry,
+    MethodResult,
+    dispatch_request,
+    error_response,
+)
+from app.gateway.events import EventSubscription
+from app.gateway.metrics import UNKNOWN_METHOD
+from app.protocol.frames import RequestFrame
+
+EVENTS_SEND_LABEL = "events"
+
+logger = logging.getLogger(__name__)
+
+FrameSender = Callable[[dict[str, Any], str | None], Awaitable[None]]
+
+
+class RequestPipeline:
+    def __init__(
+        self,
+        *,
+        registry: MethodRegistry,
+        session: GatewaySession,
+        send: FrameSender,
+        max_in_flight: int,
+    ) -> None:
+        self._registry = registry
+        self._session = session
+        self._send = send
+        self._slots = asyncio.Semaphore(max(max_in_flight, 1))
+        self._send_lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def submit(self, frame: RequestFrame) -> None:
+        await self._slots.acquire()
+        task = asyncio.create_task(self._process(frame))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def send_result(self, result: MethodResult, *, method: str | None = None) -> None:
+        async with self._send_lock:
+            for outbound in result.frames:
+                await self._send(outbound, method)
+
+    async def forward_events(self, subscription: EventSubscription) -> None:
+        while True:
+            event = await subscription.next()
+            async with self._send_lock:
+                await self._send(event, EVENTS_SEND_LABEL)
+
+    async def _process(self, frame: RequestFrame) -> None:
+        try:
+            try:
+                result = await dispatch_request(self._registry, self._session, frame)
+            except Exception:
+                # The exception text can carry paths, SQL or state, so it stays in the log.
+                logger.exception("request %s (%s) failed", frame.id, frame.method)
+                result = MethodResult(
+                    error_response(frame.id, code="INTERNAL_ERROR", message="internal error")
+                )
+            for event in result.events:
+                self._session.event_bus.publish(event, origin=self._session.session_id)
+            label = frame.method if frame.method in self._registry else UNKNOWN_METHOD
+            with self._session.metrics.phase(label, "send"):
+                await self.send_result(result, method=label)
+        finally:
+            self._slots.release()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Literal
+
+from app.config.loader import GatewayWorkersConfig
+
+WorkerKind = Literal["thread", "process"]
+
+
+def _timed_call[T](fn: Callable[..., T], args: tuple, kwargs: dict) -> tuple[float, float, T]:
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return started, time.time(), result
+
+
+@dataclass(slots=True)
+class LatencyStats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: float = 0.0
+
+    def record(self, value_ms: float) -> None:
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+        self.last_ms = value_ms
+
+    def as_payload(self) -> dict[str, float]:
+        avg_ms = self.total_ms / self.count if self.count else 0.0
+        return {
+            "avgMs": round(avg_ms, 3),
+            "maxMs": round(self.max_ms, 3),
+            "lastMs": round(self.last_ms, 3),
+        }
+
+
+class WorkerPool:
+    def __init__(self, *, name: str, kind: WorkerKind, max_workers: int) -> None:
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(max_workers, 1)
+        self._executor: Executor | None = None
+        self._executor_lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait = LatencyStats()
+        self._run = LatencyStats()
+        self._total = LatencyStats()
+
+    async def run[T](self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        self._in_flight += 1
+        try:
+            started, finished, result = await loop.run_in_executor(
+                self._ensure_executor(),
+                partial(_timed_call, fn, args, kwargs),
+            )
+        except BaseException:
+            self._failed += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+        self._completed += 1
+        self._wait.record(max(started - submitted, 0.0) * 1000)
+        self._run.record(max(finished - started, 0.0) * 1000)
+        self._total.record(max(time.time() - submitted, 0.0) * 1000)
+        return result
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "maxWorkers": self.max_workers,
+            "inFlight": self._in_flight,
+            "running": min(self._in_flight, self.max_workers),
+            "queueDepth": max(self._in_flight - self.max_workers, 0),
+            "completed": self._completed,
+            "failed": self._failed,
+            "queueWait": self._wait.as_payload(),
+            "run": self._run.as_payload(),
+            "latency": self._total.as_payload(),
+        }
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _ensure_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=f"gateway-{self.name}",
+                    )
+            return self._executor
+
+
+@dataclass(slots=True)
+class GatewayWorkers:
+    cpu: WorkerPool = field(
+        default_factory=lambda: WorkerPool(name="cpu", kind="thread", max_workers=2)
+    )
+    io: WorkerPool = field(
+        default_factory=lambda: WorkerPool(name="io", kind="thread", max_workers=4)
+    )
+
+    @classmethod
+    def from_config(cls, config: GatewayWorkersConfig) -> GatewayWorkers:
+        return cls(
+            cpu=WorkerPool(name="cpu", kind=config.cpu.kind, max_workers=config.cpu.max_workers),
+            io=WorkerPool(name="io", kind="thread", max_workers=config.io_max_workers),
+        )
+
+    def metrics(self) -> dict[str, Any]:
+        return {"cpu": self.cpu.metrics(), "io": self.io.metrics()}
+
+    def shutdown(self) -> None:
+        self.cpu.shutdown()
+        self.io.shutdown()
@@ -1,7 +1,13 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import UTC, datetime
 from pathlib import Path
 
 from fastapi import FastAPI, WebSocket
+from fastapi.responses import PlainTextResponse
 
 from app.accounts.registry import AccountRegistry
 from app.agents.registry import AgentRegistry
@@ -9,14 +15,22 @@ from app.audit.store import AuditStore
 from app.config.loader import AppConfig, default_config, load_config
 from app.devices.registry import DeviceRegistry
 from app.feeds.service import FeedService
+from app.gateway.compression import FrameCompressor
+from app.gateway.events import EventBus
+from app.gateway.metrics import GatewayMetrics
+from app.gateway.workers import GatewayWorkers
 from app.gateway.ws_handler import handle_gateway_websocket
-from app.memory.index import MemoryIndex
+from app.memory.index import MemoryIndex, PartitionedMemoryIndex
+from app.memory.watcher import MemoryWatcher
 from app.plugins.registry import PluginConfig, PluginRecord, PluginRegistry
 from app.queues.agent_queue import AgentQueue
 from app.queues.snapshot_store import QueueSnapshotStore
 from app.risk.control import RiskControlState
+from app.storage.state_store import SqliteStateStore
 from app.trades.service import TradeExecutionService
 
+logger = logging.getLogger(__name__)
+
 
 def create_app(
     *,
@@ -50,41 +64,136 @@ def create_app(
         plugin_registry.register_plugin(PluginRecord(plugin_id="metaapi_mcp", kind="connector"))
     resolved_plugins = plugin_registry.resolve()
 
-    app = FastAPI(title="OpenClaw Inspired Platform Backend")
+    gateway_workers = GatewayWorkers.from_config(config.gateway.workers)
+    gateway_metrics = GatewayMetrics()
+
+    async def compact_audit_log() -> None:
+        while True:
+            await asyncio.sleep(config.audit.compaction.interval_seconds)
+            try:
+                await gateway_workers.io.run(app.state.audit_store.compact)
+            except Exception:
+                # One bad pass (disk full, a corrupt segment) must not stop later ones.
+                logger.exception("audit compaction failed")
+
+    async def stop_task(task: asyncio.Task[None]) -> None:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        async with contextlib.AsyncExitStack() as shutdown:
+            # Callbacks run last-registered first, and each one runs even if another raised.
+            if state_store is not None:
+                shutdown.callback(state_store.close)
+            shutdown.callback(app.state.device_registry.close)
+            shutdown.callback(app.state.account_registry.close)
+            shutdown.callback(app.state.agent_registry.close)
+            shutdown.callback(queue_snapshot_store.close)
+            shutdown.callback(queue_snapshot_store.save, app.state.agent_queues)
+            shutdown.callback(app.state.audit_store.close)
+            shutdown.callback(gateway_workers.shutdown)
+            shutdown.callback(app.state.memory_watcher.close)
+            if config.audit.compaction.enabled:
+                shutdown.push_async_callback(stop_task, asyncio.create_task(compact_audit_log()))
+            yield
+
+    app = FastAPI(title="OpenClaw Inspired Platform Backend", lifespan=lifespan)
     state_dir = Path(data_dir) / "state"
     state_dir.mkdir(parents=True, exist_ok=True)
-    queue_snapshot_store = QueueSnapshotStore(state_path=state_dir / "agent_queues.json")
+    state_storage = config.storage.state
+    coalesce_seconds = state_storage.coalesce_ms / 1000
+    state_store = (
+        SqliteStateStore(state_dir / "state.db", fsync=state_storage.fsync)
+        if state_storage.backend == "sqlite"
+        else None
+    )
+    queue_snapshot_store = QueueSnapshotStore(
+        state_path=state_dir / "agent_queues.json",
+        fsync=state_storage.fsync,
+        state_store=state_store,
+    )
 
     app.state.started_at = datetime.now(UTC)
     app.state.app_config = config
     app.state.agent_queues: dict[str, AgentQueue] = queue_snapshot_store.load()
     app.state.queue_snapshot_store = queue_snapshot_store
-    app.state.audit_store = AuditStore(data_dir=data_dir)
+    app.state.audit_store = AuditStore(
+        data_dir=data_dir,
+        on_append=gateway_metrics.observe_audit,
+        backend=config.audit.backend,
+        durability=config.audit.durability,
+        max_batch=config.audit.max_batch,
+        max_segment_bytes=config.audit.max_segment_bytes,
+        max_segment_seconds=config.audit.max_segment_seconds,
+        index_interval=config.audit.index_interval,
+        compression=config.audit.compaction.codec,
+        retention_days=config.audit.compaction.retention_days,
+    )
     app.state.agent_registry = AgentRegistry(
         state_path=state_dir / "agents.json",
+        state_store=state_store,
         workspace_base_dir=Path(data_dir) / "agents",
+        fsync=state_storage.fsync,
+        coalesce_seconds=coalesce_seconds,
+    )
+    app.state.account_registry = AccountRegistry(
+        state_path=state_dir / "accounts.json",
+        state_store=state_store,
+        fsync=state_storage.fsync,
+        coalesce_seconds=coalesce_seconds,
+    )
+    with app.state.account_registry.batched():
+        for configured_account in config.accounts:
+            app.state.account_registry.connect(
+                account_id=configured_account.account_id,
+                connector_id=configured_account.connector_id,
+                provider_account_id=configured_account.provider_account_id,
+                mode=configured_account.mode,
+                label=configured_account.label,
+                allowed_symbols=configured_account.allowed_symbols,
+            )
+    app.state.device_registry = DeviceRegistry(
+        state_path=state_dir / "devices.json",
+        state_store=state_store,
+        fsync=state_storage.fsync,
+        coalesce_seconds=coalesce_seconds,
     )
-    app.state.account_registry = AccountRegistry(state_path=state_dir / "accounts.json")
-    for configured_account in config.accounts:
-        app.state.account_registry.connect(
-            account_id=configured_account.account_id,
-            connector_id=configured_account.connector_id,
-            provider_account_id=configured_account.provider_account_id,
-            mode=configured_account.mode,
-            label=configured_account.label,
-            allowed_symbols=configured_account.allowed_symbols,
-        )
-    app.state.device_registry = DeviceRegistry(state_path=state_dir / "devices.json")
     app.state.feed_service = FeedService()
-    app.state.memory_index = MemoryIndex(db_path=Path(data_dir) / "memory.db")
+    app.state.memory_index = (
+        PartitionedMemoryIndex(root_dir=Path(data_dir) / "memory")
+        if config.memory.partitioning == "per_workspace"
+        else MemoryIndex(db_path=Path(data_dir) / "memory.db")
+    )
+    app.state.memory_watcher = MemoryWatcher(
+        app.state.memory_index,
+        backend=config.memory.watcher.backend,
+        poll_seconds=config.memory.watcher.poll_seconds,
+        debounce_seconds=config.memory.watcher.debounce_ms / 1000,
+        max_workspaces=config.memory.watcher.max_workspaces,
+    )
+    for agent in app.state.agent_registry.list():
+        app.state.memory_watcher.watch(agent.workspace_path)
     app.state.resolved_plugins = resolved_plugins
     app.state.risk_control_state = RiskControlState()
     app.state.trade_execution_service = TradeExecutionService()
+    app.state.gateway_workers = gateway_workers
+    app.state.frame_compressor = FrameCompressor.from_config(config.gateway.compression)
+    app.state.gateway_metrics = gateway_metrics
+    app.state.event_bus = EventBus.from_config(config.gateway.events)
 
     @app.get("/health")
     async def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(
+            app.state.gateway_metrics.render_prometheus(),
+            media_type="text/plain; version=0.0.4",
+        )
+
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket) -> None:
         await handle_gateway_websocket(
@@ -99,9 +208,14 @@ def create_app(
             device_registry=app.state.device_registry,
             feed_service=app.state.feed_service,
             memory_index=app.state.memory_index,
+            memory_watcher=app.state.memory_watcher,
             resolved_plugins=app.state.resolved_plugins,
             risk_control_state=app.state.risk_control_state,
             trade_execution_service=app.state.trade_execution_service,
+            gateway_workers=app.state.gateway_workers,
+            frame_compressor=app.state.frame_compressor,
+            gateway_metrics=app.state.gateway_metrics,
+            event_bus=app.state.event_bus,
         )
 
     return app
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+# Budgets are whitespace-separated tokens, close enough to model tokens for sizing.
+MAX_CHUNK_TOKENS = 256
+MIN_CHUNK_TOKENS = 32
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(`{3,}|~{3,})")
+_LIST_ITEM = re.compile(r"^(\s*)(?:[-*+]|\d+[.)])\s+")
+
+
+@dataclass(slots=True, frozen=True)
+class MarkdownChunk:
+    start_line: int
+    end_line: int
+    heading_path: str
+    text: str
+
+
+@dataclass(slots=True)
+class _Block:
+    start: int
+    end: int
+    heading_path: str
+    tokens: int
+    is_heading: bool = False
+
+
+def chunk_markdown(
+    text: str,
+    *,
+    max_tokens: int = MAX_CHUNK_TOKENS,
+    min_tokens: int = MIN_CHUNK_TOKENS,
+) -> list[MarkdownChunk]:
+    """Split markdown on its structure instead of fixed line windows.
+
+    Headings start a new chunk and set its heading path (``Manual > Risk``). Paragraphs,
+    list items and fenced code blocks are kept whole unless they exceed ``max_tokens``.
+    A chunk under ``min_tokens`` is merged into the next one when that one belongs to
+    the same section or a subsection of it.
+    """
+    lines = text.splitlines()
+    spans = _pack(_blocks(lines, max_tokens), max_tokens)
+    spans = _merge_small(spans, min_tokens, max_tokens)
+
+    chunks = []
+    for start, end, heading_path, _tokens in spans:
+        snippet = "\n".join(lines[start:end]).strip()
+        if snippet:
+            chunks.append(MarkdownChunk(start + 1, end, heading_path, snippet))
+    return chunks
+
+
+def _blocks(lines: list[str], max_tokens: int) -> list[_Block]:
+    blocks: list[_Block] = []
+    headings: list[tuple[int, str]] = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        if not line.strip():
+            index += 1
+            continue
+
+        is_heading = False
+        if fence := _FENCE.match(line):
+            end = index + 1
+            while end < len(lines) and not lines[end].lstrip().startswith(fence.group(1)):
+                end += 1
+            end = min(end + 1, len(lines))
+        elif heading := _HEADING.match(line):
+            level = len(heading.group(1))
+            while headings and headings[-1][0] >= level:
+                headings.pop()
+            headings.append((level, heading.group(2)))
+            end = index + 1
+            is_heading = True
+        elif item := _LIST_ITEM.match(line):
+            # An item runs until a blank line, a new block, or a sibling/parent item.
+            indent = len(item.group(1))
+            end = index + 1
+            while end < len(lines) and not _starts_block(lines[end]):
+                nested = _LIST_ITEM.match(lines[end])
+                if nested and len(nested.group(1)) <= indent:
+                    break
+                end += 1
+        else:
+            end = index + 1
+            while end < len(lines) and not _starts_block(lines[end]):
+                if _LIST_ITEM.match(lines[end]):
+                    break
+                end += 1
+
+        heading_path = " > ".join(title for _, title in headings)
+        blocks.extend(_split_oversized(lines, index, end, heading_path, is_heading, max_tokens))
+        index = end
+    return blocks
+
+
+def _starts_block(line: str) -> bool:
+    return not line.strip() or bool(_HEADING.match(line) or _FENCE.match(line))
+
+
+def _split_oversized(
+    lines: list[str],
+    start: int,
+    end: int,
+    heading_path: str,
+    is_heading: bool,
+    max_tokens: int,
+) -> list[_Block]:
+    pieces: list[_Block] = []
+    piece_start, tokens = start, 0
+    for index in range(start, end):
+        line_tokens = len(lines[index].split())
+        if tokens and tokens + line_tokens > max_tokens:
+            pieces.append(_Block(piece_start, index, heading_path, tokens))
+            piece_start, tokens = index, 0
+        tokens += line_tokens
+    pieces.append(_Block(piece_start, end, heading_path, tokens, is_heading))
+    return pieces
+
+
+def _pack(blocks: list[_Block], max_tokens: int) -> list[tuple[int, int, str, int]]:
+    spans: list[tuple[int, int, str, int]] = []
+    current: _Block | None = None
+    for block in blocks:
+        if current is not None and (
+            block.is_heading
+            or block.heading_path != current.heading_path
+            or current.tokens + block.tokens > max_tokens
+        ):
+            spans.append((current.start, current.end, current.heading_path, current.tokens))
+            current = None
+        if current is None:
+            current = _Block(block.start, block.end, block.heading_path, block.tokens)
+        else:
+            current.end = block.end
+            current.tokens += block.tokens
+    if current is not None:
+        spans.append((current.start, current.end, current.heading_path, current.tokens))
+    return spans
+
+
+def _merge_small(
+    spans: list[tuple[int, int, str, int]],
+    min_tokens: int,
+    max_tokens: int,
+) -> list[tuple[int, int, str, int]]:
+    merged: list[tuple[int, int, str, int]] = []
+    carry: tuple[int, int, str, int] | None = None
+    for span in spans:
+        if carry is not None:
+            start, _, path, tokens = carry
+            if _within(span[2], path) and tokens + span[3] <= max_tokens:
+                # The merged chunk takes the deeper path, which still names the parent.
+                span = (start, span[1], span[2], tokens + span[3])
+            else:
+                merged.append(carry)
+            carry = None
+        if span[3] < min_tokens:
+            carry = span
+        else:
+            merged.append(span)
+    if carry is not None:
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None
+            and previous[2] == carry[2]
+            and previous[3] + carry[3] <= max_tokens
+        ):
+            merged[-1] = (previous[0], carry[1], previous[2], previous[3] + carry[3])
+        else:
+            merged.append(carry)
+    return merged
+
+
+def _within(path: str, section: str) -> bool:
+    return path == section or not section or path.startswith(f"{section} > ")
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 import sqlite3
-from dataclasses import dataclass
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from app.memory.chunking import chunk_markdown
+
 
 @dataclass(slots=True)
 class MemorySearchResult:
@@ -13,6 +19,47 @@ class MemorySearchResult:
     snippet: str
     score: float
     source: str = "fts"
+    heading_path: str = ""
+
+
+@dataclass(slots=True)
+class IndexStats:
+    scanned: int = 0
+    indexed: int = 0
+    removed: int = 0
+    chunks: int = 0
+    write_seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.write_seconds if self.write_seconds else 0.0
+
+
+@dataclass(slots=True)
+class _WriteBatch:
+    stale_paths: list[str] = field(default_factory=list)
+    chunk_rows: list[tuple[str, str, int, int, str, str]] = field(default_factory=list)
+    manifest_rows: list[tuple[str, int, int, str]] = field(default_factory=list)
+    forgotten: list[str] = field(default_factory=list)
+    reindexed: int = 0
+
+    @property
+    def files(self) -> int:
+        return len(self.manifest_rows) + len(self.forgotten)
+
+    def forget(self, path: str) -> None:
+        self.stale_paths.append(path)
+        self.forgotten.append(path)
+
+
+# Files re-synced per transaction by ``index_workspace``.
+BATCH_FILES = 256
+
+# bm25 weight of the heading path relative to the chunk text.
+HEADING_WEIGHT = 4.0
+
+# Stored in ``PRAGMA user_version``. 1: workspace keys and paths come from resolved paths.
+_SCHEMA_VERSION = 1
 
 
 class MemoryIndex:
@@ -21,16 +68,34 @@ class MemoryIndex:
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
         self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
         self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
         self._initialize_schema()
 
     def _initialize_schema(self) -> None:
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if columns and (
+            not {"workspace_key", "heading_path"} <= columns or version < _SCHEMA_VERSION
+        ):
+            # Chunks from before workspace partitioning carry no owner, fixed line windows
+            # no heading path, and older keys hashed unresolved paths. The index is only a
+            # cache of the workspace files, so it is rebuilt rather than migrated.
+            self._conn.executescript(
+                """
+                DROP TABLE IF EXISTS chunks_fts;
+                DROP TABLE IF EXISTS chunks;
+                DROP TABLE IF EXISTS files;
+                """
+            )
         self._conn.execute(
             """
             CREATE TABLE IF NOT EXISTS chunks (
               id INTEGER PRIMARY KEY AUTOINCREMENT,
               path TEXT NOT NULL,
+              workspace_key TEXT NOT NULL,
               start_line INTEGER NOT NULL,
               end_line INTEGER NOT NULL,
+              heading_path TEXT NOT NULL,
               snippet TEXT NOT NULL
             )
             """
@@ -38,68 +103,221 @@ class MemoryIndex:
         self._conn.execute(
             """
             CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts
-            USING fts5(snippet, content='chunks', content_rowid='id')
+            USING fts5(
+              snippet, workspace_key, heading_path, content='chunks', content_rowid='id'
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_path ON chunks(path)")
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS stale_paths(path TEXT PRIMARY KEY)")
+        # One row per indexed file; a file is only re-read when its mtime or size moves,
+        # and only re-chunked when its content hash changes.
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+              path TEXT PRIMARY KEY,
+              mtime_ns INTEGER NOT NULL,
+              size INTEGER NOT NULL,
+              content_hash TEXT NOT NULL
+            )
             """
         )
+        self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
         self._conn.commit()
 
-    def index_workspace(self, workspace_dir: str | Path) -> None:
-        workspace = Path(workspace_dir)
+    def index_workspace(self, workspace_dir: str | Path) -> IndexStats:
+        """Bring the index in line with the workspace's ``*.md`` files.
+
+        Unchanged files cost one ``stat``; only added, modified and deleted files are
+        written, ``BATCH_FILES`` at a time with one transaction per batch.
+        """
+        workspace = Path(workspace_dir).resolve()
         markdown_files = sorted(path for path in workspace.rglob("*.md") if path.is_file())
+        stats = IndexStats(scanned=len(markdown_files))
+        key = workspace_key(workspace)
 
-        for markdown_file in markdown_files:
-            self._reindex_file(markdown_file)
+        with self._lock:
+            manifest = self._manifest_under(workspace)
+            batch = _WriteBatch()
+            for markdown_file in markdown_files:
+                known = manifest.pop(str(markdown_file), None)
+                self._sync_file(markdown_file, known, key, batch)
+                if batch.files >= BATCH_FILES:
+                    self._write(batch, stats)
+                    batch = _WriteBatch()
+            for removed_path in manifest:
+                batch.forget(removed_path)
+            self._write(batch, stats)
+        return stats
 
-        self._conn.commit()
+    def apply_changes(
+        self,
+        workspace_dir: str | Path,
+        paths: Iterable[str | Path],
+    ) -> IndexStats:
+        """Re-sync just ``paths`` of one workspace in one transaction.
 
-    def _reindex_file(self, file_path: Path) -> None:
-        self._delete_chunks_for_path(str(file_path))
+        A path that no longer exists drops its file, or every file under it when it
+        was a directory.
+        """
+        key = workspace_key(workspace_dir)
+        root = Path(workspace_dir).resolve()
+        stats = IndexStats()
+        with self._lock:
+            batch = _WriteBatch()
+            for changed in sorted({_rebase(Path(path), workspace_dir, root) for path in paths}):
+                stats.scanned += 1
+                if changed.is_file():
+                    if changed.suffix != ".md":
+                        continue
+                    known = self._conn.execute(
+                        "SELECT mtime_ns, size, content_hash FROM files WHERE path = ?",
+                        (str(changed),),
+                    ).fetchone()
+                    self._sync_file(changed, known, key, batch)
+                elif not changed.exists():
+                    for removed_path in self._manifest_under(changed, including_root=True):
+                        batch.forget(removed_path)
+            self._write(batch, stats)
+        return stats
 
-        lines = file_path.read_text(encoding="utf-8").splitlines()
-        if not lines:
+    def _manifest_under(
+        self,
+        directory: Path,
+        *,
+        including_root: bool = False,
+    ) -> dict[str, sqlite3.Row]:
+        query = "SELECT path, mtime_ns, size, content_hash FROM files WHERE path >= ? AND path < ?"
+        args: tuple[str, ...] = _prefix_range(directory)
+        if including_root:
+            query += " OR path = ?"
+            args = (*args, str(directory))
+        return {row["path"]: row for row in self._conn.execute(query, args)}
+
+    def _sync_file(
+        self,
+        file_path: Path,
+        known: sqlite3.Row | None,
+        key: str,
+        batch: _WriteBatch,
+    ) -> None:
+        file_stat = file_path.stat()
+        if (
+            known is not None
+            and known["mtime_ns"] == file_stat.st_mtime_ns
+            and known["size"] == file_stat.st_size
+        ):
             return
+        content = file_path.read_bytes()
+        content_hash = hashlib.sha256(content).hexdigest()
+        path = str(file_path)
+        if known is None or known["content_hash"] != content_hash:
+            batch.stale_paths.append(path)
+            batch.chunk_rows.extend(_chunk_rows(path, key, content.decode("utf-8")))
+            batch.reindexed += 1
+        batch.manifest_rows.append((path, file_stat.st_mtime_ns, file_stat.st_size, content_hash))
 
-        chunk_size = 12
-        for start in range(0, len(lines), chunk_size):
-            end = min(start + chunk_size, len(lines))
-            snippet = "\n".join(lines[start:end]).strip()
-            if not snippet:
-                continue
-            cursor = self._conn.execute(
-                """
-                INSERT INTO chunks(path, start_line, end_line, snippet)
-                VALUES(?, ?, ?, ?)
-                """,
-                (str(file_path), start + 1, end, snippet),
-            )
-            row_id = cursor.lastrowid
-            self._conn.execute(
-                "INSERT INTO chunks_fts(rowid, snippet) VALUES(?, ?)",
-                (row_id, snippet),
-            )
+    def _write(self, batch: _WriteBatch, stats: IndexStats) -> None:
+        """Apply one batch with a handful of set-based statements in a single transaction."""
+        started = time.perf_counter()
+        try:
+            if batch.stale_paths:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO temp.stale_paths(path) VALUES(?)",
+                    [(path,) for path in batch.stale_paths],
+                )
+                # The external-content 'delete' command needs the indexed values, which
+                # are still in chunks at this point.
+                self._conn.execute(
+                    """
+                    INSERT INTO chunks_fts(
+                      chunks_fts, rowid, snippet, workspace_key, heading_path
+                    )
+                    SELECT 'delete', id, snippet, workspace_key, heading_path FROM chunks
+                    WHERE path IN (SELECT path FROM temp.stale_paths)
+                    """
+                )
+                self._conn.execute(
+                    "DELETE FROM chunks WHERE path IN (SELECT path FROM temp.stale_paths)"
+                )
+                self._conn.execute("DELETE FROM temp.stale_paths")
+            if batch.chunk_rows:
+                # AUTOINCREMENT never reuses ids, so the new rows are exactly those above
+                # the current maximum.
+                (last_id,) = self._conn.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM chunks"
+                ).fetchone()
+                self._conn.executemany(
+                    """
+                    INSERT INTO chunks(
+                      path, workspace_key, start_line, end_line, heading_path, snippet
+                    )
+                    VALUES(?, ?, ?, ?, ?, ?)
+                    """,
+                    batch.chunk_rows,
+                )
+                self._conn.execute(
+                    """
+                    INSERT INTO chunks_fts(rowid, snippet, workspace_key, heading_path)
+                    SELECT id, snippet, workspace_key, heading_path FROM chunks WHERE id > ?
+                    """,
+                    (last_id,),
+                )
+            if batch.forgotten:
+                self._conn.executemany(
+                    "DELETE FROM files WHERE path = ?", [(path,) for path in batch.forgotten]
+                )
+            if batch.manifest_rows:
+                self._conn.executemany(
+                    """
+                    INSERT INTO files(path, mtime_ns, size, content_hash) VALUES(?, ?, ?, ?)
+                    ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns,
+                      size = excluded.size, content_hash = excluded.content_hash
+                    """,
+                    batch.manifest_rows,
+                )
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        stats.indexed += batch.reindexed
+        stats.removed += len(batch.forgotten)
+        stats.chunks += len(batch.chunk_rows)
+        stats.write_seconds += time.perf_counter() - started
 
-    def _delete_chunks_for_path(self, path: str) -> None:
-        rows = self._conn.execute("SELECT id FROM chunks WHERE path = ?", (path,)).fetchall()
-        for row in rows:
-            self._conn.execute("DELETE FROM chunks_fts WHERE rowid = ?", (row["id"],))
-        self._conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+    def search(
+        self,
+        query: str,
+        *,
+        max_results: int = 10,
+        workspace: str | Path | None = None,
+    ) -> list[MemorySearchResult]:
+        """Full-text search, limited to one workspace's chunks when ``workspace`` is given.
 
-    def search(self, query: str, *, max_results: int = 10) -> list[MemorySearchResult]:
+        Terms may match a chunk's text or its heading path; heading matches rank higher.
+        """
         normalized = self._normalize_query(query)
         if not normalized:
             return []
+        match = f"{{snippet heading_path}} : ({normalized})"
+        if workspace is not None:
+            # The key is a single FTS token, so the partition filter is an index lookup
+            # that FTS intersects with the query terms instead of a scan of every match.
+            match = f'workspace_key : "{workspace_key(workspace)}" AND {match}'
 
-        rows = self._conn.execute(
-            """
-            SELECT c.path, c.start_line, c.end_line, c.snippet, bm25(chunks_fts) AS rank
-            FROM chunks_fts
-            JOIN chunks c ON chunks_fts.rowid = c.id
-            WHERE chunks_fts MATCH ?
-            ORDER BY rank
-            LIMIT ?
-            """,
-            (normalized, max_results),
-        ).fetchall()
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT c.path, c.start_line, c.end_line, c.heading_path, c.snippet,
+                  bm25(chunks_fts, 1.0, 0.0, ?) AS rank
+                FROM chunks_fts
+                JOIN chunks c ON chunks_fts.rowid = c.id
+                WHERE chunks_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (HEADING_WEIGHT, match, max_results),
+            ).fetchall()
 
         results: list[MemorySearchResult] = []
         for row in rows:
@@ -112,6 +330,7 @@ class MemoryIndex:
                     end_line=int(row["end_line"]),
                     snippet=row["snippet"],
                     score=score,
+                    heading_path=row["heading_path"],
                 )
             )
         return results
@@ -122,3 +341,83 @@ class MemoryIndex:
         if not tokens:
             return ""
         return " AND ".join(f'"{token}"' for token in tokens)
+
+
+class PartitionedMemoryIndex:
+    """One ``MemoryIndex`` database per workspace under ``root_dir``.
+
+    A scoped search only opens and ranks that workspace's own chunks, so its latency
+    tracks the agent's memory rather than everyone's.
+    """
+
+    def __init__(self, *, root_dir: str | Path):
+        self._root_dir = Path(root_dir)
+        self._root_dir.mkdir(parents=True, exist_ok=True)
+        self._indexes: dict[str, MemoryIndex] = {}
+        self._lock = threading.Lock()
+
+    def index_workspace(self, workspace_dir: str | Path) -> IndexStats:
+        return self._partition(workspace_key(workspace_dir)).index_workspace(workspace_dir)
+
+    def apply_changes(
+        self,
+        workspace_dir: str | Path,
+        paths: Iterable[str | Path],
+    ) -> IndexStats:
+        return self._partition(workspace_key(workspace_dir)).apply_changes(workspace_dir, paths)
+
+    def search(
+        self,
+        query: str,
+        *,
+        max_results: int = 10,
+        workspace: str | Path | None = None,
+    ) -> list[MemorySearchResult]:
+        if workspace is not None:
+            partition = self._partition(workspace_key(workspace))
+            return partition.search(query, max_results=max_results)
+
+        results = [
+            result
+            for db_path in sorted(self._root_dir.glob("ws*.db"))
+            for result in self._partition(db_path.stem).search(query, max_results=max_results)
+        ]
+        return sorted(results, key=lambda result: result.score, reverse=True)[:max_results]
+
+    def _partition(self, key: str) -> MemoryIndex:
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = MemoryIndex(db_path=self._root_dir / f"{key}.db")
+            return index
+
+
+def _chunk_rows(path: str, key: str, text: str) -> list[tuple[str, str, int, int, str, str]]:
+    return [
+        (path, key, chunk.start_line, chunk.end_line, chunk.heading_path, chunk.text)
+        for chunk in chunk_markdown(text)
+    ]
+
+
+def workspace_key(workspace_dir: str | Path) -> str:
+    """The partition id chunks of ``workspace_dir`` are tagged with.
+
+    The path is resolved first, so relative, trailing-slash and symlinked spellings of one
+    workspace share a partition.
+    """
+    resolved = str(Path(workspace_dir).resolve())
+    return "ws" + hashlib.sha1(resolved.encode("utf-8")).hexdigest()[:16]
+
+
+def _rebase(path: Path, workspace_dir: str | Path, root: Path) -> Path:
+    """``path`` under the resolved workspace ``root``, matching what ``rglob`` stores."""
+    try:
+        return root / path.relative_to(workspace_dir)
+    except ValueError:
+        return path.parent.resolve() / path.name
+
+
+def _prefix_range(workspace: Path) -> tuple[str, str]:
+    """Bounds selecting every path stored under ``workspace`` with an index range scan."""
+    prefix = str(workspace / "_")[:-1]
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import ctypes
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Literal, Protocol
+
+from app.memory.index import MemoryIndex, PartitionedMemoryIndex
+
+WatcherBackend = Literal["auto", "inotify", "poll"]
+
+# A file that keeps changing is still applied at least this often.
+MAX_BATCH_DELAY_SECONDS = 1.0
+
+# How long a search waits for the watcher's first sync before indexing inline.
+READY_TIMEOUT_SECONDS = 10.0
+
+MAX_WATCHED_WORKSPACES = 256
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class ChangeSource(Protocol):
+    def add(self, workspace: Path) -> None: ...
+
+    def remove(self, workspace: Path) -> None: ...
+
+    def wait(self, timeout: float) -> tuple[set[Path], bool]:
+        """Block up to ``timeout``; returns changed paths and whether a full rescan is due."""
+        ...
+
+    def wake(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class MemoryWatcher:
+    """Keeps a ``MemoryIndex`` in step with watched workspaces from a background thread.
+
+    Notifications (inotify where available, otherwise a periodic mtime/size scan) only
+    queue paths. Once the queue has been quiet for ``debounce_seconds`` the whole batch
+    is applied with ``MemoryIndex.apply_changes`` in one transaction, so searches never
+    touch the filesystem.
+
+    At most ``max_workspaces`` workspaces are watched; past that the least recently
+    watched one is dropped, and watching it again resyncs it through the manifest.
+    """
+
+    def __init__(
+        self,
+        index: MemoryIndex | PartitionedMemoryIndex,
+        *,
+        backend: WatcherBackend = "auto",
+        poll_seconds: float = 2.0,
+        debounce_seconds: float = 0.2,
+        max_workspaces: int = MAX_WATCHED_WORKSPACES,
+    ) -> None:
+        source: ChangeSource | None = None
+        if backend != "poll":
+            source = _open_inotify()
+            if source is None and backend == "inotify":
+                raise ValueError("inotify is not available on this platform")
+        self._source: ChangeSource = source or _PollingSource(poll_seconds)
+        self.backend: Literal["inotify", "poll"] = "poll" if source is None else "inotify"
+        self._index = index
+        self._debounce_seconds = debounce_seconds
+        self._max_workspaces = max(max_workspaces, 1)
+        self._lock = threading.Lock()
+        # Least recently watched first.
+        self._ready: OrderedDict[str, threading.Event] = OrderedDict()
+        self._unsynced: list[tuple[Path, threading.Event]] = []
+        self._evicted: list[Path] = []
+        # Watched roots that did not exist yet; they are picked up once they do.
+        self._missing: set[Path] = set()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self.batches = 0
+        self.last_error: str | None = None
+
+    def watch(self, workspace_dir: str | Path) -> threading.Event:
+        """Start watching a workspace; the returned event is set after its first sync."""
+        # Resolved like the index keys, so one directory is only ever watched once.
+        workspace = Path(workspace_dir).resolve()
+        key = str(workspace)
+        with self._lock:
+            ready = self._ready.get(key)
+            if ready is not None:
+                self._ready.move_to_end(key)
+                if self._closed or workspace not in self._missing or not workspace.is_dir():
+                    return ready
+                # Created since it was first watched: sync it before anyone searches it.
+                self._missing.discard(workspace)
+                ready.clear()
+            else:
+                ready = self._ready[key] = threading.Event()
+                if self._closed:
+                    ready.set()
+                    return ready
+                if len(self._ready) > self._max_workspaces:
+                    evicted, _ = self._ready.popitem(last=False)
+                    self._evicted.append(Path(evicted))
+                    self._missing.discard(Path(evicted))
+            self._unsynced.append((workspace, ready))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="memory-watcher", daemon=True
+                )
+                self._thread.start()
+        self._source.wake()
+        return ready
+
+    def ensure_watched(
+        self,
+        workspace_dir: str | Path,
+        *,
+        timeout: float = READY_TIMEOUT_SECONDS,
+    ) -> None:
+        """Wait for the first sync; reindex on this thread if the watcher has not got to it."""
+        if not self.watch(workspace_dir).wait(timeout):
+            self._index.index_workspace(workspace_dir)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._source.wake()
+        if thread is not None:
+            thread.join()
+        self._source.close()
+
+    def _run(self) -> None:
+        pending: set[Path] = set()
+        first_pending_at = 0.0
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                for workspace in [path for path in self._missing if path.is_dir()]:
+                    self._missing.discard(workspace)
+                    self._unsynced.append((workspace, self._ready[str(workspace)]))
+                unsynced, self._unsynced = self._unsynced, []
+                evicted, self._evicted = self._evicted, []
+                # Taken under the lock because watch() changes it from other threads.
+                watched = [Path(key) for key in self._ready]
+            for workspace, ready in unsynced:
+                try:
+                    if workspace.is_dir():
+                        self._guarded(self._source.add, workspace)
+                    else:
+                        with self._lock:
+                            if str(workspace) in self._ready:
+                                self._missing.add(workspace)
+                    self._guarded(self._index.index_workspace, workspace)
+                finally:
+                    ready.set()
+            for workspace in evicted:
+                self._guarded(self._forget, workspace, watched)
+
+            changed, rescan = self._source.wait(
+                self._debounce_seconds if pending else MAX_BATCH_DELAY_SECONDS
+            )
+            if rescan:
+                # Events were lost, so every workspace needs a full comparison.
+                pending.clear()
+                for workspace in watched:
+                    self._guarded(self._index.index_workspace, workspace)
+                continue
+            if changed:
+                if not pending:
+                    first_pending_at = time.monotonic()
+                pending |= changed
+                if time.monotonic() - first_pending_at < MAX_BATCH_DELAY_SECONDS:
+                    continue
+            if pending:
+                for workspace, paths in _by_workspace(pending, watched).items():
+                    self._guarded(self._index.apply_changes, workspace, paths)
+                self.batches += 1
+                pending = set()
+
+    def _forget(self, workspace: Path, watched: list[Path]) -> None:
+        if any(other == workspace or other in workspace.parents for other in watched):
+            # Watched again since, or still covered by a watched parent.
+            return
+        self._source.remove(workspace)
+        for other in watched:
+            if workspace in other.parents:
+                self._source.add(other)
+
+    def _guarded(self, apply: Callable[..., object], *args: Any) -> None:
+        # Nothing may stop the watcher thread, or searches would wait on it for nothing;
+        # the error stays visible until the next one.
+        try:
+            apply(*args)
+        except Exception as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"
+
+
+class _PollingSource:
+    """Finds changes by comparing the mtime and size of every ``*.md`` file per interval."""
+
+    def __init__(self, poll_seconds: float) -> None:
+        self._poll_seconds = poll_seconds
+        self._snapshots: dict[Path, dict[Path, tuple[int, int]]] = {}
+        self._wakeup = threading.Event()
+        self._next_scan = time.monotonic() + poll_seconds
+
+    def add(self, workspace: Path) -> None:
+        self._snapshots[workspace] = _scan(workspace)
+
+    def remove(self, workspace: Path) -> None:
+        self._snapshots.pop(workspace, None)
+
+    def wait(self, timeout: float) -> tuple[set[Path], bool]:
+        remaining = self._next_scan - time.monotonic()
+        if remaining > timeout:
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            return set(), False
+        self._wakeup.wait(max(remaining, 0))
+        self._wakeup.clear()
+        self._next_scan = time.monotonic() + self._poll_seconds
+
+        changed: set[Path] = set()
+        for workspace, previous in self._snapshots.items():
+            current = _scan(workspace)
+            changed.update(path for path in previous.keys() - current.keys())
+            changed.update(path for path, seen in current.items() if previous.get(path) != seen)
+            self._snapshots[workspace] = current
+        return changed, False
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def close(self) -> None:
+        self._snapshots.clear()
+
+
+class _InotifySource:
+    def __init__(self, libc: ctypes.CDLL, fd: int) -> None:
+        self._libc = libc
+        self._fd = fd
+        self._wake_read, self._wake_write = os.pipe()
+        self._directories: dict[int, Path] = {}
+
+    def add(self, workspace: Path) -> None:
+        self._add_tree(workspace)
+
+    def remove(self, workspace: Path) -> None:
+        self._drop_tree(workspace)
+
+    def wait(self, timeout: float) -> tuple[set[Path], bool]:
+        ready, _, _ = select.select([self._fd, self._wake_read], [], [], timeout)
+        if self._wake_read in ready:
+            os.read(self._wake_read, 4096)
+        if self._fd not in ready:
+            return set(), False
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set(), False
+
+        changed: set[Path] = set()
+        rescan = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size : offset + _EVENT_HEADER.size + length]
+            offset += _EVENT_HEADER.size + length
+            if mask & _IN_Q_OVERFLOW:
+                rescan = True
+                continue
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            if mask & _IN_IGNORED:
+                del self._directories[wd]
+                continue
+            path = directory / os.fsdecode(name.rstrip(b"\0"))
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                # Files can land in a new directory before its watch exists.
+                self._add_tree(path)
+                changed.update(path.rglob("*.md"))
+            elif mask & _IN_ISDIR:
+                if mask & _IN_MOVED_FROM:
+                    self._drop_tree(path)
+                changed.add(path)
+            elif not mask & _IN_CREATE:
+                changed.add(path)
+        return changed, rescan
+
+    def wake(self) -> None:
+        os.write(self._wake_write, b"\0")
+
+    def close(self) -> None:
+        for fd in (self._fd, self._wake_read, self._wake_write):
+            os.close(fd)
+
+    def _add_tree(self, root: Path) -> None:
+        if not root.is_dir():
+            return
+        for directory in [root, *(path for path in root.rglob("*") if path.is_dir())]:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_WATCH_MASK)
+            if wd >= 0:
+                self._directories[wd] = directory
+
+    def _drop_tree(self, root: Path) -> None:
+        # A moved-away directory keeps its watches, which would report under the old path.
+        for wd, directory in list(self._directories.items()):
+            if directory == root or root in directory.parents:
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+
+def _by_workspace(paths: set[Path], watched: list[Path]) -> dict[Path, list[Path]]:
+    # The innermost workspace owns a path when workspaces are nested.
+    workspaces = sorted(watched, key=lambda path: -len(path.parts))
+    grouped: dict[Path, list[Path]] = {}
+    for path in paths:
+        owner = next(
+            (ws for ws in workspaces if ws == path or ws in path.parents),
+            None,
+        )
+        if owner is not None:
+            grouped.setdefault(owner, []).append(path)
+    return grouped
+
+
+def _open_inotify() -> _InotifySource | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):  # pragma: no cover - libc without inotify
+        return None
+    if fd < 0:  # pragma: no cover - out of inotify instances
+        return None
+    return _InotifySource(libc, fd)
+
+
+def _scan(workspace: Path) -> dict[Path, tuple[int, int]]:
+    snapshot: dict[Path, tuple[int, int]] = {}
+    for path in workspace.rglob("*.md"):
+        try:
+            file_stat = path.stat()
+        except FileNotFoundError:
+            continue
+        snapshot[path] = (file_stat.st_mtime_ns, file_stat.st_size)
+    return snapshot
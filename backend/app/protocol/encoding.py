@@ -0,0 +1,98 @@
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import pydantic_core
+
+from app.protocol.frames import GatewayFrame, parse_gateway_frame, parse_gateway_frame_json
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional "wire" extra
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover - optional "wire" extra
+    cbor2 = None
+
+JSON_ENCODING = "json"
+
+
+@dataclass(slots=True, frozen=True)
+class WireCodec:
+    name: str
+    binary: bool
+    encode: Callable[[Any], str | bytes]
+    decode: Callable[[str | bytes], Any]
+
+
+def _json_encode(message: Any) -> str:
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def _msgpack_decode(raw: str | bytes) -> Any:
+    try:
+        return msgpack.unpackb(raw, raw=False)
+    except Exception as exc:
+        raise ValueError(f"invalid msgpack frame: {exc}") from exc
+
+
+def _cbor_decode(raw: str | bytes) -> Any:
+    try:
+        return cbor2.loads(raw)
+    except Exception as exc:
+        raise ValueError(f"invalid cbor frame: {exc}") from exc
+
+
+JSON_CODEC = WireCodec(
+    name=JSON_ENCODING,
+    binary=False,
+    encode=_json_encode,
+    decode=pydantic_core.from_json,
+)
+
+WIRE_CODECS: dict[str, WireCodec] = {JSON_ENCODING: JSON_CODEC}
+if msgpack is not None:
+    WIRE_CODECS["msgpack"] = WireCodec(
+        name="msgpack",
+        binary=True,
+        encode=lambda message: msgpack.packb(message, use_bin_type=True),
+        decode=_msgpack_decode,
+    )
+if cbor2 is not None:
+    WIRE_CODECS["cbor"] = WireCodec(
+        name="cbor",
+        binary=True,
+        encode=cbor2.dumps,
+        decode=_cbor_decode,
+    )
+
+
+def supported_encodings() -> list[str]:
+    return list(WIRE_CODECS)
+
+
+def negotiate_encoding(preferred: list[str]) -> WireCodec:
+    for name in preferred:
+        codec = WIRE_CODECS.get(name)
+        if codec is not None:
+            return codec
+    return JSON_CODEC
+
+
+def parse_wire_frame(raw: str | bytes, codec: WireCodec) -> GatewayFrame:
+    """Text frames are always JSON; binary frames use the negotiated codec."""
+    if isinstance(raw, bytes) and codec.binary:
+        return parse_gateway_frame(codec.decode(raw))
+    return parse_gateway_frame_json(raw)
+
+
+def wire_frame_id_hint(raw: str | bytes, codec: WireCodec) -> str:
+    decode = codec.decode if isinstance(raw, bytes) and codec.binary else JSON_CODEC.decode
+    try:
+        message = decode(raw)
+    except ValueError:
+        return "invalid"
+    return str(message.get("id", "invalid")) if isinstance(message, dict) else "invalid"
@@ -1,6 +1,14 @@
 from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, ConfigDict, Field, StringConstraints, TypeAdapter
+import pydantic_core
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    StringConstraints,
+    TypeAdapter,
+    field_validator,
+)
 
 NonEmptyString = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
 
@@ -39,9 +47,46 @@ class EventFrame(FrameModel):
     seq: int | None = Field(default=None, ge=0)
 
 
+GATEWAY_BATCH_METHOD = "gateway.batch"
+MAX_BATCH_REQUESTS = 32
+
+
+class BatchRequestParams(FrameModel):
+    requests: list[RequestFrame] = Field(min_length=1, max_length=MAX_BATCH_REQUESTS)
+
+    @field_validator("requests")
+    @classmethod
+    def _unique_request_ids(cls, requests: list[RequestFrame]) -> list[RequestFrame]:
+        request_ids = [request.id for request in requests]
+        if len(set(request_ids)) != len(request_ids):
+            raise ValueError("batch request ids must be unique")
+        return requests
+
+
+class BatchRequestFrame(RequestFrame):
+    method: Literal["gateway.batch"]
+    params: BatchRequestParams
+
+
+class BatchResponsePayload(FrameModel):
+    responses: list[ResponseFrame]
+
+
 GatewayFrame = Annotated[RequestFrame | ResponseFrame | EventFrame, Field(discriminator="type")]
 GATEWAY_FRAME_ADAPTER = TypeAdapter(GatewayFrame)
 
 
 def parse_gateway_frame(payload: Any) -> GatewayFrame:
     return GATEWAY_FRAME_ADAPTER.validate_python(payload)
+
+
+def parse_gateway_frame_json(raw: str | bytes) -> GatewayFrame:
+    return GATEWAY_FRAME_ADAPTER.validate_json(raw)
+
+
+def frame_id_hint(raw: str | bytes) -> str:
+    try:
+        message = pydantic_core.from_json(raw)
+    except ValueError:
+        return "invalid"
+    return str(message.get("id", "invalid")) if isinstance(message, dict) else "invalid"
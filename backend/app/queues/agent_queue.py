@@ -1,3 +1,6 @@
+import itertools
+from collections import deque
+from collections.abc import Iterator
 from enum import StrEnum
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -29,6 +32,8 @@ class QueueSettings(BaseModel):
     cap: int = Field(default=50, ge=1)
     drop_policy: QueueDropPolicy = QueueDropPolicy.OLD
     debounce_ms: int = Field(default=0, ge=0)
+    # After this many dispatches from higher lanes while a low request waits, run one low.
+    starvation_limit: int = Field(default=8, ge=1)
 
 
 class AgentRequest(BaseModel):
@@ -59,13 +64,81 @@ class QueueDecision(BaseModel):
     details: dict = Field(default_factory=dict)
 
 
+# Dispatch order; eviction walks it backwards.
+PRIORITY_ORDER = (RequestPriority.HIGH, RequestPriority.NORMAL, RequestPriority.LOW)
+
+
+class PendingRequests:
+    """Pending requests in one FIFO lane per priority.
+
+    Dispatch takes the highest non-empty lane, except that ``low`` is served once it has
+    been passed over ``starvation_limit`` times. With ``prioritized=False`` every request
+    shares the normal lane, which keeps ``queue`` mode strictly FIFO.
+    """
+
+    def __init__(self, *, starvation_limit: int = 8, prioritized: bool = True) -> None:
+        self.starvation_limit = starvation_limit
+        self.prioritized = prioritized
+        self._lanes: dict[RequestPriority, deque[AgentRequest]] = {
+            priority: deque() for priority in PRIORITY_ORDER
+        }
+        self.low_passed_over = 0
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def __iter__(self) -> Iterator[AgentRequest]:
+        return itertools.chain.from_iterable(self._lanes[priority] for priority in PRIORITY_ORDER)
+
+    def append(self, request: AgentRequest) -> None:
+        self._lanes[self._lane_for(request)].append(request)
+
+    def pop_next(self) -> AgentRequest:
+        low_lane = self._lanes[RequestPriority.LOW]
+        if low_lane and self.low_passed_over >= self.starvation_limit:
+            self.low_passed_over = 0
+            return low_lane.popleft()
+        for priority in PRIORITY_ORDER:
+            lane = self._lanes[priority]
+            if lane:
+                if priority != RequestPriority.LOW and low_lane:
+                    self.low_passed_over += 1
+                elif priority == RequestPriority.LOW:
+                    self.low_passed_over = 0
+                return lane.popleft()
+        raise IndexError("pop from empty pending queue")
+
+    def evict_for(self, request: AgentRequest) -> AgentRequest | None:
+        """Drop the oldest request of the lowest non-empty lane to make room for ``request``.
+
+        Returns ``None`` (nothing evicted) when ``request`` itself ranks below that lane.
+        """
+        incoming = PRIORITY_ORDER.index(self._lane_for(request))
+        for priority in reversed(PRIORITY_ORDER):
+            lane = self._lanes[priority]
+            if lane:
+                if incoming > PRIORITY_ORDER.index(priority):
+                    return None
+                return lane.popleft()
+        return None
+
+    def _lane_for(self, request: AgentRequest) -> RequestPriority:
+        return request.priority if self.prioritized else RequestPriority.NORMAL
+
+
 class AgentQueue:
     def __init__(self, settings: QueueSettings):
         self.settings = settings
         self.active_request: AgentRequest | None = None
-        self.pending: list[AgentRequest] = []
+        self.pending = PendingRequests(
+            starvation_limit=settings.starvation_limit,
+            prioritized=settings.mode != QueueMode.QUEUE,
+        )
         self.collect_buffer: list[AgentRequest] = []
         self._collect_last_enqueue_ms: int | None = None
+        # Dedupe keys held by the active request, pending and the collect buffer, counted
+        # so membership checks stay O(1) however large the queue grows.
+        self._dedupe_keys: dict[str, int] = {}
 
     def enqueue(self, request: AgentRequest, *, now_ms: int) -> QueueDecision:
         if self._is_duplicate(request):
@@ -73,15 +146,16 @@ class AgentQueue:
 
         if self.settings.mode == QueueMode.COLLECT:
             self.collect_buffer.append(request)
+            self._track(request)
             self._collect_last_enqueue_ms = now_ms
             return QueueDecision(type=QueueDecisionType.COLLECTING, request=request)
 
         if self.active_request is None:
-            self.active_request = request
+            self._set_active(request)
             return QueueDecision(type=QueueDecisionType.RUN_NOW, request=request)
 
         if self.settings.mode == QueueMode.INTERRUPT and request.priority == RequestPriority.HIGH:
-            self.active_request = request
+            self._set_active(request)
             return QueueDecision(type=QueueDecisionType.INTERRUPT, request=request)
 
         if not self._has_capacity_for_pending():
@@ -91,16 +165,17 @@ class AgentQueue:
                     request=request,
                     details={"reason": "queue capacity reached"},
                 )
-            if self.pending:
-                self.pending.pop(0)
-            else:
+            evicted = self.pending.evict_for(request)
+            if evicted is None:
                 return QueueDecision(
                     type=QueueDecisionType.DROPPED,
                     request=request,
                     details={"reason": "queue capacity reached"},
                 )
+            self._untrack(evicted)
 
         self.pending.append(request)
+        self._track(request)
         return QueueDecision(type=QueueDecisionType.ENQUEUED, request=request)
 
     def flush_collect(self, *, now_ms: int) -> AgentRequest | None:
@@ -116,6 +191,8 @@ class AgentQueue:
 
         collected = self.collect_buffer.copy()
         self.collect_buffer.clear()
+        for item in collected:
+            self._untrack(item)
         self._collect_last_enqueue_ms = None
 
         return AgentRequest(
@@ -130,10 +207,11 @@ class AgentQueue:
         )
 
     def mark_active_complete(self) -> AgentRequest | None:
-        self.active_request = None
+        self._set_active(None)
         if not self.pending:
             return None
-        next_request = self.pending.pop(0)
+        # The request moves from pending to active, so its dedupe key stays tracked.
+        next_request = self.pending.pop_next()
         self.active_request = next_request
         return next_request
 
@@ -146,6 +224,7 @@ class AgentQueue:
             "pending": [request.model_dump(mode="json") for request in self.pending],
             "collectBuffer": [request.model_dump(mode="json") for request in self.collect_buffer],
             "collectLastEnqueueMs": self._collect_last_enqueue_ms,
+            "lowPassedOver": self.pending.low_passed_over,
         }
 
     @classmethod
@@ -157,15 +236,17 @@ class AgentQueue:
         if active_request_payload is not None:
             queue.active_request = AgentRequest.model_validate(active_request_payload)
 
-        queue.pending = [
-            AgentRequest.model_validate(request_payload)
-            for request_payload in snapshot.get("pending", [])
-        ]
+        for request_payload in snapshot.get("pending", []):
+            queue.pending.append(AgentRequest.model_validate(request_payload))
         queue.collect_buffer = [
             AgentRequest.model_validate(request_payload)
             for request_payload in snapshot.get("collectBuffer", [])
         ]
         queue._collect_last_enqueue_ms = snapshot.get("collectLastEnqueueMs")
+        queue.pending.low_passed_over = snapshot.get("lowPassedOver", 0)
+        for request in (queue.active_request, *queue.pending, *queue.collect_buffer):
+            if request is not None:
+                queue._track(request)
         return queue
 
     def _has_capacity_for_pending(self) -> bool:
@@ -173,19 +254,25 @@ class AgentQueue:
         return occupied < self.settings.cap
 
     def _is_duplicate(self, request: AgentRequest) -> bool:
-        if request.dedupe_key is None:
-            return False
-        dedupe_key = request.dedupe_key
-
-        if self.active_request and self.active_request.dedupe_key == dedupe_key:
-            return True
+        return request.dedupe_key is not None and request.dedupe_key in self._dedupe_keys
 
-        for pending_request in self.pending:
-            if pending_request.dedupe_key == dedupe_key:
-                return True
+    def _set_active(self, request: AgentRequest | None) -> None:
+        if self.active_request is not None:
+            self._untrack(self.active_request)
+        self.active_request = request
+        if request is not None:
+            self._track(request)
 
-        for buffered_request in self.collect_buffer:
-            if buffered_request.dedupe_key == dedupe_key:
-                return True
+    def _track(self, request: AgentRequest) -> None:
+        if request.dedupe_key is not None:
+            self._dedupe_keys[request.dedupe_key] = self._dedupe_keys.get(request.dedupe_key, 0) + 1
 
-        return False
+    def _untrack(self, request: AgentRequest) -> None:
+        dedupe_key = request.dedupe_key
+        if dedupe_key is None:
+            return
+        remaining = self._dedupe_keys.get(dedupe_key, 0) - 1
+        if remaining > 0:
+            self._dedupe_keys[dedupe_key] = remaining
+        else:
+            self._dedupe_keys.pop(dedupe_key, None)
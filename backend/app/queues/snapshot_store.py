@@ -1,28 +1,186 @@
 import json
+import os
 from pathlib import Path
+from typing import IO, Any
 
 from pydantic import ValidationError
 
-from app.queues.agent_queue import AgentQueue
+from app.queues.agent_queue import AgentQueue, AgentRequest, QueueSettings
+from app.storage.state_file import StateFile
+from app.storage.state_store import SqliteStateStore
+
+_JOURNAL_KIND = "queue_journal"
 
 
 class QueueSnapshotStore:
-    def __init__(self, *, state_path: str | Path):
+    """Agent queue state as a checkpoint file plus an append-only journal of operations.
+
+    Each mutation appends one line to ``<state>.journal.jsonl``, fsynced when ``fsync`` is
+    set; every ``checkpoint_every`` records the full snapshot is rewritten and the journal
+    truncated. ``load`` restores the checkpoint and replays the journal records it does
+    not already cover.
+
+    With a ``state_store`` the checkpoint is one ``queues`` row per agent and the journal
+    is one ``queue_journal`` row per record, so a mutation costs one small insert. The
+    JSON checkpoint and journal are only read once, to migrate them.
+    """
+
+    def __init__(
+        self,
+        *,
+        state_path: str | Path,
+        checkpoint_every: int = 1000,
+        fsync: bool = True,
+        state_store: SqliteStateStore | None = None,
+    ):
         self._state_path = Path(state_path)
-        self._state_path.parent.mkdir(parents=True, exist_ok=True)
+        # Checkpoints are never coalesced: the journal is dropped right after one lands.
+        self._checkpoint = StateFile(self._state_path, fsync=fsync)
+        self._journal_path = self._state_path.with_name(f"{self._state_path.stem}.journal.jsonl")
+        self._checkpoint_every = max(checkpoint_every, 1)
+        self._fsync = fsync
+        self._journal: IO[str] | None = None
+        self._seq = 0
+        self._since_checkpoint = 0
+        self._state_store = state_store
+
+    @property
+    def journal_path(self) -> Path:
+        return self._journal_path
 
     def load(self) -> dict[str, AgentQueue]:
-        if not self._state_path.exists():
-            return {}
+        if self._state_store is None:
+            return self._load_journaled()
+
+        rows = self._state_store.load("queues")
+        journal = self._state_store.load(_JOURNAL_KIND)
+        if not rows and not journal:
+            queues = self._load_journaled()
+            self._state_store.replace_all("queues", _snapshots(queues))
+            self.close()
+            if self._state_path.exists():
+                self._checkpoint.retire()
+            self._journal_path.unlink(missing_ok=True)
+            return queues
+
+        queues = {}
+        for agent_id, snapshot in rows.items():
+            try:
+                queues[agent_id] = AgentQueue.from_snapshot(snapshot)
+            except ValidationError:
+                continue
+        self._seq = 0
+        for record in journal.values():
+            _replay(queues, record)
+            self._seq = max(self._seq, record.get("seq", 0))
+        self._since_checkpoint = len(journal)
+        return queues
+
+    def _load_journaled(self) -> dict[str, AgentQueue]:
+        queues, checkpoint_seq = self._load_checkpoint()
+        self._seq = checkpoint_seq
+        self._since_checkpoint = 0
+        if not self._journal_path.exists():
+            return queues
+
+        applied_bytes = 0
+        with self._journal_path.open("rb") as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line) if line.endswith(b"\n") else None
+                except json.JSONDecodeError:
+                    record = None
+                if record is None:
+                    break
+                applied_bytes += len(line)
+                if not isinstance(record, dict) or record.get("seq", 0) <= checkpoint_seq:
+                    continue
+                _replay(queues, record)
+                self._seq = record["seq"]
+                self._since_checkpoint += 1
+        # Drop a torn tail left by a crash so new records are not appended after it.
+        if applied_bytes < self._journal_path.stat().st_size:
+            os.truncate(self._journal_path, applied_bytes)
+        return queues
+
+    def save(self, queues: dict[str, AgentQueue]) -> None:
+        """Write a full checkpoint and start a fresh journal."""
+        if self._state_store is not None:
+            with self._state_store.transaction():
+                self._state_store.replace_all("queues", _snapshots(queues))
+                self._state_store.replace_all(_JOURNAL_KIND, {})
+            self._since_checkpoint = 0
+            return
+        payload = {"version": 1, "journalSeq": self._seq, "queues": _snapshots(queues)}
+        self._checkpoint.save(payload)
+
+        # Records up to journalSeq are now in the checkpoint, so replay would skip them
+        # even if the process died before this truncation.
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        self._journal_path.unlink(missing_ok=True)
+        self._since_checkpoint = 0
 
-        try:
-            payload = json.loads(self._state_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            return {}
+    def close(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def record_create(self, queues: dict[str, AgentQueue], agent_id: str) -> None:
+        settings = queues[agent_id].settings.model_dump(mode="json")
+        self._append(queues, {"op": "create", "agentId": agent_id, "settings": settings})
+
+    def record_enqueue(
+        self,
+        queues: dict[str, AgentQueue],
+        agent_id: str,
+        request: AgentRequest,
+        *,
+        now_ms: int,
+    ) -> None:
+        self._append(
+            queues,
+            {
+                "op": "enqueue",
+                "agentId": agent_id,
+                "request": request.model_dump(mode="json"),
+                "nowMs": now_ms,
+            },
+        )
+
+    def record_complete(self, queues: dict[str, AgentQueue], agent_id: str) -> None:
+        self._append(queues, {"op": "complete", "agentId": agent_id})
+
+    def record_flush(self, queues: dict[str, AgentQueue], agent_id: str, *, now_ms: int) -> None:
+        self._append(queues, {"op": "flush", "agentId": agent_id, "nowMs": now_ms})
+
+    def _append(self, queues: dict[str, AgentQueue], record: dict[str, Any]) -> None:
+        self._seq += 1
+        if self._state_store is not None:
+            # Zero-padded keys keep the rows in seq order for anyone reading them by key.
+            self._state_store.put(_JOURNAL_KIND, f"{self._seq:012d}", {"seq": self._seq, **record})
+        else:
+            if self._journal is None:
+                self._journal = self._journal_path.open("a", encoding="utf-8")
+            self._journal.write(json.dumps({"seq": self._seq, **record}, separators=(",", ":")))
+            self._journal.write("\n")
+            self._journal.flush()
+            if self._fsync:
+                os.fsync(self._journal.fileno())
+
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self._checkpoint_every:
+            self.save(queues)
+
+    def _load_checkpoint(self) -> tuple[dict[str, AgentQueue], int]:
+        payload = self._checkpoint.load()
+        if not isinstance(payload, dict):
+            return {}, 0
 
         queue_payloads = payload.get("queues")
         if not isinstance(queue_payloads, dict):
-            return {}
+            return {}, 0
 
         queues: dict[str, AgentQueue] = {}
         for agent_id, queue_payload in queue_payloads.items():
@@ -32,17 +190,36 @@ class QueueSnapshotStore:
                 queues[agent_id] = AgentQueue.from_snapshot(queue_payload)
             except ValidationError:
                 continue
-        return queues
+        return queues, payload.get("journalSeq", 0)
 
-    def save(self, queues: dict[str, AgentQueue]) -> None:
-        payload = {
-            "version": 1,
-            "queues": {
-                agent_id: queue.snapshot()
-                for agent_id, queue in sorted(queues.items(), key=lambda item: item[0])
-            },
-        }
-        self._state_path.write_text(
-            json.dumps(payload, separators=(",", ":")),
-            encoding="utf-8",
-        )
+
+def _snapshots(queues: dict[str, AgentQueue]) -> dict[str, dict[str, Any]]:
+    return {
+        agent_id: queue.snapshot()
+        for agent_id, queue in sorted(queues.items(), key=lambda item: item[0])
+    }
+
+
+def _replay(queues: dict[str, AgentQueue], record: dict[str, Any]) -> None:
+    """Re-run one journaled operation.
+
+    Queues are deterministic, so drops and evictions fall out of replaying the enqueue
+    that caused them.
+    """
+    agent_id = record.get("agentId")
+    op = record.get("op")
+    try:
+        if op == "create":
+            queues[agent_id] = AgentQueue(QueueSettings.model_validate(record["settings"]))
+            return
+        queue = queues.get(agent_id)
+        if queue is None:
+            return
+        if op == "enqueue":
+            queue.enqueue(AgentRequest.model_validate(record["request"]), now_ms=record["nowMs"])
+        elif op == "complete":
+            queue.mark_active_complete()
+        elif op == "flush":
+            queue.flush_collect(now_ms=record["nowMs"])
+    except (KeyError, ValidationError):
+        return
@@ -0,0 +1 @@
+"""Durable on-disk state shared by the registries and queues."""
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+
+class StateFile:
+    """A JSON state file replaced atomically: temp file, optional fsync, then rename.
+
+    With ``coalesce_seconds`` above zero, ``save`` only keeps the latest payload and a
+    timer writes it once per window, so a burst of saves costs a single write. Inside
+    ``batched()`` saves are held the same way and written once when the block exits.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        fsync: bool = True,
+        coalesce_seconds: float = 0.0,
+    ) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._temp_path = self._path.with_name(f"{self._path.name}.tmp")
+        self._fsync = fsync
+        self._coalesce_seconds = coalesce_seconds
+        self._lock = threading.Lock()
+        self._pending: bytes | None = None
+        self._timer: threading.Timer | None = None
+        self._holds = 0
+        self.writes = 0
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> Any | None:
+        """Return the stored payload, or None when there is none.
+
+        An unreadable file is moved aside to ``<name>.corrupt`` instead of being
+        overwritten by the next save.
+        """
+        try:
+            raw = self._path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            os.replace(self._path, self._path.with_name(f"{self._path.name}.corrupt"))
+            return None
+
+    def save(self, payload: Any) -> None:
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._pending = data
+            if self._holds:
+                return
+            if self._coalesce_seconds <= 0:
+                self._write_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._coalesce_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    @contextmanager
+    def batched(self) -> Iterator[None]:
+        with self._lock:
+            self._holds += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._holds -= 1
+                held = self._holds
+            if not held:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write a coalesced payload now instead of waiting for the timer."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._write_pending()
+
+    def close(self) -> None:
+        self.flush()
+
+    def retire(self) -> None:
+        """Rename the file to ``<name>.migrated`` once another store has taken it over."""
+        self.close()
+        os.replace(self._path, self._path.with_name(f"{self._path.name}.migrated"))
+
+    def _write_pending(self) -> None:
+        data, self._pending = self._pending, None
+        if data is None:
+            return
+        with self._temp_path.open("wb") as temp:
+            temp.write(data)
+            if self._fsync:
+                temp.flush()
+                os.fsync(temp.fileno())
+        os.replace(self._temp_path, self._path)
+        if self._fsync:
+            # The rename itself is only durable once the directory entry is synced.
+            _fsync_directory(self._path.parent)
+        self.writes += 1
+
+
+def _fsync_directory(directory: Path) -> None:
+    if os.name != "posix":  # pragma: no cover - directories cannot be opened elsewhere
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
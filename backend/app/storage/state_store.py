@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Literal
+
+from app.storage.state_file import StateFile
+
+StateBackend = Literal["json", "sqlite"]
+
+
+class SqliteStateStore:
+    """Registry and queue state as one row per entity in a single SQLite database.
+
+    Rows are keyed by ``(kind, key)``, so changing one device or account touches one row.
+    Writes outside ``transaction()`` commit on their own.
+    """
+
+    def __init__(self, db_path: str | Path, *, fsync: bool = True) -> None:
+        self._db_path = Path(db_path)
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self._db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS state_entities (
+              kind TEXT NOT NULL,
+              key TEXT NOT NULL,
+              record TEXT NOT NULL,
+              PRIMARY KEY (kind, key)
+            )
+            """
+        )
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    def load(self, kind: str) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, record FROM state_entities WHERE kind = ? ORDER BY rowid",
+                (kind,),
+            ).fetchall()
+        return {key: json.loads(record) for key, record in rows}
+
+    def put(self, kind: str, key: str, record: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                # An upsert keeps the rowid, so entities load in the order they were added.
+                "INSERT INTO state_entities(kind, key, record) VALUES(?, ?, ?) "
+                "ON CONFLICT(kind, key) DO UPDATE SET record = excluded.record",
+                (kind, key, json.dumps(record, separators=(",", ":"))),
+            )
+
+    def delete(self, kind: str, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM state_entities WHERE kind = ? AND key = ?", (kind, key))
+
+    def replace_all(self, kind: str, records: Mapping[str, Mapping[str, Any]]) -> None:
+        with self.transaction():
+            self._conn.execute("DELETE FROM state_entities WHERE kind = ?", (kind,))
+            self._conn.executemany(
+                "INSERT INTO state_entities(kind, key, record) VALUES(?, ?, ?)",
+                [
+                    (kind, key, json.dumps(record, separators=(",", ":")))
+                    for key, record in records.items()
+                ],
+            )
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group writes into one commit; nested blocks join the outermost one."""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN")
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def load_records(
+    kind: str,
+    *,
+    key_field: str,
+    state_file: StateFile | None,
+    state_store: SqliteStateStore | None,
+) -> list[dict[str, Any]]:
+    """Read one registry's records from whichever backend is configured.
+
+    The first time a store has no rows of ``kind``, an existing JSON state file is
+    imported in one transaction and renamed to ``<name>.migrated``.
+    """
+    if state_store is not None and (stored := state_store.load(kind)):
+        return list(stored.values())
+
+    legacy: list[dict[str, Any]] = []
+    payload = state_file.load() if state_file is not None else None
+    if isinstance(payload, dict) and isinstance(payload.get(kind), list):
+        legacy = [record for record in payload[kind] if isinstance(record, dict)]
+    if state_store is None or state_file is None or not state_file.path.exists():
+        return legacy
+
+    state_store.replace_all(
+        kind,
+        {str(record[key_field]): record for record in legacy if key_field in record},
+    )
+    state_file.retire()
+    return list(state_store.load(kind).values())
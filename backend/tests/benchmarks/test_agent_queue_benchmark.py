@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from app.queues.agent_queue import AgentQueue, AgentRequest, QueueSettings
+
+pytestmark = pytest.mark.benchmark
+
+_CAP = 10_000
+_CHURN = 2_000
+
+
+class _ListQueue:
+    """The list-backed queue this replaced: pop(0) eviction and a linear dedupe scan."""
+
+    def __init__(self, cap: int) -> None:
+        self.cap = cap
+        self.active_request: AgentRequest | None = None
+        self.pending: list[AgentRequest] = []
+
+    def enqueue(self, request: AgentRequest, *, now_ms: int) -> None:
+        if request.dedupe_key is not None and any(
+            item.dedupe_key == request.dedupe_key
+            for item in [self.active_request, *self.pending]
+            if item is not None
+        ):
+            return
+        if self.active_request is None:
+            self.active_request = request
+            return
+        if len(self.pending) + 1 >= self.cap:
+            self.pending.pop(0)
+        self.pending.append(request)
+
+    def mark_active_complete(self) -> None:
+        self.active_request = self.pending.pop(0) if self.pending else None
+
+
+def _requests(count: int, offset: int = 0) -> list[AgentRequest]:
+    return [
+        AgentRequest(
+            request_id=f"req_{offset + index}",
+            agent_id="agent_bench",
+            kind="hook_trigger",
+            dedupe_key=f"key_{offset + index}",
+        )
+        for index in range(count)
+    ]
+
+
+def _ops_per_second(queue, fill: list[AgentRequest], churn: list[AgentRequest]) -> float:
+    for request in fill:
+        queue.enqueue(request, now_ms=0)
+    started = time.perf_counter()
+    for index, request in enumerate(churn):
+        queue.enqueue(request, now_ms=index)
+        if index % 4 == 0:
+            queue.mark_active_complete()
+    return len(churn) / (time.perf_counter() - started)
+
+
+def test_agent_queue_enqueue_and_complete_at_cap_10k() -> None:
+    fill, churn = _requests(_CAP), _requests(_CHURN, offset=_CAP)
+    before = _ops_per_second(_ListQueue(_CAP), fill, churn)
+    after = _ops_per_second(
+        AgentQueue(QueueSettings(mode="followup", cap=_CAP, drop_policy="old")),
+        fill,
+        churn,
+    )
+
+    print(f"cap {_CAP:,}: list queue {before:,.0f} ops/s -> indexed deque {after:,.0f} ops/s")
+    assert after > before * 10
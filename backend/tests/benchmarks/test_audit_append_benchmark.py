@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+
+from app.audit.store import AuditEntry, AuditStore
+
+pytestmark = pytest.mark.benchmark
+
+_APPENDS_PER_PRODUCER = 500
+
+
+def _open_per_append(path, entry: AuditEntry, *, fsync: bool) -> None:
+    with path.open("a", encoding="utf-8") as file:
+        file.write(json.dumps(asdict(entry), separators=(",", ":")) + "\n")
+        if fsync:
+            file.flush()
+            os.fsync(file.fileno())
+
+
+def _appends_per_second(append, producers: int) -> float:
+    def produce() -> None:
+        for index in range(_APPENDS_PER_PRODUCER):
+            append(index)
+
+    threads = [threading.Thread(target=produce) for _ in range(producers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return producers * _APPENDS_PER_PRODUCER / (time.perf_counter() - started)
+
+
+@pytest.mark.parametrize("durability", ["flush", "fsync"])
+@pytest.mark.parametrize("producers", [1, 4, 16])
+def test_group_commit_audit_append_throughput(tmp_path, producers: int, durability: str) -> None:
+    legacy_path = tmp_path / "legacy.jsonl"
+    store = AuditStore(data_dir=tmp_path / "group", durability=durability)
+
+    def legacy_append(index: int) -> None:
+        _open_per_append(
+            legacy_path,
+            AuditEntry(
+                audit_id=f"audit_{uuid4().hex[:12]}",
+                ts=datetime.now(UTC).isoformat(),
+                actor="user",
+                action="feeds.getCandles",
+                trace_id="bench",
+                data={"index": index},
+            ),
+            fsync=durability == "fsync",
+        )
+
+    def group_append(index: int) -> None:
+        store.append(
+            actor="user",
+            action="feeds.getCandles",
+            trace_id="bench",
+            data={"index": index},
+        )
+
+    before = _appends_per_second(legacy_append, producers)
+    after = _appends_per_second(group_append, producers)
+    store.flush()
+    store.close()
+    metrics = store.metrics()
+
+    print(
+        f"{durability}, {producers} producers: open-per-append {before:,.0f}/s -> "
+        f"group commit {after:,.0f}/s in {metrics['batches']} batches"
+    )
+    # Throughput is only reported: the margin depends on the disk and the machine's load.
+    assert metrics["lines"] == producers * _APPENDS_PER_PRODUCER
+    assert metrics["droppedLines"] == 0
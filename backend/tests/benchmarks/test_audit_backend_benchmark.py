@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+from app.audit.query import AuditQuery
+from app.audit.store import AuditStore
+
+pytestmark = pytest.mark.benchmark
+
+_ENTRIES = 20_000
+_NOISY_ACTIONS = ["feeds.getCandles", "agent.queue.status", "memory.search"]
+
+
+def _fill(store: AuditStore) -> float:
+    started = time.perf_counter()
+    for index in range(_ENTRIES):
+        store.append(
+            actor="user",
+            action="trades.place.blocked" if index % 97 == 0 else _NOISY_ACTIONS[index % 3],
+            trace_id=f"trace_{index}",
+            data={"index": index, "accountId": f"acc_{index % 4}"},
+        )
+    store.flush()
+    return _ENTRIES / (time.perf_counter() - started)
+
+
+def _query_ms(store: AuditStore, query: AuditQuery, *, repeat: int = 5) -> tuple[float, int]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        page = store.query(query, limit=500)
+    return (time.perf_counter() - started) * 1000 / repeat, len(page.entries)
+
+
+def test_audit_backend_append_and_query_latency(tmp_path) -> None:
+    results = {}
+    for backend in ("jsonl", "sqlite"):
+        store = AuditStore(data_dir=tmp_path / backend, backend=backend)
+        appends_per_second = _fill(store)
+        blocked_ms, blocked = _query_ms(
+            store,
+            AuditQuery(actions=["trades.place.blocked"], data={"accountId": "acc_1"}),
+        )
+        trace_ms, traced = _query_ms(store, AuditQuery(trace_id=f"trace_{_ENTRIES // 2}"))
+        store.close()
+        results[backend] = (blocked, traced)
+        print(
+            f"{backend}: append {appends_per_second:,.0f}/s, "
+            f"blocked-by-account {blocked_ms:.2f} ms ({blocked} rows), "
+            f"by trace {trace_ms:.2f} ms ({traced} rows)"
+        )
+
+    # Latencies are only reported; both backends must return the same rows.
+    assert results["sqlite"] == results["jsonl"]
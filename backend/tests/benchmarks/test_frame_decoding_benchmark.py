@@ -0,0 +1,88 @@
+import json
+import time
+from collections.abc import Callable
+
+import pytest
+
+from app.gateway.methods import GATEWAY_METHODS
+from app.protocol.frames import RequestFrame, parse_gateway_frame, parse_gateway_frame_json
+
+pytestmark = pytest.mark.benchmark
+
+_ITERATIONS = 3_000
+_ROUNDS = 5
+
+# Minimum speedup of the single-pass decoder over json.loads + model validation, measured
+# in the same run. Local best-of-rounds runs show about 3x for ping. trades.place is only
+# reported: its params validation dominates both paths, and its 1.2-1.6x margin is within
+# the noise of a loaded machine.
+_MIN_SPEEDUP = {"gateway.ping": 2.0}
+
+_FRAMES = {
+    "gateway.ping": {"type": "req", "id": "req_ping", "method": "gateway.ping", "params": {}},
+    "trades.place": {
+        "type": "req",
+        "id": "req_trade",
+        "method": "trades.place",
+        "params": {
+            "intent": {
+                "account_id": "acct_demo_1",
+                "symbol": "ETHUSDm",
+                "action": "PLACE_MARKET_ORDER",
+                "side": "buy",
+                "volume": 0.1,
+                "stop_loss": 2400.0,
+                "take_profit": 2700.0,
+            },
+            "policy": {
+                "allowed_symbols": ["ETHUSDm"],
+                "max_volume": 0.5,
+                "max_concurrent_positions": 2,
+                "max_daily_loss": 100.0,
+                "require_stop_loss": True,
+            },
+            "snapshot": {"open_positions": 0, "daily_pnl": 0.0},
+        },
+    },
+}
+
+
+def _pydantic_decode(raw: bytes, method: str) -> None:
+    frame = parse_gateway_frame(json.loads(raw))
+    assert isinstance(frame, RequestFrame)
+    params_model = GATEWAY_METHODS.get(method).params_model
+    if params_model is not None:
+        params_model.model_validate(frame.params)
+
+
+def _single_pass_decode(raw: bytes, method: str) -> None:
+    frame = parse_gateway_frame_json(raw)
+    validate_params = GATEWAY_METHODS.get(frame.method).validate_params
+    if validate_params is not None:
+        validate_params(frame.params)
+
+
+def _frames_per_second(decode: Callable[[bytes, str], None], raw: bytes, method: str) -> float:
+    decode(raw, method)
+    best = float("inf")
+    # The best round is the least disturbed by the rest of the machine.
+    for _ in range(_ROUNDS):
+        started = time.perf_counter()
+        for _ in range(_ITERATIONS):
+            decode(raw, method)
+        best = min(best, time.perf_counter() - started)
+    return _ITERATIONS / best
+
+
+@pytest.mark.parametrize("method", sorted(_FRAMES))
+def test_single_pass_frame_decoding_beats_two_pass(method: str) -> None:
+    raw = json.dumps(_FRAMES[method]).encode("utf-8")
+
+    before = _frames_per_second(_pydantic_decode, raw, method)
+    after = _frames_per_second(_single_pass_decode, raw, method)
+
+    print(
+        f"{method}: two-pass {before:,.0f} frames/s -> single-pass {after:,.0f} frames/s "
+        f"({after / before:.1f}x)"
+    )
+    assert after >= before * _MIN_SPEEDUP.get(method, 0.0)
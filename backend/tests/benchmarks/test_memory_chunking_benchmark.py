@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import pytest
+
+from app.memory.index import MemoryIndex
+
+pytestmark = pytest.mark.benchmark
+
+_NOTES = 300
+_SECTIONS = ("Setup", "Risk", "Execution", "Review")
+_WINDOW_LINES = 12
+
+
+def _write_notes(workspace: Path) -> dict[int, tuple[int, int]]:
+    """Write trade notes and return the line span of each note's Risk section."""
+    workspace.mkdir(parents=True)
+    risk_spans = {}
+    for number in range(_NOTES):
+        lines = [f"# Trade id{number}", ""]
+        for section in _SECTIONS:
+            start = len(lines) + 1
+            lines.append(f"## {section}")
+            entries = 10 + (number + len(section)) % 8
+            for entry in range(entries):
+                lines.append(f"- {section.lower()} note {entry}: ETHUSDm breakout, 5m chart")
+            if section == "Risk":
+                risk_spans[number] = (start, len(lines))
+            lines.append("")
+        (workspace / f"trade_{number:04d}.md").write_text("\n".join(lines), encoding="utf-8")
+    return risk_spans
+
+
+def _fixed_windows(path: str, key: str, text: str) -> list[tuple[str, str, int, int, str, str]]:
+    """The chunking this replaced: 12-line windows with no heading context."""
+    lines = text.splitlines()
+    rows = []
+    for start in range(0, len(lines), _WINDOW_LINES):
+        end = min(start + _WINDOW_LINES, len(lines))
+        snippet = "\n".join(lines[start:end]).strip()
+        if snippet:
+            rows.append((path, key, start + 1, end, "", snippet))
+    return rows
+
+
+def _precision(index: MemoryIndex, workspace: Path, risk_spans: dict[int, tuple[int, int]]):
+    hits = 0
+    for number, (start, end) in risk_spans.items():
+        results = index.search(f"id{number} risk", max_results=1, workspace=workspace)
+        # A hit cites the whole Risk section and nothing from the sections around it.
+        if results and (results[0].start_line, results[0].end_line) == (start, end):
+            hits += 1
+    return hits / len(risk_spans)
+
+
+def test_markdown_chunks_are_fewer_and_more_precise(tmp_path: Path, monkeypatch) -> None:
+    workspace = tmp_path / "agent"
+    risk_spans = _write_notes(workspace)
+    markdown = MemoryIndex(db_path=tmp_path / "markdown.db")
+    markdown_stats = markdown.index_workspace(workspace)
+    with monkeypatch.context() as patch:
+        patch.setattr("app.memory.index._chunk_rows", _fixed_windows)
+        fixed = MemoryIndex(db_path=tmp_path / "fixed.db")
+        fixed_stats = fixed.index_workspace(workspace)
+
+    markdown_precision = _precision(markdown, workspace, risk_spans)
+    fixed_precision = _precision(fixed, workspace, risk_spans)
+    print(
+        f"\nfixed windows {fixed_stats.chunks} chunks, top-1 precision {fixed_precision:.0%}"
+        f"\nmarkdown      {markdown_stats.chunks} chunks, top-1 precision {markdown_precision:.0%}"
+    )
+
+    assert markdown_stats.chunks < fixed_stats.chunks
+    assert markdown_precision > fixed_precision
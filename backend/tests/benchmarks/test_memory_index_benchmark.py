@@ -0,0 +1,59 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from app.memory.index import MemoryIndex
+
+pytestmark = pytest.mark.benchmark
+
+_SIZES = (1_000, 5_000)
+
+
+def _write_workspace(workspace: Path, notes: int) -> None:
+    for index in range(notes):
+        folder = workspace / "journal" / f"{index // 500:02d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"note_{index:05d}.md").write_text(
+            f"# Trade {index}\nsymbol ETHUSDm setup breakout id{index}\n" + "context line\n" * 20,
+            encoding="utf-8",
+        )
+
+
+def _timed_search(index: MemoryIndex, workspace: Path, query: str) -> tuple[float, int, int]:
+    started = time.perf_counter()
+    stats = index.index_workspace(workspace)
+    results = index.search(query, max_results=5)
+    return time.perf_counter() - started, stats.indexed, len(results)
+
+
+@pytest.mark.parametrize("notes", _SIZES)
+def test_search_on_unchanged_workspace_skips_reindexing(tmp_path: Path, notes: int) -> None:
+    workspace = tmp_path / "agent"
+    _write_workspace(workspace, notes)
+    index = MemoryIndex(db_path=tmp_path / "memory.db")
+
+    cold, cold_indexed, _ = _timed_search(index, workspace, "id42")
+    changes_before = index._conn.total_changes
+    warm, warm_indexed, found = _timed_search(index, workspace, "id42")
+    warm_changes = index._conn.total_changes - changes_before
+
+    # One edited note, applied the way the watcher applies it: only that path is touched.
+    edited = workspace / "journal" / "00" / "note_00042.md"
+    edited.write_text("# Trade 42\nsymbol ETHUSDm setup reversal id42\n", encoding="utf-8")
+    started = time.perf_counter()
+    changed = index.apply_changes(workspace, [edited])
+    incremental = time.perf_counter() - started
+
+    # The unchanged full pass is still a stat per file, so it grows with the workspace; the
+    # incremental pass does not. Timings are only reported.
+    print(
+        f"\n{notes:,} notes: cold {cold * 1000:,.0f} ms, unchanged full pass "
+        f"{warm * 1000:,.1f} ms ({warm / notes * 1e6:.1f} us/file), "
+        f"one changed file {incremental * 1000:.2f} ms"
+    )
+    assert cold_indexed == notes
+    assert warm_indexed == 0
+    assert found == 1
+    assert warm_changes == 0
+    assert (changed.scanned, changed.indexed) == (1, 1)
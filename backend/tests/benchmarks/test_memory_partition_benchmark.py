@@ -0,0 +1,57 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from app.memory.index import MemoryIndex, PartitionedMemoryIndex
+
+pytestmark = pytest.mark.benchmark
+
+_WORKSPACES = 20
+_NOTES_PER_WORKSPACE = 100
+_SEARCHES = 200
+
+
+def _write_workspaces(root: Path) -> list[Path]:
+    workspaces = []
+    for agent in range(_WORKSPACES):
+        workspace = root / f"agent_{agent:02d}"
+        workspace.mkdir(parents=True)
+        for note in range(_NOTES_PER_WORKSPACE):
+            (workspace / f"trade_{note:03d}.md").write_text(
+                f"# Trade {note}\nstop loss hit on ETHUSDm breakout agent{agent}\n",
+                encoding="utf-8",
+            )
+        workspaces.append(workspace)
+    return workspaces
+
+
+def _per_search_seconds(index, workspace: Path | None) -> float:
+    started = time.perf_counter()
+    for _ in range(_SEARCHES):
+        index.search("stop loss", max_results=10, workspace=workspace)
+    return (time.perf_counter() - started) / _SEARCHES
+
+
+def test_scoped_search_only_ranks_the_workspace_partition(tmp_path: Path) -> None:
+    workspaces = _write_workspaces(tmp_path / "agents")
+    shared = MemoryIndex(db_path=tmp_path / "memory.db")
+    partitioned = PartitionedMemoryIndex(root_dir=tmp_path / "memory")
+    for workspace in workspaces:
+        shared.index_workspace(workspace)
+        partitioned.index_workspace(workspace)
+
+    unscoped = _per_search_seconds(shared, None)
+    scoped = _per_search_seconds(shared, workspaces[0])
+    per_db = _per_search_seconds(partitioned, workspaces[0])
+    print(
+        f"\nunscoped {unscoped * 1e6:.0f}us  shared scoped {scoped * 1e6:.0f}us  "
+        f"per-workspace db {per_db * 1e6:.0f}us"
+    )
+
+    # Every chunk matches, so unscoped ranking covers all 20 workspaces' notes. Timings
+    # are only reported; both scoped searches must stay inside the workspace.
+    results = shared.search("stop loss", max_results=50, workspace=workspaces[0])
+    per_db_results = partitioned.search("stop loss", max_results=50, workspace=workspaces[0])
+    assert {Path(result.path).parent for result in results} == {workspaces[0]}
+    assert {Path(result.path).parent for result in per_db_results} == {workspaces[0]}
@@ -0,0 +1,79 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from app.memory.chunking import chunk_markdown
+from app.memory.index import MemoryIndex, workspace_key
+
+pytestmark = pytest.mark.benchmark
+
+_JOURNALS = 20
+_LINES_PER_JOURNAL = 6_000
+
+
+def _write_journals(workspace: Path, revision: int) -> None:
+    journal = workspace / "journal"
+    journal.mkdir(parents=True, exist_ok=True)
+    for number in range(_JOURNALS):
+        (journal / f"2026-{number:02d}.md").write_text(
+            "".join(
+                f"- r{revision} entry {line}: ETHUSDm long, stop hit, lesson {line % 97}\n"
+                for line in range(_LINES_PER_JOURNAL)
+            ),
+            encoding="utf-8",
+        )
+
+
+def _per_row_reindex(index: MemoryIndex, workspace: Path) -> tuple[int, float]:
+    """The statement pattern this replaced: one DELETE per old chunk, two INSERTs per new one."""
+    conn = index._conn
+    key = workspace_key(workspace)
+    chunks = 0
+    started = time.perf_counter()
+    for file_path in sorted(workspace.rglob("*.md")):
+        path = str(file_path)
+        for row in conn.execute("SELECT id FROM chunks WHERE path = ?", (path,)).fetchall():
+            conn.execute("DELETE FROM chunks_fts WHERE rowid = ?", (row["id"],))
+        conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+        for chunk in chunk_markdown(file_path.read_text(encoding="utf-8")):
+            cursor = conn.execute(
+                "INSERT INTO chunks(path, workspace_key, start_line, end_line, heading_path, "
+                "snippet) VALUES(?, ?, ?, ?, ?, ?)",
+                (path, key, chunk.start_line, chunk.end_line, chunk.heading_path, chunk.text),
+            )
+            conn.execute(
+                "INSERT INTO chunks_fts(rowid, snippet, workspace_key, heading_path) "
+                "VALUES(?, ?, ?, ?)",
+                (cursor.lastrowid, chunk.text, key, chunk.heading_path),
+            )
+            chunks += 1
+    conn.commit()
+    return chunks, time.perf_counter() - started
+
+
+def test_batched_reindex_reports_rows_per_second(tmp_path: Path) -> None:
+    workspace = tmp_path / "agent"
+    _write_journals(workspace, revision=0)
+    baseline = MemoryIndex(db_path=tmp_path / "baseline.db")
+    batched = MemoryIndex(db_path=tmp_path / "batched.db")
+    _per_row_reindex(baseline, workspace)
+    batched.index_workspace(workspace)
+
+    # Rewriting every journal exercises both the deletes and the inserts.
+    _write_journals(workspace, revision=1)
+    baseline_chunks, baseline_seconds = _per_row_reindex(baseline, workspace)
+    started = time.perf_counter()
+    stats = batched.index_workspace(workspace)
+    batched_seconds = time.perf_counter() - started
+
+    baseline_rate = baseline_chunks / baseline_seconds
+    batched_rate = stats.chunks / batched_seconds
+    print(
+        f"\nper-row {baseline_rate:,.0f} chunks/s  batched {batched_rate:,.0f} chunks/s "
+        f"(writes alone {stats.chunks_per_second:,.0f} chunks/s)"
+    )
+
+    assert stats.chunks == baseline_chunks
+    assert batched.search("r1 entry 5999", workspace=workspace)
+    assert batched.search("r0", workspace=workspace) == []
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from app.queues.agent_queue import AgentQueue, AgentRequest, QueueSettings
+from app.queues.snapshot_store import QueueSnapshotStore
+
+pytestmark = pytest.mark.benchmark
+
+_AGENTS = 50
+_PENDING_PER_AGENT = 100
+
+
+def _queues() -> dict[str, AgentQueue]:
+    queues = {}
+    for agent in range(_AGENTS):
+        queue = AgentQueue(QueueSettings(mode="followup", cap=10_000, drop_policy="old"))
+        for index in range(_PENDING_PER_AGENT):
+            queue.enqueue(
+                AgentRequest(request_id=f"req_{index}", agent_id=f"agent_{agent}", kind="hook"),
+                now_ms=index,
+            )
+        queues[f"agent_{agent}"] = queue
+    return queues
+
+
+def _enqueues_per_second(persist, count: int) -> float:
+    started = time.perf_counter()
+    for index in range(count):
+        persist(AgentRequest(request_id=f"new_{index}", agent_id="agent_0", kind="hook"), index)
+    return count / (time.perf_counter() - started)
+
+
+def test_queue_journal_persists_enqueues_in_constant_time(tmp_path) -> None:
+    queues = _queues()
+    snapshot_store = QueueSnapshotStore(state_path=tmp_path / "snapshot" / "agent_queues.json")
+    journal_store = QueueSnapshotStore(state_path=tmp_path / "journal" / "agent_queues.json")
+
+    def snapshot_persist(request: AgentRequest, now_ms: int) -> None:
+        queues["agent_0"].enqueue(request, now_ms=now_ms)
+        snapshot_store.save(queues)
+
+    def journal_persist(request: AgentRequest, now_ms: int) -> None:
+        queues["agent_0"].enqueue(request, now_ms=now_ms)
+        journal_store.record_enqueue(queues, "agent_0", request, now_ms=now_ms)
+
+    before = _enqueues_per_second(snapshot_persist, 30)
+    after = _enqueues_per_second(journal_persist, 1_000)
+    journal_store.close()
+
+    print(
+        f"{_AGENTS * _PENDING_PER_AGENT:,} queued requests: full snapshot {before:,.0f}/s "
+        f"-> journal {after:,.0f}/s"
+    )
+    assert after > before * 10
@@ -0,0 +1,59 @@
+import time
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from app.feeds.service import FeedService
+from app.protocol.encoding import JSON_CODEC, negotiate_encoding
+
+pytestmark = pytest.mark.benchmark
+pytest.importorskip("msgpack")
+
+_ITERATIONS = 200
+
+
+def _candles_response(columnar: bool) -> dict[str, Any]:
+    candles = FeedService().get_candles(symbol="ETHUSDm", timeframe="5m", limit=500)
+    return {
+        "type": "res",
+        "id": "req_candles",
+        "ok": True,
+        "payload": {
+            "symbol": "ETHUSDm",
+            "timeframe": "5m",
+            "candles": FeedService.as_columnar_candles(candles) if columnar else candles,
+        },
+    }
+
+
+def _encode_seconds(encode: Callable[[Any], str | bytes], message: dict[str, Any]) -> float:
+    encode(message)
+    started = time.perf_counter()
+    for _ in range(_ITERATIONS):
+        encode(message)
+    return (time.perf_counter() - started) / _ITERATIONS
+
+
+def _wire_size(encoded: str | bytes) -> int:
+    return len(encoded.encode("utf-8") if isinstance(encoded, str) else encoded)
+
+
+def test_columnar_msgpack_candles_halve_the_payload() -> None:
+    rows = _candles_response(columnar=False)
+    columns = _candles_response(columnar=True)
+    msgpack_codec = negotiate_encoding(["msgpack"])
+
+    json_bytes = _wire_size(JSON_CODEC.encode(rows))
+    msgpack_bytes = _wire_size(msgpack_codec.encode(columns))
+    json_seconds = _encode_seconds(JSON_CODEC.encode, rows)
+    msgpack_seconds = _encode_seconds(msgpack_codec.encode, columns)
+
+    print(
+        f"500 candles: json rows {json_bytes:,} B in {json_seconds * 1e6:,.0f} us -> "
+        f"msgpack columnar {msgpack_bytes:,} B in {msgpack_seconds * 1e6:,.0f} us "
+        f"({msgpack_bytes / json_bytes:.2f}x the size)"
+    )
+    # Sizes are deterministic, so only they are asserted: about 0.49x, i.e. a 2x reduction.
+    # The ISO ts strings are kept and dominate what is left.
+    assert msgpack_bytes < json_bytes * 0.55
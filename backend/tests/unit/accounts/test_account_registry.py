@@ -41,3 +41,23 @@ def test_account_registry_persists_state_between_instances(tmp_path) -> None:
     assert account is not None
     assert account.connector_id == "metaapi_mcp"
     assert account.status == "connected"
+
+
+def test_account_registry_coalesced_saves_land_on_close(tmp_path) -> None:
+    state_path = tmp_path / "state" / "accounts.json"
+    registry = AccountRegistry(state_path=state_path, coalesce_seconds=60)
+    for index in range(20):
+        _ = registry.connect(
+            account_id=f"acct_{index}",
+            connector_id="metaapi_mcp",
+            provider_account_id=f"provider_{index}",
+            mode="demo",
+            label="Demo",
+            allowed_symbols=[],
+        )
+    assert not state_path.exists()
+
+    registry.close()
+
+    reloaded = AccountRegistry(state_path=state_path)
+    assert len(reloaded.list()) == 20
@@ -0,0 +1,155 @@
+import gzip
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.audit.query import AuditCursorError, AuditQuery, query_page
+from app.audit.retention import RetentionPolicy
+from app.audit.segments import SegmentedAuditLog
+from app.audit.store import AuditStore
+
+BASE = datetime(2026, 1, 1, tzinfo=UTC)
+RETENTION = RetentionPolicy.from_days({"trades.*": None, "feeds.getCandles": 7})
+
+
+def _line(index: int, action: str) -> tuple[str, tuple[str, str, str, str]]:
+    moment = BASE + timedelta(hours=index)
+    ts = moment.isoformat()
+    audit_id = f"audit_{int(moment.timestamp() * 1000):012x}{index:08x}"
+    entry = {"audit_id": audit_id, "ts": ts, "action": action, "trace_id": f"trace_{index}"}
+    return json.dumps(entry) + "\n", (ts, audit_id, f"trace_{index}", action)
+
+
+def _fill(log: SegmentedAuditLog, count: int) -> None:
+    for index in range(count):
+        action = "trades.place.executed" if index % 4 == 0 else "feeds.getCandles"
+        log.write_batch([_line(index, action)])
+    log.flush()
+
+
+def _options() -> dict:
+    return {"max_segment_bytes": 600, "max_segment_seconds": 10**9}
+
+
+def test_compaction_gzips_sealed_segments_and_applies_retention(tmp_path) -> None:
+    log = SegmentedAuditLog(tmp_path / "audit", **_options())
+    _fill(log, 40)
+    active = log.segments()[-1]
+    active_before = [entry["trace_id"] for entry in log.iter_entries(since=active.index.first_ts)]
+
+    stats = log.compact(RETENTION, codec="gzip", now=BASE + timedelta(days=30))
+    entries = list(log.iter_entries())
+    sealed = [segment for segment in log.segments() if segment.sealed]
+
+    assert stats["removedEntries"] > 0
+    assert all(segment.path.suffix == ".gz" for segment in sealed)
+    assert list((tmp_path / "audit").glob("audit-*.jsonl")) == [active.path]
+    kept_old = [entry for entry in entries if entry["trace_id"] not in active_before]
+    assert {entry["action"] for entry in kept_old} == {"trades.place.executed"}
+    assert [entry["trace_id"] for entry in entries][-len(active_before) :] == active_before
+    with gzip.open(sealed[0].path, "rt", encoding="utf-8") as file:
+        assert json.loads(file.readline())["action"] == "trades.place.executed"
+
+    again = log.compact(RETENTION, codec="gzip", now=BASE + timedelta(days=30))
+    assert again == {"rewritten": 0, "removedSegments": 0, "removedEntries": 0}
+
+    log.close()
+    reopened = SegmentedAuditLog(tmp_path / "audit", **_options())
+    assert list(reopened.iter_entries()) == entries
+    assert reopened.find(entries[0]["audit_id"]) == entries[0]
+
+
+def test_compaction_removes_segments_with_nothing_left(tmp_path) -> None:
+    log = SegmentedAuditLog(tmp_path / "audit", **_options())
+    for index in range(12):
+        log.write_batch([_line(index, "feeds.getCandles")])
+    log.flush()
+    sealed = [segment for segment in log.segments() if segment.sealed]
+
+    stats = log.compact(RETENTION, codec="gzip", now=BASE + timedelta(days=30))
+
+    assert stats["removedSegments"] == len(sealed)
+    assert not any(segment.path.exists() or segment.index_path.exists() for segment in sealed)
+    assert len(log.segments()) == 1
+
+
+def test_reopen_discards_output_of_an_interrupted_compaction(tmp_path) -> None:
+    log = SegmentedAuditLog(tmp_path / "audit", **_options())
+    _fill(log, 20)
+    entries = list(log.iter_entries())
+    first = log.segments()[0]
+    log.close()
+    # Output moved into place, but the sidecar still describes the plain segment.
+    with gzip.open(first.path.with_name(first.path.name + ".gz"), "wb") as file:
+        file.write(b'{"partial": ')
+
+    reopened = SegmentedAuditLog(tmp_path / "audit", **_options())
+
+    assert reopened.segments()[0].path == first.path
+    assert not first.path.with_name(first.path.name + ".gz").exists()
+    assert list(reopened.iter_entries()) == entries
+
+
+def test_sqlite_compaction_honours_rule_precedence(tmp_path) -> None:
+    store = AuditStore(
+        data_dir=tmp_path,
+        backend="sqlite",
+        retention_days={"trades.*": None, "*": 7},
+    )
+    store.append(actor="user", action="trades.place.executed", trace_id="t1", data={})
+    store.append(actor="user", action="feeds.getCandles", trace_id="t2", data={})
+    store.flush()
+
+    stats = store.compact(now=datetime.now(UTC) + timedelta(days=30))
+
+    assert stats["removedEntries"] == 1
+    assert [entry["action"] for entry in store.read_all()] == ["trades.place.executed"]
+    assert store.metrics()["lastCompaction"]["removedEntries"] == 1
+    store.close()
+
+
+def test_zstd_segments_support_seeks_and_lookups(tmp_path) -> None:
+    pytest.importorskip("zstandard")
+    log = SegmentedAuditLog(tmp_path / "audit", index_interval=1, **_options())
+    _fill(log, 40)
+    before = list(log.iter_entries())
+
+    log.compact(RetentionPolicy.from_days({}), codec="zstd", now=BASE + timedelta(days=30))
+    sealed = [segment for segment in log.segments() if segment.sealed]
+    middle = sealed[0].index.last_ts
+
+    assert all(segment.path.suffix == ".zst" for segment in sealed)
+    assert list(log.iter_entries()) == before
+    assert list(log.iter_entries(since=middle)) == [
+        entry for entry in before if entry["ts"] >= middle
+    ]
+    assert log.find(before[3]["audit_id"]) == before[3]
+
+    log.close()
+    reopened = SegmentedAuditLog(tmp_path / "audit", index_interval=1, **_options())
+    assert list(reopened.iter_entries(since=middle))[0]["ts"] == middle
+
+
+def test_cursors_into_a_rewritten_segment_are_rejected(tmp_path) -> None:
+    log = SegmentedAuditLog(tmp_path / "audit", **_options())
+    _fill(log, 40)
+    first = log.segments()[0]
+    page = query_page(log, AuditQuery(), limit=2)
+    # The active segment is never rewritten, so a cursor into it stays valid.
+    sealed = sum(segment.index.count for segment in log.segments() if segment.sealed)
+    untouched = query_page(log, AuditQuery(), limit=sealed + 1)
+
+    log.compact(RETENTION, codec="none", now=BASE + timedelta(days=30))
+
+    assert log.segments()[0].path == first.path
+    assert log.segments()[0].generation == 1
+    with pytest.raises(AuditCursorError):
+        query_page(log, AuditQuery(), limit=2, cursor=page.next_cursor)
+    resumed = query_page(log, AuditQuery(), limit=100, cursor=untouched.next_cursor)
+    assert len(resumed.entries) == 40 - sealed - 1
+    fresh = query_page(log, AuditQuery(), limit=1)
+    assert query_page(log, AuditQuery(), limit=1, cursor=fresh.next_cursor).entries
+    log.close()
+    reopened = SegmentedAuditLog(tmp_path / "audit", **_options())
+    assert query_page(reopened, AuditQuery(), limit=1, cursor=fresh.next_cursor).entries
@@ -0,0 +1,65 @@
+import pytest
+
+from app.audit.query import AuditCursorError, AuditQuery, decode_cursor, encode_cursor
+from app.audit.segments import AuditPosition
+from app.audit.store import AuditStore
+
+
+def _seed(store: AuditStore) -> None:
+    for index in range(6):
+        store.append(
+            actor="agent" if index % 2 else "user",
+            action="trades.place.blocked" if index % 3 == 0 else "feeds.getCandles",
+            trace_id=f"trace_{index}",
+            data={"index": index, "intent": {"symbol": "EURUSD" if index < 3 else "XAUUSD"}},
+        )
+        # Segments rotate between writer batches; flushing keeps one entry per batch.
+        store.flush()
+
+
+def test_query_filters_on_action_actor_trace_and_data_keys(tmp_path) -> None:
+    store = AuditStore(data_dir=tmp_path, max_segment_bytes=256)
+    _seed(store)
+
+    blocked = store.query(AuditQuery(actions=["trades.place.*"]), limit=10)
+    by_actor = store.query(AuditQuery(actor="agent", data={"intent.symbol": "XAUUSD"}), limit=10)
+    by_trace = store.query(AuditQuery(trace_id="trace_4"), limit=10)
+    store.close()
+
+    assert [entry["data"]["index"] for entry in blocked.entries] == [0, 3]
+    assert blocked.next_cursor is None
+    assert [entry["data"]["index"] for entry in by_actor.entries] == [3, 5]
+    assert [entry["trace_id"] for entry in by_trace.entries] == ["trace_4"]
+
+
+def test_query_pages_resume_from_cursor_across_segments(tmp_path) -> None:
+    store = AuditStore(data_dir=tmp_path, max_segment_bytes=256)
+    _seed(store)
+
+    seen: list[int] = []
+    cursor = None
+    pages = 0
+    while True:
+        page = store.query(AuditQuery(), limit=4, cursor=cursor)
+        seen.extend(entry["data"]["index"] for entry in page.entries)
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    store.close()
+
+    assert seen == list(range(6))
+    assert pages == 2
+    assert store.metrics()["segments"] > 1
+
+
+def test_query_rejects_malformed_and_unknown_cursors(tmp_path) -> None:
+    store = AuditStore(data_dir=tmp_path)
+    _seed(store)
+
+    with pytest.raises(AuditCursorError):
+        decode_cursor("not-a-cursor")
+    with pytest.raises(AuditCursorError):
+        cursor = encode_cursor(AuditPosition("audit-999.jsonl", 0))
+        store.query(AuditQuery(), limit=1, cursor=cursor)
+    store.close()
@@ -0,0 +1,101 @@
+import json
+from datetime import UTC, datetime, timedelta
+
+from app.audit.segments import SegmentedAuditLog, audit_id_ts
+
+BASE = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _line(
+    index: int,
+    *,
+    trace_id: str | None = None,
+    action: str = "test",
+) -> tuple[str, tuple[str, str, str, str]]:
+    moment = BASE + timedelta(seconds=index * 10)
+    ts = moment.isoformat()
+    audit_id = f"audit_{int(moment.timestamp() * 1000):012x}{index:08x}"
+    trace = trace_id or f"trace_{index}"
+    entry = {"audit_id": audit_id, "ts": ts, "action": action, "trace_id": trace}
+    return json.dumps(entry) + "\n", (ts, audit_id, trace, action)
+
+
+def _write(log: SegmentedAuditLog, indexes: range, **kwargs) -> None:
+    for index in indexes:
+        log.write_batch([_line(index, **kwargs)])
+    log.flush()
+
+
+def test_segments_rotate_by_size_and_seal_index_sidecars(tmp_path) -> None:
+    log = SegmentedAuditLog(tmp_path / "audit", max_segment_bytes=512, index_interval=2)
+    _write(log, range(20))
+
+    segments = log.segments()
+    sealed = [segment for segment in segments if segment.sealed]
+
+    assert len(segments) > 2
+    assert all(segment.index_path.exists() for segment in sealed)
+    assert not segments[-1].index_path.exists()
+    assert sum(segment.index.count for segment in segments) == 20
+    assert [entry["trace_id"] for entry in log.iter_entries()] == [
+        f"trace_{index}" for index in range(20)
+    ]
+
+
+def test_range_and_trace_queries_only_return_matching_entries(tmp_path) -> None:
+    log = SegmentedAuditLog(tmp_path / "audit", max_segment_bytes=512, index_interval=2)
+    _write(log, range(20))
+    log.write_batch([_line(20, trace_id="trace_shared"), _line(21, trace_id="trace_shared")])
+    log.flush()
+
+    window = list(
+        log.iter_entries(
+            since=BASE + timedelta(seconds=50),
+            until=(BASE + timedelta(seconds=80)).isoformat(),
+        )
+    )
+    traced = list(log.iter_entries(trace_id="trace_shared"))
+    missing = list(log.iter_entries(trace_id="trace_unknown"))
+
+    assert [entry["trace_id"] for entry in window] == [f"trace_{index}" for index in range(5, 9)]
+    assert len(traced) == 2
+    assert missing == []
+
+
+def test_find_uses_the_time_embedded_in_the_audit_id(tmp_path) -> None:
+    log = SegmentedAuditLog(tmp_path / "audit", max_segment_bytes=512)
+    _write(log, range(20))
+    _, (ts, audit_id, _, _) = _line(13)
+
+    assert audit_id_ts(audit_id) == ts
+    assert log.find(audit_id)["trace_id"] == "trace_13"
+    assert log.find("audit_missing") is None
+
+
+def test_reopen_rebuilds_active_index_and_drops_torn_tail(tmp_path) -> None:
+    options = {"max_segment_bytes": 4096, "max_segment_seconds": 10**9}
+    log = SegmentedAuditLog(tmp_path / "audit", **options)
+    _write(log, range(12))
+    active_path = log.active_path
+    log.close()
+    with active_path.open("ab") as file:
+        file.write(b'{"audit_id": "torn')
+
+    reopened = SegmentedAuditLog(tmp_path / "audit", **options)
+    _write(reopened, range(12, 14))
+
+    assert reopened.active_path == active_path
+    assert [entry["trace_id"] for entry in reopened.iter_entries()] == [
+        f"trace_{index}" for index in range(14)
+    ]
+
+
+def test_legacy_audit_file_is_read_before_segments(tmp_path) -> None:
+    legacy_path = tmp_path / "audit.jsonl"
+    legacy_entry = {"ts": "2025-12-31T00:00:00+00:00", "trace_id": "old"}
+    legacy_path.write_text(json.dumps(legacy_entry) + "\n")
+    log = SegmentedAuditLog(tmp_path / "audit", legacy_path=legacy_path)
+    _write(log, range(2))
+
+    assert [entry["trace_id"] for entry in log.iter_entries()] == ["old", "trace_0", "trace_1"]
+    assert [entry["trace_id"] for entry in log.iter_entries(since=BASE)] == ["trace_0", "trace_1"]
@@ -0,0 +1,91 @@
+import asyncio
+import contextlib
+import json
+
+import pytest
+
+from app.audit.query import AuditCursorError, AuditQuery
+from app.audit.sqlite_log import SqliteAuditLog
+from app.audit.store import AuditStore
+from app.audit.writer import AuditCommitError, GroupCommitWriter
+
+
+def _seed(store: AuditStore) -> list[str]:
+    audit_ids = []
+    for index in range(6):
+        entry = store.append(
+            actor="agent" if index % 2 else "user",
+            action="trades.place.blocked" if index % 3 == 0 else "feeds.getCandles",
+            trace_id=f"trace_{index}",
+            data={"index": index, "accountId": "acc_1" if index < 3 else "acc_2"},
+        )
+        audit_ids.append(entry.audit_id)
+    return audit_ids
+
+
+def test_sqlite_backend_keeps_append_and_read_all_contract(tmp_path) -> None:
+    store = AuditStore(data_dir=tmp_path, backend="sqlite", durability="none")
+    audit_ids = _seed(store)
+    durable = asyncio.run(
+        store.append_durable(actor="user", action="risk.emergencyStop", trace_id="t", data={})
+    )
+
+    stored = store.read_all()
+    found = store.find(audit_ids[4])
+    metrics = store.metrics()
+    store.close()
+
+    assert store.audit_path == tmp_path / "audit.db"
+    assert [entry["audit_id"] for entry in stored] == [*audit_ids, durable.audit_id]
+    assert found["trace_id"] == "trace_4"
+    assert metrics["backend"] == "sqlite"
+    assert metrics["lastSeq"] == 7
+
+    reopened = AuditStore(data_dir=tmp_path, backend="sqlite")
+    assert len(reopened.read_all()) == 7
+    reopened.close()
+
+
+def test_sqlite_backend_pushes_filters_down_and_pages_by_seq(tmp_path) -> None:
+    store = AuditStore(data_dir=tmp_path, backend="sqlite")
+    _seed(store)
+
+    blocked = store.query(
+        AuditQuery(actions=["trades.place.*"], data={"accountId": "acc_2"}),
+        limit=10,
+    )
+    first = store.query(AuditQuery(actor="user"), limit=2)
+    second = store.query(AuditQuery(actor="user"), limit=2, cursor=first.next_cursor)
+    by_trace = list(store.iter_entries(trace_id="trace_5"))
+
+    assert [entry["data"]["index"] for entry in blocked.entries] == [3]
+    assert blocked.scanned == 2
+    assert [entry["data"]["index"] for entry in first.entries + second.entries] == [0, 2, 4]
+    assert second.next_cursor is None
+    assert [entry["actor"] for entry in by_trace] == ["agent"]
+    with pytest.raises(AuditCursorError):
+        store.query(AuditQuery(), limit=1, cursor="WyJhdWRpdC0wMDAwMDEuanNvbmwiLDBd")
+    store.close()
+
+
+def test_sqlite_backend_drops_a_batch_that_fails_to_insert(tmp_path) -> None:
+    log = SqliteAuditLog(tmp_path / "audit.db")
+    writer = GroupCommitWriter(log, durability="flush")
+
+    def submit(index: int, entry: str) -> None:
+        key = ("2026-01-01T00:00:00+00:00", f"aud_{index}", f"trace_{index}", "risk.preview")
+        writer.submit(entry, key)
+        # One line per batch, so the failure count does not depend on batching.
+        writer.flush()
+
+    # No actor, so the NOT NULL constraint rejects the row.
+    with contextlib.suppress(AuditCommitError):
+        submit(0, json.dumps({"audit_id": "aud_0"}))
+    submit(1, json.dumps({"audit_id": "aud_1", "actor": "user"}))
+    writer.close()
+
+    assert writer.dropped_lines == 1
+    assert writer.last_error.startswith("AuditCommitError: audit commit failed")
+    reopened = SqliteAuditLog(tmp_path / "audit.db")
+    assert [entry["audit_id"] for entry in reopened.iter_entries()] == ["aud_1"]
+    reopened.close()
@@ -0,0 +1,106 @@
+import asyncio
+import contextlib
+import json
+import threading
+
+import pytest
+
+from app.audit.segments import SegmentedAuditLog
+from app.audit.store import AuditStore
+from app.audit.writer import GroupCommitWriter
+
+
+def _line(worker: int, index: int) -> tuple[str, tuple[str, str, str, str]]:
+    ts = f"2026-01-01T00:00:{index % 60:02d}+00:00"
+    line = json.dumps({"ts": ts, "worker": worker, "index": index}) + "\n"
+    return line, (ts, f"audit_{worker}_{index}", f"trace_{worker}", "test")
+
+
+def test_group_commit_writer_batches_concurrent_producers(tmp_path) -> None:
+    log = SegmentedAuditLog(tmp_path / "audit")
+    writer = GroupCommitWriter(log, durability="flush")
+
+    def produce(worker: int) -> None:
+        for index in range(250):
+            writer.submit(*_line(worker, index))
+
+    producers = [threading.Thread(target=produce, args=(worker,)) for worker in range(4)]
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    writer.flush()
+    writer.close()
+
+    lines = log.active_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1000
+    assert writer.lines == 1000
+    assert writer.batches < 1000
+    assert [json.loads(line)["index"] for line in lines if json.loads(line)["worker"] == 0] == list(
+        range(250)
+    )
+
+
+def test_durable_submit_resolves_after_commit_and_closed_writer_rejects(tmp_path) -> None:
+    log = SegmentedAuditLog(tmp_path / "audit")
+    writer = GroupCommitWriter(log, durability="none")
+
+    ack = writer.submit(*_line(0, 0), durable=True)
+    ack.result(timeout=5)
+
+    assert log.active_path.read_text(encoding="utf-8").strip()
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.submit(*_line(0, 1))
+
+
+def test_audit_store_append_durable_and_read_all_see_buffered_entries(tmp_path) -> None:
+    store = AuditStore(data_dir=tmp_path, durability="none")
+
+    store.append(actor="user", action="feeds.getCandles", trace_id="t1", data={})
+    entry = asyncio.run(
+        store.append_durable(actor="user", action="trades.place.executed", trace_id="t2", data={})
+    )
+    store.append(actor="user", action="marketplace.signals", trace_id="t3", data={})
+
+    actions = [stored["action"] for stored in store.read_all()]
+    store.close()
+
+    assert entry.action == "trades.place.executed"
+    assert actions == ["feeds.getCandles", "trades.place.executed", "marketplace.signals"]
+    assert store.metrics()["lines"] == 3
+
+
+class _FailingSink:
+    def __init__(self) -> None:
+        self.fail = True
+
+    def write_batch(self, lines) -> None:
+        if self.fail:
+            raise OSError("No space left on device")
+
+    def flush(self) -> None: ...
+
+    def sync(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def test_failed_commit_counts_and_logs_dropped_lines(caplog) -> None:
+    sink = _FailingSink()
+    writer = GroupCommitWriter(sink, durability="flush")
+
+    writer.submit(*_line(0, 0))
+    writer.submit(*_line(0, 1))
+    # The flush marker only fails when it lands in the same batch as a line.
+    with contextlib.suppress(OSError):
+        writer.flush()
+    sink.fail = False
+    writer.submit(*_line(0, 2))
+    writer.flush()
+    writer.close()
+
+    assert writer.dropped_lines == 2
+    assert writer.lines == 1
+    assert writer.last_error == "OSError: No space left on device"
+    assert "audit commit failed" in caplog.text
@@ -0,0 +1,36 @@
+import json
+import os
+import zlib
+
+from app.config.loader import GatewayCompressionConfig
+from app.gateway.compression import FrameCompressor
+
+
+def test_frame_compressor_only_compresses_frames_above_threshold() -> None:
+    compressor = FrameCompressor(threshold_bytes=1024)
+    small = json.dumps({"type": "res", "id": "req_ping", "ok": True, "payload": {}})
+    large = json.dumps({"type": "res", "id": "req_big", "ok": True, "payload": [1.5] * 2000})
+
+    assert compressor.compress(small, method="gateway.ping") == small
+    compressed = compressor.compress(large, method="feeds.getCandles")
+
+    assert isinstance(compressed, bytes)
+    assert zlib.decompress(compressed).decode("utf-8") == large
+    methods = compressor.metrics()["methods"]
+    assert methods["gateway.ping"]["compressedFrames"] == 0
+    assert methods["gateway.ping"]["bytesSaved"] == 0
+    assert methods["feeds.getCandles"]["compressedFrames"] == 1
+    assert methods["feeds.getCandles"]["bytesSaved"] == len(large) - len(compressed)
+    assert methods["feeds.getCandles"]["compressMs"]["maxMs"] >= 0
+
+
+def test_frame_compressor_keeps_incompressible_frames_and_honours_config() -> None:
+    compressor = FrameCompressor.from_config(
+        GatewayCompressionConfig.model_validate({"thresholdBytes": 0, "level": 1})
+    )
+    noise = os.urandom(512)
+
+    assert compressor.compress(noise, method="blob") == noise
+    assert compressor.metrics()["methods"]["blob"]["compressedFrames"] == 0
+    assert compressor.negotiate(["br", "deflate"]) == "deflate"
+    assert FrameCompressor(enabled=False).negotiate(["deflate"]) is None
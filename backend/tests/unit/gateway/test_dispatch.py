@@ -0,0 +1,142 @@
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+
+from app.accounts.registry import AccountRegistry
+from app.agents.registry import AgentRegistry
+from app.audit.store import AuditStore
+from app.config.loader import default_config
+from app.devices.registry import DeviceRegistry
+from app.feeds.service import FeedService
+from app.gateway.dispatch import GatewaySession, MethodRegistry, MethodResult, dispatch_request
+from app.gateway.methods import GATEWAY_METHODS
+from app.gateway.models import TradesClosePositionParams
+from app.memory.index import MemoryIndex
+from app.memory.watcher import MemoryWatcher
+from app.plugins.registry import PluginConfig, PluginRegistry
+from app.protocol.frames import RequestFrame
+from app.queues.snapshot_store import QueueSnapshotStore
+from app.risk.control import RiskControlState
+from app.trades.service import TradeExecutionService
+
+
+def _session(tmp_path) -> GatewaySession:
+    return GatewaySession(
+        started_at=datetime.now(UTC),
+        agent_queues={},
+        queue_snapshot_store=QueueSnapshotStore(state_path=tmp_path / "agent_queues.json"),
+        audit_store=AuditStore(data_dir=tmp_path),
+        agent_registry=AgentRegistry(workspace_base_dir=tmp_path / "agents"),
+        account_registry=AccountRegistry(),
+        app_config=default_config(),
+        device_registry=DeviceRegistry(),
+        feed_service=FeedService(),
+        memory_index=MemoryIndex(db_path=tmp_path / "memory.db"),
+        resolved_plugins=PluginRegistry(config=PluginConfig()).resolve(),
+        risk_control_state=RiskControlState(),
+        trade_execution_service=TradeExecutionService(),
+        session_id="sess_test",
+    )
+
+
+def _frame(method: str, params: dict | None = None) -> RequestFrame:
+    return RequestFrame(type="req", id=f"req_{method}", method=method, params=params or {})
+
+
+def test_gateway_registry_exposes_every_method_with_params_model() -> None:
+    spec = GATEWAY_METHODS.get("trades.closePosition")
+
+    assert spec is not None
+    assert spec.params_model is TradesClosePositionParams
+    assert (
+        GATEWAY_METHODS.get("accounts.status").handler
+        is GATEWAY_METHODS.get("accounts.get").handler
+    )
+    assert "gateway.ping" in GATEWAY_METHODS
+    assert "gateway.connect" not in GATEWAY_METHODS
+    assert len(GATEWAY_METHODS) == len(GATEWAY_METHODS.names())
+
+
+def test_registry_rejects_duplicate_method_names() -> None:
+    registry = MethodRegistry()
+
+    @registry.register("demo.method")
+    async def handler(session, frame, params) -> MethodResult:
+        return MethodResult({})
+
+    with pytest.raises(ValueError):
+        registry.register("demo.method")(handler)
+
+
+def test_dispatch_calls_handler_without_websocket(tmp_path) -> None:
+    session = _session(tmp_path)
+
+    result = asyncio.run(
+        dispatch_request(
+            GATEWAY_METHODS,
+            session,
+            _frame("trades.closePosition", {"accountId": "acct_1", "positionId": "pos_1"}),
+        )
+    )
+
+    assert result.response["ok"] is True
+    assert result.response["payload"]["execution"]["status"] == "closed"
+    assert [event["event"] for event in result.events] == ["event.trade.closed"]
+    assert result.frames[-1] is result.response
+    assert session.audit_store.read_all()[0]["action"] == "trades.closePosition"
+
+
+def test_dispatch_reports_unknown_method_and_invalid_params(tmp_path) -> None:
+    session = _session(tmp_path)
+
+    unknown = asyncio.run(dispatch_request(GATEWAY_METHODS, session, _frame("nope.method")))
+    invalid = asyncio.run(
+        dispatch_request(GATEWAY_METHODS, session, _frame("trades.closePosition", {}))
+    )
+
+    assert unknown.response["error"]["code"] == "NOT_FOUND"
+    assert unknown.response["error"]["message"] == "unknown method: nope.method"
+    assert invalid.response["error"]["code"] == "INVALID_PARAMS"
+    assert invalid.response["error"]["message"] == "invalid trades.closePosition params"
+    assert invalid.events == []
+
+
+def test_memory_search_reads_without_reindexing_a_watched_workspace(tmp_path, monkeypatch) -> None:
+    session = _session(tmp_path)
+    agent = session.agent_registry.create(
+        agent_id="agent_1",
+        label="Agent 1",
+        soul_template="# SOUL",
+        manual_template="Never trade without stop loss.",
+    )
+    workspace = agent.workspace_path
+    session.memory_watcher = MemoryWatcher(session.memory_index, backend="poll", poll_seconds=60)
+    frame = _frame("memory.search", {"workspacePath": workspace, "query": "stop loss"})
+
+    first = asyncio.run(dispatch_request(GATEWAY_METHODS, session, frame))
+
+    def fail(_workspace) -> None:
+        raise AssertionError("memory.search must not reindex")
+
+    monkeypatch.setattr(session.memory_index, "index_workspace", fail)
+    second = asyncio.run(dispatch_request(GATEWAY_METHODS, session, frame))
+    session.memory_watcher.close()
+
+    assert len(first.response["payload"]["results"]) == 1
+    assert second.response["payload"]["results"] == first.response["payload"]["results"]
+
+
+def test_memory_search_indexes_an_unregistered_workspace_without_watching_it(tmp_path) -> None:
+    workspace = tmp_path / "scratch"
+    workspace.mkdir()
+    (workspace / "notes.md").write_text("Never trade without stop loss.", "utf-8")
+    session = _session(tmp_path)
+    session.memory_watcher = MemoryWatcher(session.memory_index, backend="poll", poll_seconds=60)
+    frame = _frame("memory.search", {"workspacePath": str(workspace), "query": "stop loss"})
+
+    result = asyncio.run(dispatch_request(GATEWAY_METHODS, session, frame))
+    session.memory_watcher.close()
+
+    assert len(result.response["payload"]["results"]) == 1
+    assert str(workspace.resolve()) not in session.memory_watcher._ready
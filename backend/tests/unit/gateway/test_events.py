@@ -0,0 +1,146 @@
+import asyncio
+import threading
+
+from app.gateway.dispatch import event_frame
+from app.gateway.events import EventBus, SlowConsumerError
+
+
+def test_event_bus_stamps_seq_and_fans_out_to_other_matching_sessions() -> None:
+    async def scenario() -> tuple[list[dict], list[dict], int]:
+        bus = EventBus()
+        origin = bus.subscribe("sess_origin")
+        dashboard = bus.subscribe("sess_dashboard", ["event.risk.*"])
+        device = bus.subscribe("sess_device")
+
+        bus.publish(event_frame("event.risk.emergencyStop", {"active": True}), origin="sess_origin")
+        bus.publish(event_frame("event.trade.executed", {"id": 1}), origin="sess_origin")
+
+        dashboard_events = [await dashboard.next()]
+        device_events = [await device.next(), await device.next()]
+        return dashboard_events, device_events, origin.depth
+
+    dashboard_events, device_events, origin_depth = asyncio.run(scenario())
+
+    assert [event["event"] for event in dashboard_events] == ["event.risk.emergencyStop"]
+    assert [event["seq"] for event in device_events] == [1, 2]
+    assert origin_depth == 0
+
+
+def test_event_subscription_drops_oldest_when_queue_is_full() -> None:
+    async def scenario() -> tuple[list[int], dict]:
+        bus = EventBus(max_queue=2)
+        subscription = bus.subscribe("sess_slow")
+        for index in range(4):
+            bus.publish(event_frame("event.feed.event", {"index": index}))
+        received = [(await subscription.next())["payload"]["index"] for _ in range(2)]
+        return received, bus.metrics()
+
+    received, metrics = asyncio.run(scenario())
+
+    assert received == [2, 3]
+    assert metrics["published"] == 4
+    assert metrics["subscribers"][0]["dropped"] == 2
+    assert metrics["subscribers"][0]["delivered"] == 2
+
+
+def test_event_bus_accepts_publishes_from_worker_threads() -> None:
+    async def scenario() -> dict:
+        bus = EventBus()
+        subscription = bus.subscribe("sess_listener")
+        publisher = threading.Thread(
+            target=bus.publish,
+            args=(event_frame("event.backtests.report", {}),),
+        )
+        publisher.start()
+        publisher.join()
+        return await asyncio.wait_for(subscription.next(), timeout=1)
+
+    assert asyncio.run(scenario())["seq"] == 1
+
+
+def _tick(symbol: str, bid: float) -> dict:
+    return event_frame("event.feed.event", {"topic": "market.tick", "symbol": symbol, "bid": bid})
+
+
+def test_coalesce_policy_keeps_only_latest_pending_tick_per_symbol() -> None:
+    async def scenario() -> tuple[list[dict], dict]:
+        bus = EventBus(policy="coalesce", coalesce_topics=["market.tick"])
+        subscription = bus.subscribe("sess_tab")
+        bus.publish(_tick("ETHUSDm", 1.0))
+        bus.publish(event_frame("event.trade.executed", {"id": "t1"}))
+        bus.publish(_tick("ETHUSDm", 2.0))
+        bus.publish(_tick("BTCUSDm", 3.0))
+        bus.publish(_tick("ETHUSDm", 4.0))
+        received = [await subscription.next() for _ in range(subscription.depth)]
+        return received, subscription.metrics()
+
+    received, metrics = asyncio.run(scenario())
+
+    assert [(event["event"], event["payload"].get("bid")) for event in received] == [
+        ("event.trade.executed", None),
+        ("event.feed.event", 3.0),
+        ("event.feed.event", 4.0),
+    ]
+    assert metrics["coalesced"] == 2
+    assert metrics["dropped"] == 0
+    assert metrics["pendingBytes"] == 0
+    assert metrics["lag"]["maxMs"] >= 0
+
+
+def test_coalesced_events_keep_seq_order_across_topics() -> None:
+    async def scenario() -> tuple[list[int], int, int]:
+        bus = EventBus(policy="coalesce", coalesce_topics=["market.tick"])
+        subscription = bus.subscribe("sess_tab")
+        for index in range(200):
+            bus.publish(_tick("ETHUSDm" if index % 2 else "BTCUSDm", float(index)))
+            if index % 10 == 0:
+                bus.publish(event_frame("event.trade.executed", {"id": index}))
+        slots = len(subscription._pending)
+        received = [await subscription.next() for _ in range(subscription.depth)]
+        return [event["seq"] for event in received], slots, len(received)
+
+    seqs, slots, delivered = asyncio.run(scenario())
+
+    # 20 trades plus the latest tick per symbol, delivered in publish order.
+    assert delivered == 22
+    assert seqs == sorted(seqs)
+    assert seqs[-2:] == [219, 220]
+    assert slots <= 2 * delivered
+
+
+def test_byte_high_water_mark_drops_oldest_events() -> None:
+    async def scenario() -> tuple[int, dict]:
+        bus = EventBus(max_queue=100, max_bytes=300)
+        subscription = bus.subscribe("sess_tab")
+        for index in range(5):
+            bus.publish(event_frame("event.agent.block", {"index": index, "text": "x" * 60}))
+        depth = subscription.depth
+        return depth, subscription.metrics()
+
+    depth, metrics = asyncio.run(scenario())
+
+    assert depth == 2
+    assert metrics["dropped"] == 3
+    assert 0 < metrics["pendingBytes"] <= 300
+
+
+def test_disconnect_policy_flags_overflowed_session() -> None:
+    async def scenario() -> tuple[bool, dict]:
+        bus = EventBus(max_queue=2, policy="disconnect")
+        subscription = bus.subscribe("sess_stalled")
+        for index in range(3):
+            bus.publish(event_frame("event.feed.event", {"index": index}))
+        try:
+            await subscription.next()
+        except SlowConsumerError:
+            raised = True
+        else:
+            raised = False
+        bus.unsubscribe("sess_stalled")
+        return raised, bus.metrics()
+
+    raised, metrics = asyncio.run(scenario())
+
+    assert raised is True
+    assert metrics["slowConsumersDisconnected"] == 1
+    assert metrics["subscribers"] == []
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from app.audit.store import AuditStore
+from app.gateway.metrics import GatewayMetrics
+
+
+def test_gateway_metrics_tracks_counts_errors_and_phase_histograms() -> None:
+    metrics = GatewayMetrics()
+
+    metrics.observe("trades.place", "handler", 0.3)
+    metrics.observe("trades.place", "handler", 40.0)
+    metrics.record_response("trades.place", {"type": "res", "id": "a", "ok": True})
+    metrics.record_outcome("trades.place", "RISK_REJECTED")
+
+    snapshot = metrics.snapshot()["methods"]["trades.place"]
+    handler = snapshot["phases"]["handler"]
+    assert snapshot["count"] == 2
+    assert snapshot["errors"] == {"RISK_REJECTED": 1}
+    assert handler["count"] == 2
+    assert handler["maxMs"] == 40.0
+    assert handler["p50Ms"] == 0.5
+    assert handler["p99Ms"] == 40.0
+    assert {"leMs": 0.25, "count": 0} in handler["buckets"]
+    assert {"leMs": "+Inf", "count": 2} in handler["buckets"]
+
+
+def test_audit_writes_are_attributed_to_the_bound_method(tmp_path) -> None:
+    metrics = GatewayMetrics()
+    store = AuditStore(data_dir=tmp_path, on_append=metrics.observe_audit)
+
+    with metrics.bind_method("trades.place"):
+        store.append(actor="user", action="trade.submitted", trace_id="t1", data={})
+    store.append(actor="system", action="risk.stop", trace_id="t2", data={})
+
+    methods = metrics.snapshot()["methods"]
+    assert methods["trades.place"]["phases"]["audit"]["count"] == 1
+    assert methods["risk.stop"]["phases"]["audit"]["count"] == 1
+
+
+def test_durable_audit_writes_include_the_fsync_wait(tmp_path, monkeypatch) -> None:
+    metrics = GatewayMetrics()
+    store = AuditStore(data_dir=tmp_path, on_append=metrics.observe_audit)
+    sync = store._log.sync
+    monkeypatch.setattr(store._log, "sync", lambda: (time.sleep(0.05), sync()))
+
+    async def place() -> None:
+        with metrics.bind_method("trades.place"):
+            await store.append_durable(
+                actor="user", action="trade.submitted", trace_id="t1", data={}
+            )
+
+    asyncio.run(place())
+    store.close()
+
+    assert metrics.snapshot()["methods"]["trades.place"]["phases"]["audit"]["maxMs"] >= 50
+
+
+def test_gateway_metrics_renders_prometheus_text() -> None:
+    metrics = GatewayMetrics()
+    metrics.observe("gateway.ping", "send", 2.0)
+    metrics.record_outcome("gateway.ping")
+    metrics.record_outcome("unknown", "NOT_FOUND")
+
+    text = metrics.render_prometheus()
+
+    assert 'gateway_requests_total{method="gateway.ping"} 1' in text
+    assert 'gateway_request_errors_total{method="unknown",code="NOT_FOUND"} 1' in text
+    assert (
+        'gateway_phase_duration_seconds_bucket{method="gateway.ping",phase="send",le="0.001"} 0'
+        in text
+    )
+    assert (
+        'gateway_phase_duration_seconds_bucket{method="gateway.ping",phase="send",le="0.0025"} 1'
+        in text
+    )
+    assert 'gateway_phase_duration_seconds_count{method="gateway.ping",phase="send"} 1' in text
+    assert text.endswith("\n")
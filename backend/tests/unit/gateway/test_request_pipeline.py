@@ -0,0 +1,143 @@
+import asyncio
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+from app.gateway.dispatch import MethodRegistry, MethodResult, RequestLanes, ok_response
+from app.gateway.events import EventBus
+from app.gateway.metrics import GatewayMetrics
+from app.gateway.pipeline import RequestPipeline
+from app.protocol.frames import RequestFrame
+
+
+class _LaneParams(BaseModel):
+    account: str
+    delay: float = 0.0
+
+
+def _registry(log: list[str]) -> MethodRegistry:
+    registry = MethodRegistry()
+
+    @registry.register("demo.slow")
+    async def slow(session, frame, params) -> MethodResult:
+        await asyncio.sleep(0.05)
+        log.append(frame.id)
+        return MethodResult(ok_response(frame.id, payload={}))
+
+    @registry.register("demo.fast")
+    async def fast(session, frame, params) -> MethodResult:
+        log.append(frame.id)
+        return MethodResult(ok_response(frame.id, payload={}))
+
+    @registry.register(
+        "demo.ordered",
+        params_model=_LaneParams,
+        lane=lambda params: f"demo:{params.account}",
+    )
+    async def ordered(session, frame, params: _LaneParams) -> MethodResult:
+        await asyncio.sleep(params.delay)
+        log.append(frame.id)
+        return MethodResult(ok_response(frame.id, payload={}))
+
+    return registry
+
+
+def _session() -> SimpleNamespace:
+    return SimpleNamespace(
+        lanes=RequestLanes(),
+        metrics=GatewayMetrics(),
+        event_bus=EventBus(),
+        session_id=None,
+    )
+
+
+def _frame(request_id: str, method: str, params: dict | None = None) -> RequestFrame:
+    return RequestFrame(type="req", id=request_id, method=method, params=params or {})
+
+
+async def _run(frames: list[RequestFrame], *, max_in_flight: int) -> tuple[list[str], list[str]]:
+    handled: list[str] = []
+    sent: list[str] = []
+
+    async def send(outbound: dict, method: str | None) -> None:
+        sent.append(outbound["id"])
+
+    pipeline = RequestPipeline(
+        registry=_registry(handled),
+        session=_session(),
+        send=send,
+        max_in_flight=max_in_flight,
+    )
+    for frame in frames:
+        await pipeline.submit(frame)
+    await pipeline.drain()
+    assert pipeline.in_flight == 0
+    return handled, sent
+
+
+def test_pipeline_does_not_block_fast_requests_behind_slow_ones() -> None:
+    _, sent = asyncio.run(
+        _run(
+            [_frame("req_slow", "demo.slow"), _frame("req_fast", "demo.fast")],
+            max_in_flight=4,
+        )
+    )
+
+    assert sent == ["req_fast", "req_slow"]
+
+
+def test_pipeline_with_single_slot_processes_in_arrival_order() -> None:
+    _, sent = asyncio.run(
+        _run(
+            [_frame("req_slow", "demo.slow"), _frame("req_fast", "demo.fast")],
+            max_in_flight=1,
+        )
+    )
+
+    assert sent == ["req_slow", "req_fast"]
+
+
+def test_pipeline_serializes_requests_sharing_a_lane() -> None:
+    handled, _ = asyncio.run(
+        _run(
+            [
+                _frame("req_a1", "demo.ordered", {"account": "a", "delay": 0.05}),
+                _frame("req_a2", "demo.ordered", {"account": "a"}),
+                _frame("req_b1", "demo.ordered", {"account": "b"}),
+            ],
+            max_in_flight=8,
+        )
+    )
+
+    assert handled.index("req_a1") < handled.index("req_a2")
+    assert handled[0] == "req_b1"
+
+
+def test_pipeline_reports_handler_failures_as_internal_errors(caplog) -> None:
+    registry = MethodRegistry()
+    sent: list[dict] = []
+
+    @registry.register("demo.boom")
+    async def boom(session, frame, params) -> MethodResult:
+        raise RuntimeError("kaboom /srv/secret.db")
+
+    async def send(outbound: dict, method: str | None) -> None:
+        sent.append(outbound)
+
+    async def scenario() -> None:
+        pipeline = RequestPipeline(
+            registry=registry,
+            session=_session(),
+            send=send,
+            max_in_flight=2,
+        )
+        await pipeline.submit(_frame("req_boom", "demo.boom"))
+        await pipeline.drain()
+
+    asyncio.run(scenario())
+
+    assert sent[0]["id"] == "req_boom"
+    assert sent[0]["error"]["code"] == "INTERNAL_ERROR"
+    assert sent[0]["error"]["message"] == "internal error"
+    assert "kaboom /srv/secret.db" in caplog.text
+    assert caplog.records[0].exc_info is not None
@@ -1,5 +1,8 @@
+import json
+import zlib
 from datetime import UTC, datetime
 
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import create_app
@@ -52,6 +55,21 @@ def test_websocket_rejects_non_connect_first_request(tmp_path) -> None:
     assert response["error"]["code"] == "INVALID_REQUEST"
 
 
+def test_websocket_answers_malformed_json_without_dropping_connection(tmp_path) -> None:
+    client = TestClient(create_app(data_dir=tmp_path))
+
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_text("{not json")
+        malformed_response = websocket.receive_json()
+
+        websocket.send_json(_connect_payload())
+        connect_response = websocket.receive_json()
+
+    assert malformed_response["id"] == "invalid"
+    assert malformed_response["error"]["code"] == "INVALID_REQUEST"
+    assert connect_response["ok"] is True
+
+
 def test_websocket_connect_then_ping_returns_payload(tmp_path) -> None:
     client = TestClient(create_app(data_dir=tmp_path))
 
@@ -453,7 +471,8 @@ def test_websocket_agent_run_updates_queue_status(tmp_path) -> None:
 
 
 def test_gateway_methods_write_audit_entries(tmp_path) -> None:
-    client = TestClient(create_app(data_dir=tmp_path))
+    app = create_app(data_dir=tmp_path)
+    client = TestClient(app)
 
     with client.websocket_connect("/ws") as websocket:
         websocket.send_json(_connect_payload())
@@ -508,10 +527,10 @@ def test_gateway_methods_write_audit_entries(tmp_path) -> None:
         )
         _ = websocket.receive_json()
 
-    audit_log = (tmp_path / "audit.jsonl").read_text().splitlines()
+    audit_log = app.state.audit_store.read_all()
     assert len(audit_log) >= 2
-    assert '"action":"risk.preview"' in audit_log[0]
-    assert '"action":"agent.run"' in audit_log[1]
+    assert audit_log[0]["action"] == "risk.preview"
+    assert audit_log[1]["action"] == "agent.run"
 
 
 def test_gateway_memory_search_and_backtest_methods(tmp_path) -> None:
@@ -753,6 +772,74 @@ def test_gateway_persists_device_and_queue_state_between_app_instances(tmp_path)
     assert queue_response["payload"]["pendingCount"] == 1
 
 
+def test_gateway_journals_queue_completions_for_replay_after_restart(tmp_path) -> None:
+    first_client = TestClient(create_app(data_dir=tmp_path))
+
+    with first_client.websocket_connect("/ws") as websocket:
+        websocket.send_json(_connect_payload())
+        _ = websocket.receive_json()
+
+        for request_id in ["done_req_1", "done_req_2"]:
+            websocket.send_json(
+                {
+                    "type": "req",
+                    "id": f"req_run_{request_id}",
+                    "method": "agent.run",
+                    "params": {
+                        "agentId": "agent_done_1",
+                        "request": {"request_id": request_id, "kind": "hook_trigger"},
+                    },
+                }
+            )
+            _ = websocket.receive_json()
+
+        websocket.send_json(
+            {
+                "type": "req",
+                "id": "req_queue_complete_1",
+                "method": "agent.queue.complete",
+                "params": {"agentId": "agent_done_1"},
+            }
+        )
+        complete_response = websocket.receive_json()
+
+        websocket.send_json(
+            {
+                "type": "req",
+                "id": "req_queue_flush_1",
+                "method": "agent.queue.flush",
+                "params": {"agentId": "agent_done_1"},
+            }
+        )
+        flush_response = websocket.receive_json()
+
+    assert complete_response["ok"] is True
+    assert complete_response["payload"]["completedRequestId"] == "done_req_1"
+    assert complete_response["payload"]["activeRequestId"] == "done_req_2"
+    assert flush_response["ok"] is True
+    assert flush_response["payload"]["batch"] is None
+
+    # No shutdown checkpoint ran, so the restart only sees what the journal recorded.
+    second_client = TestClient(create_app(data_dir=tmp_path))
+
+    with second_client.websocket_connect("/ws") as websocket:
+        websocket.send_json(_connect_payload())
+        _ = websocket.receive_json()
+
+        websocket.send_json(
+            {
+                "type": "req",
+                "id": "req_queue_status_done_1",
+                "method": "agent.queue.status",
+                "params": {"agentId": "agent_done_1"},
+            }
+        )
+        queue_response = websocket.receive_json()
+
+    assert queue_response["payload"]["activeRequestId"] == "done_req_2"
+    assert queue_response["payload"]["pendingCount"] == 0
+
+
 def test_gateway_config_and_plugin_status_methods(tmp_path) -> None:
     client = TestClient(create_app(data_dir=tmp_path))
 
@@ -1486,3 +1573,268 @@ def test_gateway_bootstraps_accounts_from_config(tmp_path) -> None:
 
     assert response["ok"] is True
     assert response["payload"]["accounts"][0]["accountId"] == "acct_bootstrap_1"
+
+
+def test_gateway_batch_returns_per_request_results_in_one_round_trip(tmp_path) -> None:
+    client = TestClient(create_app(data_dir=tmp_path))
+
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json(_connect_payload())
+        _ = websocket.receive_json()
+
+        websocket.send_json(
+            {
+                "type": "req",
+                "id": "req_batch_1",
+                "method": "gateway.batch",
+                "params": {
+                    "requests": [
+                        {"type": "req", "id": "sub_accounts", "method": "accounts.list"},
+                        {"type": "req", "id": "sub_risk", "method": "risk.status"},
+                        {"type": "req", "id": "sub_devices", "method": "devices.list"},
+                        {"type": "req", "id": "sub_plugins", "method": "plugins.status"},
+                        {"type": "req", "id": "sub_missing", "method": "nope.method"},
+                        {
+                            "type": "req",
+                            "id": "sub_bad_params",
+                            "method": "agents.get",
+                            "params": {},
+                        },
+                        {
+                            "type": "req",
+                            "id": "sub_nested",
+                            "method": "gateway.batch",
+                            "params": {"requests": []},
+                        },
+                    ]
+                },
+            }
+        )
+        response = websocket.receive_json()
+
+    assert response["id"] == "req_batch_1"
+    assert response["ok"] is True
+    results = {item["id"]: item for item in response["payload"]["responses"]}
+    assert list(results) == [
+        "sub_accounts",
+        "sub_risk",
+        "sub_devices",
+        "sub_plugins",
+        "sub_missing",
+        "sub_bad_params",
+        "sub_nested",
+    ]
+    assert results["sub_accounts"]["payload"] == {"accounts": []}
+    assert results["sub_risk"]["payload"]["emergencyStopActive"] is False
+    assert results["sub_devices"]["ok"] is True
+    assert "enabledPlugins" in results["sub_plugins"]["payload"]
+    assert results["sub_missing"]["error"]["code"] == "NOT_FOUND"
+    assert results["sub_bad_params"]["error"]["code"] == "INVALID_PARAMS"
+    assert results["sub_nested"]["error"]["code"] == "INVALID_REQUEST"
+
+
+def test_websocket_negotiates_msgpack_with_columnar_candles(tmp_path) -> None:
+    msgpack = pytest.importorskip("msgpack")
+    client = TestClient(create_app(data_dir=tmp_path))
+    connect_payload = _connect_payload()
+    connect_payload["params"]["encodings"] = ["msgpack", "json"]
+    connect_payload["params"]["candleLayout"] = "columnar"
+
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json(connect_payload)
+        connect_response = websocket.receive_json()
+
+        websocket.send_bytes(
+            msgpack.packb(
+                {
+                    "type": "req",
+                    "id": "req_candles_1",
+                    "method": "feeds.getCandles",
+                    "params": {"symbol": "ETHUSDm", "timeframe": "5m", "limit": 3},
+                }
+            )
+        )
+        candles_response = msgpack.unpackb(websocket.receive_bytes())
+
+    assert connect_response["payload"]["encoding"]["selected"] == "msgpack"
+    assert connect_response["payload"]["candleLayout"] == "columnar"
+    assert candles_response["ok"] is True
+    assert candles_response["payload"]["layout"] == "columnar"
+    candles = candles_response["payload"]["candles"]
+    assert sorted(candles) == ["close", "high", "low", "open", "ts"]
+    assert all(len(column) == 3 for column in candles.values())
+
+
+def test_websocket_compresses_large_responses_above_threshold(tmp_path) -> None:
+    client = TestClient(create_app(data_dir=tmp_path))
+    connect_payload = _connect_payload()
+    connect_payload["params"]["compression"] = ["deflate"]
+
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json(connect_payload)
+        connect_response = websocket.receive_json()
+
+        websocket.send_json(
+            {"type": "req", "id": "req_ping_1", "method": "gateway.ping", "params": {}}
+        )
+        ping_response = websocket.receive_json()
+
+        websocket.send_json(
+            {
+                "type": "req",
+                "id": "req_candles_1",
+                "method": "feeds.getCandles",
+                "params": {"symbol": "ETHUSDm", "timeframe": "5m", "limit": 500},
+            }
+        )
+        candles_response = json.loads(zlib.decompress(websocket.receive_bytes()))
+
+        for index in range(3):
+            websocket.send_json(
+                {"type": "req", "id": f"req_bogus_{index}", "method": f"bogus.{index}"}
+            )
+            websocket.receive_json()
+
+        websocket.send_json(
+            {"type": "req", "id": "req_status_1", "method": "gateway.status", "params": {}}
+        )
+        status_response = websocket.receive_json()
+
+    assert connect_response["payload"]["compression"]["selected"] == "deflate"
+    assert ping_response["ok"] is True
+    assert len(candles_response["payload"]["candles"]) == 500
+    methods = status_response["payload"]["compression"]["methods"]
+    assert methods["gateway.ping"]["compressedFrames"] == 0
+    assert methods["feeds.getCandles"]["compressedFrames"] == 1
+    assert methods["feeds.getCandles"]["bytesSaved"] > 0
+    # Client-chosen method names must not grow the stats map.
+    assert methods["unknown"]["frames"] == 3
+    assert not any(name.startswith("bogus.") for name in methods)
+
+
+def test_gateway_metrics_rpc_and_prometheus_endpoint_report_per_method_phases(tmp_path) -> None:
+    client = TestClient(create_app(data_dir=tmp_path))
+
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json(_connect_payload())
+        websocket.receive_json()
+
+        websocket.send_json(
+            {
+                "type": "req",
+                "id": "req_candles_1",
+                "method": "feeds.getCandles",
+                "params": {"symbol": "ETHUSDm", "timeframe": "5m", "limit": 3},
+            }
+        )
+        websocket.receive_json()
+        websocket.send_json(
+            {"type": "req", "id": "req_missing_1", "method": "nope.missing", "params": {}}
+        )
+        websocket.receive_json()
+
+        websocket.send_json(
+            {"type": "req", "id": "req_metrics_1", "method": "gateway.metrics", "params": {}}
+        )
+        metrics_response = websocket.receive_json()
+
+    prometheus = client.get("/metrics")
+
+    methods = metrics_response["payload"]["methods"]
+    candles = methods["feeds.getCandles"]
+    assert candles["count"] == 1
+    assert sorted(candles["phases"]) == ["audit", "handler", "parse", "send", "validate"]
+    assert methods["unknown"]["errors"] == {"NOT_FOUND": 1}
+    assert methods["gateway.connect"]["count"] == 1
+    assert prometheus.status_code == 200
+    assert prometheus.headers["content-type"].startswith("text/plain")
+    assert 'gateway_requests_total{method="gateway.metrics"} 1' in prometheus.text
+
+
+def test_events_fan_out_to_other_sessions_with_topic_filters(tmp_path) -> None:
+    with TestClient(create_app(data_dir=tmp_path)) as client:
+        with (
+            client.websocket_connect("/ws") as operator,
+            client.websocket_connect("/ws") as dashboard,
+        ):
+            dashboard_connect = _connect_payload()
+            dashboard_connect["params"]["eventTopics"] = ["event.risk.*"]
+            dashboard.send_json(dashboard_connect)
+            dashboard_response = dashboard.receive_json()
+            operator.send_json(_connect_payload())
+            operator.receive_json()
+
+            operator.send_json(
+                {
+                    "type": "req",
+                    "id": "req_feed_sub_1",
+                    "method": "feeds.subscribe",
+                    "params": {"topics": ["market.tick"], "symbols": ["ETHUSDm"]},
+                }
+            )
+            _read_event_then_response(operator)
+            operator.send_json(
+                {
+                    "type": "req",
+                    "id": "req_stop_1",
+                    "method": "risk.emergencyStop",
+                    "params": {"action": "pause_trading", "reason": "drill"},
+                }
+            )
+            operator_event, operator_response = _read_event_then_response(operator)
+            dashboard_event = dashboard.receive_json()
+
+    assert dashboard_response["payload"]["events"]["topics"] == ["event.risk.*"]
+    assert operator_response["ok"] is True
+    assert dashboard_event["event"] == "event.risk.emergencyStop"
+    assert dashboard_event["seq"] == operator_event["seq"]
+    assert dashboard_event["payload"]["requestId"] == "req_stop_1"
+
+
+def test_audit_query_streams_filtered_pages_with_cursor(tmp_path) -> None:
+    app = create_app(data_dir=tmp_path)
+    for index in range(5):
+        app.state.audit_store.append(
+            actor="agent",
+            action="trades.place.blocked",
+            trace_id=f"trace_{index}",
+            data={"symbol": "EURUSD", "index": index},
+        )
+    client = TestClient(app)
+
+    with client.websocket_connect("/ws") as websocket:
+        websocket.send_json(_connect_payload())
+        websocket.receive_json()
+
+        pages = []
+        cursor = None
+        for page_number in range(3):
+            params = {"actions": ["trades.place.*"], "data": {"symbol": "EURUSD"}, "limit": 2}
+            if cursor is not None:
+                params["cursor"] = cursor
+            websocket.send_json(
+                {
+                    "type": "req",
+                    "id": f"req_audit_{page_number}",
+                    "method": "audit.query",
+                    "params": params,
+                }
+            )
+            response = websocket.receive_json()
+            pages.append(response)
+            cursor = response["payload"]["nextCursor"]
+
+        websocket.send_json(
+            {
+                "type": "req",
+                "id": "req_audit_bad",
+                "method": "audit.query",
+                "params": {"cursor": "bogus"},
+            }
+        )
+        bad_cursor = websocket.receive_json()
+
+    indexes = [entry["data"]["index"] for page in pages for entry in page["payload"]["entries"]]
+    assert indexes == [0, 1, 2, 3, 4]
+    assert pages[-1]["payload"]["nextCursor"] is None
+    assert bad_cursor["error"]["code"] == "INVALID_PARAMS"
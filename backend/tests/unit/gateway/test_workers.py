@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+from app.backtesting.simulator import BacktestCandle, BacktestSimulator
+from app.config.loader import GatewayWorkersConfig
+from app.gateway.methods import _run_backtest
+from app.gateway.models import BacktestSignalInput
+from app.gateway.workers import GatewayWorkers, WorkerPool
+
+
+def _current_thread_name() -> str:
+    return threading.current_thread().name
+
+
+def test_thread_worker_pool_runs_off_the_event_loop_and_records_metrics() -> None:
+    pool = WorkerPool(name="io", kind="thread", max_workers=2)
+
+    async def scenario() -> list[str]:
+        return await asyncio.gather(*(pool.run(_current_thread_name) for _ in range(4)))
+
+    try:
+        thread_names = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    metrics = pool.metrics()
+    assert all(name.startswith("gateway-io") for name in thread_names)
+    assert metrics["completed"] == 4
+    assert metrics["failed"] == 0
+    assert metrics["inFlight"] == 0
+    assert metrics["queueDepth"] == 0
+    assert metrics["latency"]["maxMs"] >= metrics["run"]["lastMs"] >= 0
+
+
+def test_worker_pool_counts_failures() -> None:
+    pool = WorkerPool(name="cpu", kind="thread", max_workers=1)
+
+    def explode() -> None:
+        raise RuntimeError("boom")
+
+    async def scenario() -> None:
+        try:
+            await pool.run(explode)
+        except RuntimeError:
+            pass
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    assert pool.metrics()["failed"] == 1
+    assert pool.metrics()["completed"] == 0
+
+
+def test_process_worker_pool_runs_backtests() -> None:
+    workers = GatewayWorkers.from_config(
+        GatewayWorkersConfig.model_validate({"cpu": {"kind": "process", "maxWorkers": 1}})
+    )
+    candles = [
+        BacktestCandle(ts="2026-01-01T00:00:00Z", open=100, high=102, low=99, close=101),
+        BacktestCandle(ts="2026-01-01T00:05:00Z", open=101, high=106, low=100, close=105),
+    ]
+    signals = [BacktestSignalInput(index=0, side="buy", stopLoss=99, takeProfit=105)]
+
+    try:
+        payload = asyncio.run(workers.cpu.run(_run_backtest, BacktestSimulator(), candles, signals))
+    finally:
+        workers.shutdown()
+
+    assert workers.cpu.kind == "process"
+    assert payload["metrics"]["trades"] == 1
+    assert workers.metrics()["cpu"]["completed"] == 1
@@ -0,0 +1,63 @@
+from app.memory.chunking import chunk_markdown
+
+
+def test_chunk_markdown_splits_on_headings_and_tracks_the_heading_path() -> None:
+    text = (
+        "# Manual\n"
+        "Intro paragraph for the manual with enough words to stand alone.\n"
+        "\n"
+        "## Risk\n"
+        "Never trade without a stop loss.\n"
+        "\n"
+        "### Sizing\n"
+        "Risk one percent per trade.\n"
+        "\n"
+        "## Entries\n"
+        "Wait for two green candles.\n"
+    )
+
+    chunks = chunk_markdown(text, min_tokens=0)
+
+    assert [(chunk.heading_path, chunk.start_line, chunk.end_line) for chunk in chunks] == [
+        ("Manual", 1, 2),
+        ("Manual > Risk", 4, 5),
+        ("Manual > Risk > Sizing", 7, 8),
+        ("Manual > Entries", 10, 11),
+    ]
+    assert chunks[1].text == "## Risk\nNever trade without a stop loss."
+
+
+def test_chunk_markdown_keeps_list_items_and_code_fences_whole() -> None:
+    entries = "".join(
+        f"- 2026-10-{day:02d} ETHUSDm long\n  entry 3120 exit 3150 stop 3100\n"
+        for day in range(1, 7)
+    )
+    text = f"# Journal\n{entries}\n```python\nsize = equity * 0.01\n\nprint(size)\n```\n"
+
+    chunks = chunk_markdown(text, max_tokens=24, min_tokens=0)
+
+    # Each entry is 10 tokens, so two fit per chunk next to the heading.
+    assert [chunk.text.count("- 2026") for chunk in chunks[:-1]] == [2, 2, 2]
+    assert all(chunk.text.endswith("stop 3100") for chunk in chunks[:-1])
+    assert chunks[-1].text == "```python\nsize = equity * 0.01\n\nprint(size)\n```"
+    assert {chunk.heading_path for chunk in chunks} == {"Journal"}
+
+
+def test_chunk_markdown_merges_small_chunks_into_their_subsection() -> None:
+    text = "# Manual\n\n## Risk\nNever trade without a stop loss.\n\n# SOUL\nI am concise.\n"
+
+    chunks = chunk_markdown(text, min_tokens=8)
+
+    assert [(chunk.heading_path, chunk.start_line) for chunk in chunks] == [
+        ("Manual > Risk", 1),
+        ("SOUL", 6),
+    ]
+
+
+def test_chunk_markdown_splits_oversized_blocks_by_line() -> None:
+    text = "".join(f"word{line} " * 5 + "\n" for line in range(10))
+
+    chunks = chunk_markdown(text, max_tokens=20, min_tokens=0)
+
+    assert [(chunk.start_line, chunk.end_line) for chunk in chunks] == [(1, 4), (5, 8), (9, 10)]
+    assert all(chunk.heading_path == "" for chunk in chunks)
@@ -1,6 +1,8 @@
+import os
+import sqlite3
 from pathlib import Path
 
-from app.memory.index import MemoryIndex
+from app.memory.index import MemoryIndex, PartitionedMemoryIndex, workspace_key
 
 
 def test_memory_index_searches_workspace_markdown_with_citations(tmp_path: Path) -> None:
@@ -44,3 +46,231 @@ def test_memory_index_reindex_replaces_old_chunks(tmp_path: Path) -> None:
     assert len(old_results) == 1
     assert len(new_results) == 1
     assert "Rule B" in new_results[0].snippet
+
+
+def test_memory_index_only_reindexes_changed_files(tmp_path: Path) -> None:
+    workspace = tmp_path / "agent_eth_5m"
+    (workspace / "journal").mkdir(parents=True)
+    manual_path = workspace / "TRADING_MANUAL.md"
+    manual_path.write_text("Rule A", encoding="utf-8")
+    journal_path = workspace / "journal" / "day1.md"
+    journal_path.write_text("Entry one", encoding="utf-8")
+
+    index = MemoryIndex(db_path=tmp_path / "memory.db")
+    first = index.index_workspace(workspace)
+    unchanged = index.index_workspace(workspace)
+
+    manual_path.write_text("Rule B plus more", encoding="utf-8")
+    journal_path.unlink()
+    changed = index.index_workspace(workspace)
+
+    assert (first.scanned, first.indexed, first.removed) == (2, 2, 0)
+    assert (unchanged.scanned, unchanged.indexed, unchanged.removed) == (2, 0, 0)
+    assert (changed.scanned, changed.indexed, changed.removed) == (1, 1, 1)
+    assert index.search("Entry", max_results=5) == []
+    assert len(index.search("Rule B", max_results=5)) == 1
+
+
+def test_memory_index_skips_rechunking_when_only_mtime_changes(tmp_path: Path) -> None:
+    workspace = tmp_path / "agent_eth_5m"
+    workspace.mkdir(parents=True)
+    manual_path = workspace / "TRADING_MANUAL.md"
+    manual_path.write_text("Rule A", encoding="utf-8")
+    index = MemoryIndex(db_path=tmp_path / "memory.db")
+    index.index_workspace(workspace)
+
+    os.utime(manual_path, ns=(0, 1_000_000_000))
+    touched = index.index_workspace(workspace)
+    again = index.index_workspace(workspace)
+
+    assert touched.indexed == 0
+    assert again.indexed == 0
+    assert len(index.search("Rule A", max_results=5)) == 1
+
+
+def test_memory_index_keeps_other_workspaces_when_one_shrinks(tmp_path: Path) -> None:
+    first = tmp_path / "agent_1"
+    second = tmp_path / "agent_10"
+    first.mkdir()
+    second.mkdir()
+    (first / "notes.md").write_text("alpha notes", encoding="utf-8")
+    (second / "notes.md").write_text("alpha second", encoding="utf-8")
+    index = MemoryIndex(db_path=tmp_path / "memory.db")
+    index.index_workspace(first)
+    index.index_workspace(second)
+
+    (first / "notes.md").unlink()
+    stats = index.index_workspace(first)
+
+    assert stats.removed == 1
+    assert [result.path for result in index.search("alpha", max_results=5)] == [
+        str(second / "notes.md")
+    ]
+
+
+def test_memory_index_search_is_scoped_to_one_workspace(tmp_path: Path) -> None:
+    eth = tmp_path / "agent_eth"
+    btc = tmp_path / "agent_btc"
+    for workspace, rule in ((eth, "ETH stop loss 1%"), (btc, "BTC stop loss 2%")):
+        workspace.mkdir()
+        (workspace / "TRADING_MANUAL.md").write_text(rule, encoding="utf-8")
+    index = MemoryIndex(db_path=tmp_path / "memory.db")
+    index.index_workspace(eth)
+    index.index_workspace(btc)
+
+    scoped = index.search("stop loss", workspace=eth)
+
+    assert [result.snippet for result in scoped] == ["ETH stop loss 1%"]
+    assert len(index.search("stop loss")) == 2
+    assert index.search(workspace_key(btc), workspace=eth) == []
+
+
+def test_memory_index_rebuilds_chunks_from_before_partitioning(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript(
+        """
+        CREATE TABLE chunks (id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT NOT NULL,
+          start_line INTEGER NOT NULL, end_line INTEGER NOT NULL, snippet TEXT NOT NULL);
+        CREATE VIRTUAL TABLE chunks_fts USING fts5(snippet, content='chunks', content_rowid='id');
+        INSERT INTO chunks(path, start_line, end_line, snippet) VALUES('old.md', 1, 1, 'old rule');
+        """
+    )
+    legacy.close()
+    workspace = tmp_path / "agent_eth"
+    workspace.mkdir()
+    (workspace / "SOUL.md").write_text("new rule", encoding="utf-8")
+
+    index = MemoryIndex(db_path=db_path)
+    index.index_workspace(workspace)
+
+    assert [result.snippet for result in index.search("rule")] == ["new rule"]
+
+
+def test_partitioned_memory_index_keeps_one_database_per_workspace(tmp_path: Path) -> None:
+    eth = tmp_path / "agents" / "agent_eth"
+    btc = tmp_path / "agents" / "agent_btc"
+    for workspace, rule in ((eth, "ETH stop loss"), (btc, "BTC stop loss")):
+        workspace.mkdir(parents=True)
+        (workspace / "TRADING_MANUAL.md").write_text(rule, encoding="utf-8")
+    index = PartitionedMemoryIndex(root_dir=tmp_path / "memory")
+    index.index_workspace(eth)
+    index.index_workspace(btc)
+    (btc / "TRADING_MANUAL.md").unlink()
+    index.apply_changes(btc, [btc / "TRADING_MANUAL.md"])
+
+    reopened = PartitionedMemoryIndex(root_dir=tmp_path / "memory")
+
+    assert sorted(path.name for path in (tmp_path / "memory").glob("*.db")) == sorted(
+        [f"{workspace_key(eth)}.db", f"{workspace_key(btc)}.db"]
+    )
+    assert [result.snippet for result in reopened.search("stop", workspace=eth)] == [
+        "ETH stop loss"
+    ]
+    assert reopened.search("stop", workspace=btc) == []
+    assert [result.snippet for result in reopened.search("stop")] == ["ETH stop loss"]
+
+
+def test_memory_index_commits_once_per_batch_of_files(tmp_path: Path, monkeypatch) -> None:
+    workspace = tmp_path / "agent_eth"
+    workspace.mkdir()
+    for note in range(5):
+        (workspace / f"note_{note}.md").write_text(f"note {note}\n" * 30, encoding="utf-8")
+    monkeypatch.setattr("app.memory.index.BATCH_FILES", 2)
+    index = MemoryIndex(db_path=tmp_path / "memory.db")
+    statements: list[str] = []
+    index._conn.set_trace_callback(statements.append)
+
+    stats = index.index_workspace(workspace)
+
+    assert (stats.indexed, stats.chunks) == (5, 5)
+    assert statements.count("COMMIT") == 3
+    assert len(index.search("note", max_results=50, workspace=workspace)) == 5
+
+    for note in range(5):
+        (workspace / f"note_{note}.md").unlink()
+    removed = index.index_workspace(workspace)
+
+    assert removed.removed == 5
+    assert index._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] == 0
+    assert index.search("note") == []
+
+
+def test_memory_index_ranks_heading_matches_first(tmp_path: Path) -> None:
+    workspace = tmp_path / "agent_eth"
+    workspace.mkdir()
+    (workspace / "TRADING_MANUAL.md").write_text(
+        "# Manual\n\n## Entries\nWait for a retest; size by the risk rules below.\n\n"
+        "## Risk\nNever trade without a stop loss. Cut size after two losses in a row.\n",
+        encoding="utf-8",
+    )
+    index = MemoryIndex(db_path=tmp_path / "memory.db")
+    index.index_workspace(workspace)
+
+    results = index.search("risk", workspace=workspace)
+
+    assert [result.heading_path for result in results] == ["Manual > Risk", "Manual > Entries"]
+    assert results[0].start_line == 6
+
+
+def test_memory_index_rebuilds_chunks_without_heading_paths(tmp_path: Path) -> None:
+    db_path = tmp_path / "memory.db"
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript(
+        """
+        CREATE TABLE chunks (id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT NOT NULL,
+          workspace_key TEXT NOT NULL, start_line INTEGER NOT NULL, end_line INTEGER NOT NULL,
+          snippet TEXT NOT NULL);
+        CREATE TABLE files (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL,
+          size INTEGER NOT NULL, content_hash TEXT NOT NULL);
+        INSERT INTO files VALUES('SOUL.md', 0, 0, '');
+        """
+    )
+    legacy.close()
+
+    index = MemoryIndex(db_path=db_path)
+
+    assert index._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 0
+    columns = {row["name"] for row in index._conn.execute("PRAGMA table_info(chunks)")}
+    assert "heading_path" in columns
+
+
+def test_memory_index_treats_spellings_of_one_workspace_as_one_partition(
+    tmp_path: Path, monkeypatch
+) -> None:
+    workspace = tmp_path / "agents" / "agent_eth"
+    workspace.mkdir(parents=True)
+    (workspace / "TRADING_MANUAL.md").write_text("Never trade without stop loss.", "utf-8")
+    (tmp_path / "linked").symlink_to(workspace)
+    monkeypatch.chdir(tmp_path)
+    index = MemoryIndex(db_path=tmp_path / "memory.db")
+
+    index.index_workspace("agents/agent_eth")
+    stats = index.index_workspace(tmp_path / "linked")
+
+    assert stats.indexed == 0
+    for spelling in ("agents/agent_eth", "./agents/agent_eth/", workspace, tmp_path / "linked"):
+        assert workspace_key(spelling) == workspace_key(workspace)
+        assert len(index.search("stop loss", workspace=spelling)) == 1
+
+    (workspace / "TRADING_MANUAL.md").write_text("Size down on Fridays.", "utf-8")
+    index.apply_changes("agents/agent_eth", ["agents/agent_eth/TRADING_MANUAL.md"])
+
+    assert index.search("stop loss") == []
+    assert len(index.search("Fridays", workspace=tmp_path / "linked")) == 1
+
+
+def test_memory_index_rebuilds_indexes_keyed_by_unresolved_paths(tmp_path: Path) -> None:
+    workspace = tmp_path / "agent_eth"
+    workspace.mkdir()
+    (workspace / "SOUL.md").write_text("old rule", encoding="utf-8")
+    index = MemoryIndex(db_path=tmp_path / "memory.db")
+    index.index_workspace(workspace)
+    index._conn.execute("PRAGMA user_version = 0")
+    index._conn.commit()
+
+    reopened = MemoryIndex(db_path=tmp_path / "memory.db")
+
+    assert reopened.search("rule") == []
+    assert reopened._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 0
+    assert reopened.index_workspace(workspace).indexed == 1
@@ -0,0 +1,166 @@
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from app.memory.index import MemoryIndex
+from app.memory.watcher import MemoryWatcher, _open_inotify
+
+
+def _wait_for(predicate: Callable[[], bool], timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def _workspace(tmp_path: Path) -> Path:
+    workspace = tmp_path / "agent_eth_5m"
+    (workspace / "journal").mkdir(parents=True)
+    (workspace / "TRADING_MANUAL.md").write_text("Never trade without stop loss.", "utf-8")
+    return workspace
+
+
+def _inotify_available() -> bool:
+    source = _open_inotify()
+    if source is None:
+        return False
+    source.close()
+    return True
+
+
+@pytest.fixture(params=["poll", "inotify"])
+def watcher(request, tmp_path: Path):
+    if request.param == "inotify" and not _inotify_available():
+        pytest.skip("inotify is not available")
+    memory_watcher = MemoryWatcher(
+        MemoryIndex(db_path=tmp_path / "memory.db"),
+        backend=request.param,
+        poll_seconds=0.05,
+        debounce_seconds=0.05,
+    )
+    yield memory_watcher
+    memory_watcher.close()
+
+
+def test_watcher_indexes_workspace_before_first_search(watcher, tmp_path: Path) -> None:
+    workspace = _workspace(tmp_path)
+
+    watcher.ensure_watched(workspace)
+
+    assert watcher._index.search("stop loss")[0].path.endswith("TRADING_MANUAL.md")
+
+
+def test_watcher_applies_edits_creates_and_deletes(watcher, tmp_path: Path) -> None:
+    workspace = _workspace(tmp_path)
+    watcher.ensure_watched(workspace)
+    index = watcher._index
+
+    (workspace / "TRADING_MANUAL.md").write_text("Always size down on Fridays.", "utf-8")
+    (workspace / "journal" / "day1.md").write_text("Breakout failed at resistance.", "utf-8")
+    nested = workspace / "memory" / "2026"
+    nested.mkdir(parents=True)
+    (nested / "lessons.md").write_text("Fade the first spike.", "utf-8")
+
+    assert _wait_for(lambda: len(index.search("Fridays")) == 1)
+    assert _wait_for(lambda: len(index.search("resistance")) == 1)
+    assert _wait_for(lambda: len(index.search("spike")) == 1)
+    assert index.search("stop loss") == []
+
+    (workspace / "journal" / "day1.md").unlink()
+
+    assert _wait_for(lambda: index.search("resistance") == [])
+
+
+def test_watcher_batches_a_burst_of_writes(watcher, tmp_path: Path) -> None:
+    workspace = _workspace(tmp_path)
+    watcher.ensure_watched(workspace)
+
+    for note in range(40):
+        (workspace / "journal" / f"note_{note}.md").write_text(f"burst entry n{note}", "utf-8")
+
+    assert _wait_for(lambda: len(watcher._index.search("burst", max_results=50)) == 40)
+    assert watcher.batches < 40
+
+
+class _FlakyIndex(MemoryIndex):
+    """Fails the watcher thread's first sync, and blocks it entirely when ``hang`` is set."""
+
+    def __init__(self, *, db_path: Path, hang: bool = False) -> None:
+        super().__init__(db_path=db_path)
+        self.release = threading.Event()
+        self._hang = hang
+
+    def index_workspace(self, workspace_dir):
+        if threading.current_thread().name == "memory-watcher":
+            if self._hang:
+                self.release.wait()
+            else:
+                raise sqlite3.OperationalError("database is locked")
+        return super().index_workspace(workspace_dir)
+
+
+def test_watcher_survives_index_errors(tmp_path: Path) -> None:
+    workspace = _workspace(tmp_path)
+    memory_watcher = MemoryWatcher(_FlakyIndex(db_path=tmp_path / "memory.db"), backend="poll")
+
+    memory_watcher.ensure_watched(workspace, timeout=5.0)
+
+    assert memory_watcher.last_error == "OperationalError: database is locked"
+    assert memory_watcher._thread.is_alive()
+    memory_watcher.close()
+
+
+def test_ensure_watched_indexes_inline_when_the_watcher_is_stuck(tmp_path: Path) -> None:
+    workspace = _workspace(tmp_path)
+    index = _FlakyIndex(db_path=tmp_path / "memory.db", hang=True)
+    memory_watcher = MemoryWatcher(index, backend="poll")
+
+    memory_watcher.ensure_watched(workspace, timeout=0.1)
+
+    assert index.search("stop loss")[0].path.endswith("TRADING_MANUAL.md")
+    index.release.set()
+    memory_watcher.close()
+
+
+def test_watcher_picks_up_a_workspace_created_after_it_was_watched(watcher, tmp_path: Path) -> None:
+    late = tmp_path / "agent_late"
+    later = tmp_path / "agent_later"
+    watcher.ensure_watched(late)
+    watcher.ensure_watched(later)
+
+    late.mkdir()
+    (late / "TRADING_MANUAL.md").write_text("Late rule: no trades after 9pm.", "utf-8")
+    later.mkdir()
+    (later / "TRADING_MANUAL.md").write_text("Later rule: flat by Friday.", "utf-8")
+    watcher.ensure_watched(late)
+
+    assert len(watcher._index.search("9pm", workspace=late)) == 1
+    assert _wait_for(lambda: len(watcher._index.search("Friday", workspace=later)) == 1)
+    (late / "journal.md").write_text("Late entry: skipped the open.", "utf-8")
+    assert _wait_for(lambda: len(watcher._index.search("skipped", workspace=late)) == 1)
+
+
+def test_watcher_drops_the_least_recently_watched_workspace(tmp_path: Path) -> None:
+    memory_watcher = MemoryWatcher(
+        MemoryIndex(db_path=tmp_path / "memory.db"),
+        backend="poll",
+        poll_seconds=0.05,
+        debounce_seconds=0.05,
+        max_workspaces=2,
+    )
+    first, second, third = (tmp_path / name for name in ("first", "second", "third"))
+    for workspace in (first, second, third):
+        workspace.mkdir()
+        memory_watcher.ensure_watched(workspace)
+        if workspace == second:
+            memory_watcher.ensure_watched(first)
+
+    assert list(memory_watcher._ready) == [str(first), str(third)]
+    assert _wait_for(lambda: set(memory_watcher._source._snapshots) == {first, third})
+    memory_watcher.close()
@@ -0,0 +1,52 @@
+import pytest
+
+from app.protocol.encoding import (
+    JSON_CODEC,
+    negotiate_encoding,
+    parse_wire_frame,
+    supported_encodings,
+    wire_frame_id_hint,
+)
+from app.protocol.frames import RequestFrame
+
+msgpack = pytest.importorskip("msgpack")
+pytest.importorskip("cbor2")
+
+
+def test_negotiate_encoding_picks_first_supported_preference() -> None:
+    assert negotiate_encoding(["bson", "cbor", "msgpack"]).name == "cbor"
+    assert negotiate_encoding(["bson"]) is JSON_CODEC
+    assert negotiate_encoding([]) is JSON_CODEC
+    assert supported_encodings() == ["json", "msgpack", "cbor"]
+
+
+@pytest.mark.parametrize("encoding", ["msgpack", "cbor"])
+def test_binary_codecs_round_trip_request_frames(encoding: str) -> None:
+    codec = negotiate_encoding([encoding])
+    message = {"type": "req", "id": "req_1", "method": "gateway.ping", "params": {}}
+
+    frame = parse_wire_frame(codec.encode(message), codec)
+
+    assert isinstance(frame, RequestFrame)
+    assert frame.method == "gateway.ping"
+    assert codec.decode(codec.encode({"candles": {"open": [1.5, 2.0]}})) == {
+        "candles": {"open": [1.5, 2.0]}
+    }
+
+
+def test_text_frames_stay_json_after_binary_negotiation() -> None:
+    codec = negotiate_encoding(["msgpack"])
+
+    frame = parse_wire_frame('{"type":"req","id":"req_2","method":"gateway.ping"}', codec)
+
+    assert frame.id == "req_2"
+
+
+def test_malformed_binary_frames_raise_value_error_with_id_hint() -> None:
+    codec = negotiate_encoding(["msgpack"])
+
+    with pytest.raises(ValueError):
+        parse_wire_frame(b"\xc1", codec)
+
+    assert wire_frame_id_hint(b"\xc1", codec) == "invalid"
+    assert wire_frame_id_hint(msgpack.packb({"id": "req_9", "type": "req"}), codec) == "req_9"
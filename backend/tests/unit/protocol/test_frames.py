@@ -1,11 +1,18 @@
+import json
+
 import pytest
 from pydantic import ValidationError
 
 from app.protocol.frames import (
+    MAX_BATCH_REQUESTS,
+    BatchRequestFrame,
+    BatchResponsePayload,
     EventFrame,
     RequestFrame,
     ResponseFrame,
+    frame_id_hint,
     parse_gateway_frame,
+    parse_gateway_frame_json,
 )
 
 
@@ -62,3 +69,82 @@ def test_parse_gateway_frame_rejects_invalid_frame() -> None:
 
     with pytest.raises(ValidationError):
         parse_gateway_frame(payload)
+
+
+def _sub_request(request_id: str, method: str = "accounts.list") -> dict:
+    return {"type": "req", "id": request_id, "method": method, "params": {}}
+
+
+def test_batch_request_frame_carries_sub_requests_and_batch_response() -> None:
+    frame = BatchRequestFrame.model_validate(
+        {
+            "type": "req",
+            "id": "req_batch_1",
+            "method": "gateway.batch",
+            "params": {"requests": [_sub_request("a"), _sub_request("b", "risk.status")]},
+        }
+    )
+    response = BatchResponsePayload.model_validate(
+        {
+            "responses": [
+                {"type": "res", "id": "a", "ok": True, "payload": {"accounts": []}},
+                {
+                    "type": "res",
+                    "id": "b",
+                    "ok": False,
+                    "error": {"code": "NOT_FOUND", "message": "missing"},
+                },
+            ]
+        }
+    )
+
+    assert [request.method for request in frame.params.requests] == [
+        "accounts.list",
+        "risk.status",
+    ]
+    assert [item.ok for item in response.responses] == [True, False]
+
+
+def test_batch_request_frame_rejects_duplicate_ids_and_oversized_batches() -> None:
+    with pytest.raises(ValidationError):
+        BatchRequestFrame.model_validate(
+            {
+                "type": "req",
+                "id": "req_batch_dupe",
+                "method": "gateway.batch",
+                "params": {"requests": [_sub_request("a"), _sub_request("a")]},
+            }
+        )
+
+    with pytest.raises(ValidationError):
+        BatchRequestFrame.model_validate(
+            {
+                "type": "req",
+                "id": "req_batch_big",
+                "method": "gateway.batch",
+                "params": {
+                    "requests": [
+                        _sub_request(f"req_{index}") for index in range(MAX_BATCH_REQUESTS + 1)
+                    ]
+                },
+            }
+        )
+
+
+def test_parse_gateway_frame_json_matches_python_parse() -> None:
+    raw = b'{"type":"req","id":" req_1 ","method":"trades.place","params":{"a":1}}'
+
+    frame = parse_gateway_frame_json(raw)
+
+    assert isinstance(frame, RequestFrame)
+    assert frame == parse_gateway_frame(json.loads(raw))
+    assert frame.id == "req_1"
+
+
+def test_parse_gateway_frame_json_rejects_malformed_json_with_id_hint() -> None:
+    with pytest.raises(ValidationError):
+        parse_gateway_frame_json("{not json")
+
+    assert frame_id_hint("{not json") == "invalid"
+    assert frame_id_hint('{"type":"req","id":"req_7","params":[]}') == "req_7"
+    assert frame_id_hint("[1, 2]") == "invalid"
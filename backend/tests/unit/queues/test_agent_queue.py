@@ -97,3 +97,88 @@ def test_queue_drops_oldest_when_cap_reached_and_policy_old() -> None:
 
     assert decision.type == QueueDecisionType.ENQUEUED
     assert [item.request_id for item in queue.pending] == ["req_3"]
+
+
+def test_dedupe_keys_are_released_when_requests_leave_the_queue() -> None:
+    queue = AgentQueue(QueueSettings(mode="followup", cap=2, drop_policy="old"))
+    _ = queue.enqueue(_request("req_1", dedupe_key="active"), now_ms=1_000)
+    _ = queue.enqueue(_request("req_2", dedupe_key="evicted"), now_ms=1_100)
+    _ = queue.enqueue(_request("req_3", dedupe_key="promoted"), now_ms=1_200)
+    promoted = queue.mark_active_complete()
+
+    evicted_again = queue.enqueue(_request("req_4", dedupe_key="evicted"), now_ms=1_300)
+    promoted_again = queue.enqueue(_request("req_5", dedupe_key="promoted"), now_ms=1_400)
+    active_again = queue.enqueue(_request("req_6", dedupe_key="active"), now_ms=1_500)
+
+    assert promoted is not None and promoted.request_id == "req_3"
+    assert evicted_again.type == QueueDecisionType.ENQUEUED
+    assert promoted_again.type == QueueDecisionType.DEDUPED
+    assert active_again.type == QueueDecisionType.ENQUEUED
+    assert [item.request_id for item in queue.pending] == ["req_6"]
+
+
+def test_from_snapshot_rebuilds_dedupe_index() -> None:
+    queue = AgentQueue(QueueSettings(mode="followup", cap=10, drop_policy="old"))
+    _ = queue.enqueue(_request("req_1", dedupe_key="a"), now_ms=1_000)
+    _ = queue.enqueue(_request("req_2", dedupe_key="b"), now_ms=1_100)
+
+    restored = AgentQueue.from_snapshot(queue.snapshot())
+
+    assert restored.enqueue(_request("req_3", dedupe_key="b"), now_ms=1_200).type == (
+        QueueDecisionType.DEDUPED
+    )
+
+
+def test_pending_dispatches_by_priority_then_arrival() -> None:
+    queue = AgentQueue(QueueSettings(mode="followup", cap=10, drop_policy="old"))
+    _ = queue.enqueue(_request("req_active"), now_ms=1_000)
+    for request_id, priority in [
+        ("req_low", "low"),
+        ("req_normal_1", "normal"),
+        ("req_high", "high"),
+        ("req_normal_2", "normal"),
+    ]:
+        _ = queue.enqueue(_request(request_id, priority=priority), now_ms=1_100)
+
+    order = []
+    while (next_request := queue.mark_active_complete()) is not None:
+        order.append(next_request.request_id)
+
+    assert order == ["req_high", "req_normal_1", "req_normal_2", "req_low"]
+
+
+def test_low_priority_runs_after_starvation_limit() -> None:
+    queue = AgentQueue(
+        QueueSettings(mode="followup", cap=20, drop_policy="old", starvation_limit=2)
+    )
+    _ = queue.enqueue(_request("req_active"), now_ms=1_000)
+    _ = queue.enqueue(_request("req_low", priority="low"), now_ms=1_100)
+    for index in range(4):
+        _ = queue.enqueue(_request(f"req_high_{index}", priority="high"), now_ms=1_200)
+
+    order = [queue.mark_active_complete().request_id for _ in range(5)]
+
+    assert order == ["req_high_0", "req_high_1", "req_low", "req_high_2", "req_high_3"]
+
+
+def test_drop_old_evicts_lowest_priority_first() -> None:
+    queue = AgentQueue(QueueSettings(mode="followup", cap=3, drop_policy="old"))
+    _ = queue.enqueue(_request("req_active"), now_ms=1_000)
+    _ = queue.enqueue(_request("req_normal", priority="normal"), now_ms=1_100)
+    _ = queue.enqueue(_request("req_low", priority="low"), now_ms=1_200)
+
+    high_decision = queue.enqueue(_request("req_high", priority="high"), now_ms=1_300)
+    low_decision = queue.enqueue(_request("req_low_2", priority="low"), now_ms=1_400)
+
+    assert high_decision.type == QueueDecisionType.ENQUEUED
+    assert low_decision.type == QueueDecisionType.DROPPED
+    assert [item.request_id for item in queue.pending] == ["req_high", "req_normal"]
+
+
+def test_queue_mode_stays_fifo_regardless_of_priority() -> None:
+    queue = AgentQueue(QueueSettings(mode="queue", cap=10, drop_policy="old"))
+    _ = queue.enqueue(_request("req_active"), now_ms=1_000)
+    _ = queue.enqueue(_request("req_low", priority="low"), now_ms=1_100)
+    _ = queue.enqueue(_request("req_high", priority="high"), now_ms=1_200)
+
+    assert [item.request_id for item in queue.pending] == ["req_low", "req_high"]
@@ -2,6 +2,7 @@ import json
 
 from app.queues.agent_queue import AgentQueue, AgentRequest, QueueSettings
 from app.queues.snapshot_store import QueueSnapshotStore
+from app.storage.state_store import SqliteStateStore
 
 
 def test_queue_snapshot_store_round_trips_active_and_pending_requests(tmp_path) -> None:
@@ -75,3 +76,116 @@ def test_queue_snapshot_store_skips_invalid_queue_entries(tmp_path) -> None:
     loaded = store.load()
 
     assert list(loaded.keys()) == ["agent_good"]
+
+
+def _request(request_id: str) -> AgentRequest:
+    return AgentRequest(request_id=request_id, agent_id="agent_1", kind="hook_trigger")
+
+
+def _journal_ops(store: QueueSnapshotStore, queues: dict[str, AgentQueue]) -> None:
+    queues["agent_1"] = AgentQueue(QueueSettings(mode="followup", cap=2, drop_policy="old"))
+    store.record_create(queues, "agent_1")
+    for index, request_id in enumerate(["req_1", "req_2", "req_3"]):
+        request = _request(request_id)
+        queues["agent_1"].enqueue(request, now_ms=index)
+        store.record_enqueue(queues, "agent_1", request, now_ms=index)
+    queues["agent_1"].mark_active_complete()
+    store.record_complete(queues, "agent_1")
+
+
+def test_queue_journal_replays_operations_without_a_checkpoint(tmp_path) -> None:
+    state_path = tmp_path / "state" / "agent_queues.json"
+    store = QueueSnapshotStore(state_path=state_path)
+    queues = store.load()
+    _journal_ops(store, queues)
+    store.close()
+
+    loaded = QueueSnapshotStore(state_path=state_path).load()
+
+    assert not state_path.exists()
+    assert loaded["agent_1"].snapshot() == queues["agent_1"].snapshot()
+    assert loaded["agent_1"].active_request.request_id == "req_3"
+
+
+def test_queue_journal_checkpoints_and_skips_records_already_covered(tmp_path) -> None:
+    state_path = tmp_path / "state" / "agent_queues.json"
+    store = QueueSnapshotStore(state_path=state_path, checkpoint_every=4)
+    queues = store.load()
+    _journal_ops(store, queues)
+    journal_after_checkpoint = store.journal_path.read_bytes()
+    store.close()
+
+    assert json.loads(state_path.read_text(encoding="utf-8"))["journalSeq"] == 4
+    assert len(journal_after_checkpoint.splitlines()) == 1
+
+    # A crash between writing the checkpoint and truncating the journal, plus a torn tail.
+    store.journal_path.write_bytes(
+        b'{"seq":3,"op":"complete","agentId":"agent_1"}\n'
+        + journal_after_checkpoint
+        + b'{"seq":6,"op":"comp'
+    )
+    reloaded_store = QueueSnapshotStore(state_path=state_path)
+    loaded = reloaded_store.load()
+
+    assert loaded["agent_1"].snapshot() == queues["agent_1"].snapshot()
+    assert store.journal_path.read_bytes().endswith(b"}\n")
+
+
+def test_queue_store_migrates_journal_into_state_store(tmp_path) -> None:
+    state_path = tmp_path / "state" / "agent_queues.json"
+    store = QueueSnapshotStore(state_path=state_path, checkpoint_every=4)
+    queues = store.load()
+    _journal_ops(store, queues)
+    store.close()
+
+    state_store = SqliteStateStore(tmp_path / "state" / "state.db")
+    migrated = QueueSnapshotStore(state_path=state_path, state_store=state_store).load()
+
+    assert migrated["agent_1"].snapshot() == queues["agent_1"].snapshot()
+    assert not state_path.exists()
+    assert not store.journal_path.exists()
+    assert state_store.load("queues") == {"agent_1": queues["agent_1"].snapshot()}
+
+
+def test_queue_store_with_state_store_journals_one_row_per_mutation(tmp_path) -> None:
+    state_store = SqliteStateStore(tmp_path / "state.db")
+    store = QueueSnapshotStore(state_path=tmp_path / "agent_queues.json", state_store=state_store)
+    queues = store.load()
+    queues["agent_2"] = AgentQueue(QueueSettings(mode="followup", cap=2, drop_policy="old"))
+    store.record_create(queues, "agent_2")
+    _journal_ops(store, queues)
+
+    # Six small journal rows; the queue rows are only rewritten at a checkpoint.
+    assert len(state_store.load("queue_journal")) == 6
+    assert state_store.load("queues") == {}
+
+    reloaded = QueueSnapshotStore(
+        state_path=tmp_path / "agent_queues.json", state_store=state_store
+    ).load()
+
+    assert not store.journal_path.exists()
+    assert sorted(reloaded) == ["agent_1", "agent_2"]
+    assert reloaded["agent_1"].snapshot() == queues["agent_1"].snapshot()
+
+
+def test_queue_store_with_state_store_checkpoints_and_clears_the_journal(tmp_path) -> None:
+    state_store = SqliteStateStore(tmp_path / "state.db")
+    store = QueueSnapshotStore(
+        state_path=tmp_path / "agent_queues.json", state_store=state_store, checkpoint_every=4
+    )
+    queues = store.load()
+    _journal_ops(store, queues)
+
+    # Four records hit the checkpoint; only the fifth is left in the journal.
+    journal = state_store.load("queue_journal")
+    assert [record["seq"] for record in journal.values()] == [5]
+    assert journal["000000000005"]["op"] == "complete"
+
+    reloaded = QueueSnapshotStore(
+        state_path=tmp_path / "agent_queues.json", state_store=state_store
+    ).load()
+    assert reloaded["agent_1"].snapshot() == queues["agent_1"].snapshot()
+
+    store.save(queues)
+    assert state_store.load("queue_journal") == {}
+    assert state_store.load("queues") == {"agent_1": queues["agent_1"].snapshot()}
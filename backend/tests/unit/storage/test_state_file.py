@@ -0,0 +1,90 @@
+import json
+
+from app.storage.state_file import StateFile
+
+
+def test_state_file_round_trips_and_leaves_no_temp_file(tmp_path) -> None:
+    state_file = StateFile(tmp_path / "state" / "agents.json")
+
+    state_file.save({"version": 1, "agents": [{"agentId": "agent_1"}]})
+
+    assert state_file.load() == {"version": 1, "agents": [{"agentId": "agent_1"}]}
+    assert sorted(path.name for path in (tmp_path / "state").iterdir()) == ["agents.json"]
+    assert state_file.writes == 1
+
+
+def test_state_file_missing_returns_none(tmp_path) -> None:
+    assert StateFile(tmp_path / "devices.json").load() is None
+
+
+def test_state_file_moves_corrupt_file_aside(tmp_path) -> None:
+    path = tmp_path / "devices.json"
+    path.write_text('{"version":1,"devi', encoding="utf-8")
+    state_file = StateFile(path)
+
+    assert state_file.load() is None
+    assert not path.exists()
+    assert (tmp_path / "devices.json.corrupt").read_text(encoding="utf-8") == '{"version":1,"devi'
+
+    state_file.save({"version": 1, "devices": []})
+    assert (tmp_path / "devices.json.corrupt").exists()
+
+
+def test_state_file_keeps_previous_state_when_write_fails(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "accounts.json"
+    state_file = StateFile(path)
+    state_file.save({"version": 1, "accounts": ["acct_1"]})
+
+    def fail_fsync(_fd: int) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr("app.storage.state_file.os.fsync", fail_fsync)
+    try:
+        state_file.save({"version": 1, "accounts": ["acct_1", "acct_2"]})
+    except OSError:
+        pass
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {"version": 1, "accounts": ["acct_1"]}
+
+
+def test_state_file_coalesces_burst_into_one_write(tmp_path) -> None:
+    path = tmp_path / "accounts.json"
+    state_file = StateFile(path, coalesce_seconds=60)
+
+    for index in range(100):
+        state_file.save({"version": 1, "count": index})
+
+    assert not path.exists()
+    assert state_file.writes == 0
+
+    state_file.close()
+
+    assert state_file.writes == 1
+    assert json.loads(path.read_text(encoding="utf-8")) == {"version": 1, "count": 99}
+
+
+def test_state_file_timer_writes_after_window(tmp_path) -> None:
+    path = tmp_path / "devices.json"
+    state_file = StateFile(path, coalesce_seconds=0.01)
+
+    state_file.save({"version": 1})
+    state_file.save({"version": 2})
+    timer = state_file._timer
+    assert timer is not None
+    timer.join(timeout=5)
+
+    assert state_file.writes == 1
+    assert json.loads(path.read_text(encoding="utf-8")) == {"version": 2}
+
+
+def test_state_file_batched_saves_write_once_on_exit(tmp_path) -> None:
+    path = tmp_path / "accounts.json"
+    state_file = StateFile(path)
+
+    with state_file.batched():
+        for index in range(10):
+            state_file.save({"count": index})
+        assert state_file.writes == 0
+
+    assert state_file.writes == 1
+    assert json.loads(path.read_text(encoding="utf-8")) == {"count": 9}
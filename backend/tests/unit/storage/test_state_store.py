@@ -0,0 +1,93 @@
+import pytest
+
+from app.accounts.registry import AccountRegistry
+from app.devices.registry import DeviceRegistry
+from app.storage.state_store import SqliteStateStore
+
+
+def test_state_store_puts_deletes_and_reloads_rows(tmp_path) -> None:
+    store = SqliteStateStore(tmp_path / "state.db")
+    store.put("devices", "dev_1", {"deviceId": "dev_1"})
+    store.put("devices", "dev_2", {"deviceId": "dev_2"})
+    store.put("accounts", "acct_1", {"accountId": "acct_1"})
+    store.delete("devices", "dev_1")
+    store.close()
+
+    reopened = SqliteStateStore(tmp_path / "state.db")
+
+    assert reopened.load("devices") == {"dev_2": {"deviceId": "dev_2"}}
+    assert reopened.load("accounts") == {"acct_1": {"accountId": "acct_1"}}
+
+
+def test_state_store_transaction_rolls_back_on_error(tmp_path) -> None:
+    store = SqliteStateStore(tmp_path / "state.db")
+    store.put("devices", "dev_1", {"v": 1})
+
+    with pytest.raises(RuntimeError), store.transaction():
+        store.put("devices", "dev_1", {"v": 2})
+        with store.transaction():
+            store.put("devices", "dev_2", {"v": 1})
+        raise RuntimeError("boom")
+
+    assert store.load("devices") == {"dev_1": {"v": 1}}
+
+
+def test_device_registry_migrates_json_state_into_store(tmp_path) -> None:
+    state_path = tmp_path / "state" / "devices.json"
+    legacy = DeviceRegistry(state_path=state_path)
+    legacy.pair(device_id="dev_1", platform="ios", label="iPhone", push_token="push_a")
+    legacy.pair(device_id="dev_2", platform="android", label="Pixel", push_token="push_b")
+
+    store = SqliteStateStore(tmp_path / "state" / "state.db")
+    registry = DeviceRegistry(state_path=state_path, state_store=store)
+
+    assert [device.device_id for device in registry.list()] == ["dev_1", "dev_2"]
+    assert not state_path.exists()
+    assert (tmp_path / "state" / "devices.json.migrated").exists()
+
+    registry.register_push(device_id="dev_2", push_token="push_c")
+    registry.unpair(device_id="dev_1")
+    reloaded = DeviceRegistry(state_path=state_path, state_store=store)
+
+    assert [(device.device_id, device.push_token) for device in reloaded.list()] == [
+        ("dev_2", "push_c")
+    ]
+    assert not state_path.exists()
+
+
+def test_registry_update_rewrites_only_its_row(tmp_path) -> None:
+    store = SqliteStateStore(tmp_path / "state.db")
+    registry = DeviceRegistry(state_store=store)
+    for index in range(50):
+        registry.pair(device_id=f"dev_{index}", platform="ios", label="iPhone", push_token="push_a")
+    statements: list[str] = []
+    store._conn.set_trace_callback(statements.append)
+
+    registry.register_push(device_id="dev_7", push_token="push_b")
+
+    writes = [sql for sql in statements if sql.startswith(("INSERT", "DELETE", "UPDATE"))]
+    assert len(writes) == 1
+    assert "'dev_7'" in writes[0]
+    assert store.load("devices")["dev_7"]["pushToken"] == "push_b"
+
+
+def test_account_registry_batched_connects_share_one_transaction(tmp_path) -> None:
+    store = SqliteStateStore(tmp_path / "state.db")
+    registry = AccountRegistry(state_store=store)
+    statements: list[str] = []
+    store._conn.set_trace_callback(statements.append)
+
+    with registry.batched():
+        for index in range(5):
+            registry.connect(
+                account_id=f"acct_{index}",
+                connector_id="metaapi_mcp",
+                provider_account_id=f"provider_{index}",
+                mode="demo",
+                label="Demo",
+                allowed_symbols=[],
+            )
+
+    assert statements.count("BEGIN") == 1
+    assert statements.count("COMMIT") == 1
+    assert len(AccountRegistry(state_store=store).list()) == 5
@@ -1,10 +1,12 @@
+from pathlib import Path
+
 from fastapi.testclient import TestClient
 
 from app.main import create_app
 
 
-def test_health_endpoint_returns_ok_payload() -> None:
-    client = TestClient(create_app())
+def test_health_endpoint_returns_ok_payload(tmp_path: Path) -> None:
+    client = TestClient(create_app(data_dir=tmp_path))
 
     response = client.get("/health")
 
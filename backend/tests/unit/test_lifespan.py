@@ -0,0 +1,57 @@
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.audit.store import AuditStore
+from app.main import create_app
+from app.memory.watcher import MemoryWatcher
+
+
+def test_audit_compaction_keeps_running_after_a_failed_pass(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    config_path = tmp_path / "config.json5"
+    config_path.write_text(
+        """
+        {
+          gateway: { host: "0.0.0.0", port: 18789, auth: { mode: "token", token: "dev-token" } },
+          audit: { compaction: { intervalSeconds: 1 } },
+        }
+        """,
+        encoding="utf-8",
+    )
+    passes: list[int] = []
+
+    def compact(self: AuditStore) -> dict:
+        passes.append(len(passes))
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(AuditStore, "compact", compact)
+
+    with TestClient(create_app(data_dir=tmp_path, config_path=config_path)):
+        deadline = time.monotonic() + 5
+        while len(passes) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    assert len(passes) >= 2
+    assert "audit compaction failed" in caplog.text
+
+
+def test_shutdown_closes_every_store_when_one_close_fails(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def close(self: MemoryWatcher) -> None:
+        raise RuntimeError("inotify fd already closed")
+
+    monkeypatch.setattr(MemoryWatcher, "close", close)
+    app = create_app(data_dir=tmp_path)
+
+    with pytest.raises(RuntimeError, match="inotify"), TestClient(app):
+        pass
+
+    # The watcher is closed first; the steps after it still ran.
+    assert (tmp_path / "state" / "agent_queues.json").exists()
+    with pytest.raises(RuntimeError, match="closed"):
+        app.state.audit_store.append(actor="user", action="risk.preview", trace_id="t", data={})